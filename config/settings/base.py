@@ -68,6 +68,7 @@ THIRD_PARTY_APPS = [
     'rest_framework',
     'rest_framework_swagger',
     'drf_yasg',
+    'django_filters',
 ]
 LOCAL_APPS = [
     'safe_transaction_history.safe.apps.SafeConfig',
@@ -199,7 +200,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'DEFAULT_PERMISSION_CLASSES': ('rest_framework.permissions.AllowAny',),
     'DEFAULT_RENDERER_CLASSES': (
-        'djangorestframework_camel_case.render.CamelCaseJSONRenderer',
+        'safe_transaction_history.safe.renderers.CamelCaseJSONRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
         'djangorestframework_camel_case.parser.CamelCaseJSONParser',
@@ -268,6 +269,13 @@ REDIS_URL = env('REDIS_URL', default='redis://localhost:6379/0')
 # ------------------------------------------------------------------------------
 ETH_HASH_PREFIX = env('ETH_HASH_PREFIX', default='GNO')
 ETHEREUM_NODE_URL = env('ETHEREUM_NODE_URL', default=None)
+# Threads used by `Web3Service` when batch requests are not supported, and maximum requests of a batch
+ETHEREUM_MAX_WORKERS = env.int('ETHEREUM_MAX_WORKERS', default=10)
+ETHEREUM_MAX_BATCH_REQUESTS = env.int('ETHEREUM_MAX_BATCH_REQUESTS', default=500)
+# Seconds to wait for the node answering a batch request
+ETHEREUM_NODE_TIMEOUT = env.int('ETHEREUM_NODE_TIMEOUT', default=10)
+# Average seconds between blocks, used to schedule tasks waiting for new blocks
+ETHEREUM_BLOCK_TIME = env.int('ETHEREUM_BLOCK_TIME', default=15)
 
 
 # Safe
@@ -289,4 +297,39 @@ SAFE_CHECK_DEPLOYER_FUNDED_RETRIES = env.int('SAFE_CHECK_DEPLOYER_FUNDED_RETRIES
 
 SAFE_REORG_BLOCKS = env.int('SAFE_REORG_BLOCKS', default=10) # Number of blocks from the current block number needed to consider a transaction valid/stable
 
+# Seconds the chain head tracked on Redis is valid, if `track_chain_head` task doesn't update it the node is queried
+SAFE_CHAIN_HEAD_TIMEOUT = env.int('SAFE_CHAIN_HEAD_TIMEOUT', default=60)
+
+# Maximum number of block headers cached in-process, they are cached on Redis too
+SAFE_BLOCK_CACHE_SIZE = env.int('SAFE_BLOCK_CACHE_SIZE', default=10000)
+
+# Seconds a page of the history of a safe is cached on Redis, 0 disables the cache
+SAFE_HISTORY_CACHE_TIMEOUT = env.int('SAFE_HISTORY_CACHE_TIMEOUT', default=10 * 60)
+
+# Maximum number of blocks retrieved by every run of the indexer of approvals and executions of multisig transactions
+SAFE_INDEXER_MAX_BLOCKS = env.int('SAFE_INDEXER_MAX_BLOCKS', default=20)
+
+# Seconds owners and threshold of a safe are cached, they are invalidated before if transactions changing them are found
+SAFE_OWNERS_CACHE_TIMEOUT = env.int('SAFE_OWNERS_CACHE_TIMEOUT', default=60 * 60)
+
+# Maximum processes used by `SafeService.check_hashes` to verify signatures, 1 disables the process pool
+SAFE_SIGNATURE_VERIFIER_MAX_WORKERS = env.int('SAFE_SIGNATURE_VERIFIER_MAX_WORKERS', default=4)
+
+# Maximum number of safes for the batch history endpoint
+SAFE_HISTORY_BATCH_MAX_SAFES = env.int('SAFE_HISTORY_BATCH_MAX_SAFES', default=500)
+
+# Maximum number of confirmations for the bulk confirmations endpoint
+SAFE_CONFIRMATIONS_BULK_MAX = env.int('SAFE_CONFIRMATIONS_BULK_MAX', default=500)
+
+# If enabled, multisig transaction confirmations are validated on-chain by a task instead of during the request
+SAFE_CONFIRMATIONS_ASYNC = env.bool('SAFE_CONFIRMATIONS_ASYNC', default=False)
+
+# Number of unresolved confirmations checked by the reconciler using one JSON-RPC batch request (up to 4 requests
+# per confirmation)
+SAFE_CONFIRMATIONS_RECONCILE_CHUNK_SIZE = env.int('SAFE_CONFIRMATIONS_RECONCILE_CHUNK_SIZE', default=100)
+
+# Confirmations still pending this number of blocks after their block number are abandoned and not checked anymore.
+# Pending confirmations are checked again after 1, 2, 4... blocks, up to SAFE_REORG_BLOCKS
+SAFE_CONFIRMATIONS_MAX_AGE_BLOCKS = env.int('SAFE_CONFIRMATIONS_MAX_AGE_BLOCKS', default=10000)
+
 SAFE_TRANSACTION_TYPES = (('confirmation', 'confirmation',), ('execution', 'execution',),)
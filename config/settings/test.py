@@ -47,3 +47,4 @@ SAFE_TX_SENDER_PRIVATE_KEY = '6cbed15c793ce57650b9877cf6fa156fbef513c4e6134f022a
 SAFE_FUNDING_CONFIRMATIONS = 0
 SAFE_GAS_PRICE = 1
 SAFE_TEAM_CONTRACT_ADDRESS = '0x2aaB3573eCFD2950a30B75B6f3651b84F4e130da'
+SAFE_HISTORY_CACHE_TIMEOUT = 0  # History cache is enabled explicitly by the tests using it
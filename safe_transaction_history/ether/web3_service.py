@@ -177,7 +177,8 @@ class Web3Service(object):
             if isinstance(self.provider, HTTPProvider):
                 # Query limit for RPC is 131072
                 for block_numbers_chunk in self._chunks(block_identifiers, self.max_batch_requests):
-                    rpc_request = [self._build_block_request(block_number) for block_number in block_numbers_chunk]
+                    rpc_request = [self._build_block_request(block_number, full_transactions)
+                                   for block_number in block_numbers_chunk]
                     for rpc_response in self._do_request(rpc_request):
                         block = rpc_response['result']
                         if not block:
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
-from .models import MultisigConfirmation, MultisigTransaction
+from .models import (MultisigConfirmation, MultisigConfirmationSubmission,
+                     MultisigTransaction)
 
-admin.site.register([MultisigTransaction, MultisigConfirmation])
+admin.site.register([MultisigTransaction, MultisigConfirmation, MultisigConfirmationSubmission])
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SafeConfig(AppConfig):
     name = 'safe_transaction_history.safe'
+
+    def ready(self):
+        from . import signals  # noqa
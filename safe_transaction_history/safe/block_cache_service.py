@@ -0,0 +1,137 @@
+import json
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from hexbytes import HexBytes
+from redis.exceptions import RedisError
+
+from .redis_service import RedisService
+
+logger = getLogger(__name__)
+
+
+class BlockCacheServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            from django.conf import settings
+            cls.instance = BlockCacheService(RedisService().redis,
+                                             settings.SAFE_REORG_BLOCKS,
+                                             settings.SAFE_BLOCK_CACHE_SIZE)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class BlockCacheService:
+    """
+    Two tier cache for block headers (`number`, `hash`, `parentHash` and `timestamp`), an in-process LRU and Redis,
+    so it's shared between web and worker processes. Headers deeper than `reorg_blocks` from the current block are
+    final and cached permanently. Headers within reorg depth expire soon and are only returned if their hash
+    matches the expected one
+    """
+    HEADER_KEY = 'block-header:{}'
+    RECENT_TIMEOUT = 60
+
+    def __init__(self, redis, reorg_blocks: int, max_size: int):
+        """
+        :param redis: Redis instance
+        :param reorg_blocks: number of blocks from the current block number needed to consider a block final
+        :param max_size: maximum number of headers stored in-process
+        """
+        self.redis = redis
+        self.reorg_blocks = reorg_blocks
+        self.max_size = max_size
+        self.headers = OrderedDict()
+        self.lock = Lock()
+
+    @staticmethod
+    def build_header(block: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param block: block returned by web3 or by a raw `eth_getBlockByNumber`
+        :return: header of the block
+        """
+        number, timestamp = block['number'], block['timestamp']
+        return {
+            'number': int(number, 16) if isinstance(number, str) else number,
+            'hash': HexBytes(block['hash']).hex(),
+            'parentHash': HexBytes(block['parentHash']).hex(),
+            'timestamp': int(timestamp, 16) if isinstance(timestamp, str) else timestamp,
+        }
+
+    def is_final(self, block_number: int, current_block_number: int) -> bool:
+        return current_block_number - block_number >= self.reorg_blocks
+
+    def get_header(self, block_number: int, block_hash: Optional[str]=None,
+                   current_block_number: Optional[int]=None) -> Optional[Dict[str, Any]]:
+        """
+        :param block_number: number of the block
+        :param block_hash: expected hash of the block, needed to use headers within reorg depth
+        :param current_block_number: if provided, headers within reorg depth matching `block_hash` that are now
+        final are stored permanently
+        :return: header of the block, `None` if not cached or not valid
+        """
+        header = self._get_local(block_number)
+        if header is None:
+            try:
+                cached = self.redis.get(self.HEADER_KEY.format(block_number))
+            except RedisError:
+                logger.warning('Cannot get header for block-number=%d', block_number, exc_info=True)
+                return None
+            if cached is None:
+                return None
+            header = json.loads(cached.decode())
+            self._set_local(header)
+
+        if header['final']:
+            return header
+        elif block_hash is None or HexBytes(block_hash).hex() != header['hash']:
+            return None
+        elif current_block_number is not None and self.is_final(block_number, current_block_number):
+            self.set_header(header, current_block_number)
+        return header
+
+    def set_header(self, header: Dict[str, Any], current_block_number: int) -> Dict[str, Any]:
+        """
+        :param header: header built with `build_header`
+        :param current_block_number: current block number, used to know if the block is final
+        :return: header stored, with `final` flag
+        """
+        return self.set_headers([header], current_block_number)[0]
+
+    def set_headers(self, headers: List[Dict[str, Any]], current_block_number: int) -> List[Dict[str, Any]]:
+        """
+        Stores many headers using one Redis round trip
+        :param headers: headers built with `build_header`
+        :param current_block_number: current block number, used to know if the blocks are final
+        :return: headers stored, with `final` flag
+        """
+        headers = [dict(header, final=self.is_final(header['number'], current_block_number)) for header in headers]
+        pipe = self.redis.pipeline()
+        for header in headers:
+            self._set_local(header)
+            pipe.set(self.HEADER_KEY.format(header['number']), json.dumps(header),
+                     ex=None if header['final'] else self.RECENT_TIMEOUT)
+        try:
+            pipe.execute()
+        except RedisError:
+            logger.warning('Cannot store headers for %d blocks', len(headers), exc_info=True)
+        return headers
+
+    def _get_local(self, block_number: int) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            header = self.headers.get(block_number)
+            if header is not None:
+                self.headers.move_to_end(block_number)
+            return header
+
+    def _set_local(self, header: Dict[str, Any]) -> None:
+        with self.lock:
+            self.headers[header['number']] = header
+            self.headers.move_to_end(header['number'])
+            while len(self.headers) > self.max_size:
+                self.headers.popitem(last=False)
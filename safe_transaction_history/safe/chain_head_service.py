@@ -0,0 +1,109 @@
+import json
+from logging import getLogger
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from .ethereum_service import EthereumServiceProvider
+from .redis_service import RedisService
+
+logger = getLogger(__name__)
+
+
+class ChainHeadServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            from django.conf import settings
+            cls.instance = ChainHeadService(RedisService().redis,
+                                            EthereumServiceProvider(),
+                                            settings.SAFE_REORG_BLOCKS,
+                                            settings.SAFE_CHAIN_HEAD_TIMEOUT)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class ChainHeadService:
+    """
+    Tracks the head of the chain for all the workers, so they don't need to query the node for the current block
+    number. Hashes of the last `reorg_blocks` blocks are stored on Redis, every time the head is updated they are
+    compared with the node to detect reorgs. Reorgs are published on `REORGS_CHANNEL` with the fork point (first
+    block number changed)
+    """
+    HEAD_KEY = 'chain-head:head'
+    BLOCKS_KEY = 'chain-head:blocks'
+    REORGS_CHANNEL = 'chain-head:reorgs'
+
+    def __init__(self, redis, ethereum_service, reorg_blocks: int, timeout: int):
+        """
+        :param redis: Redis instance
+        :param ethereum_service: EthereumService instance
+        :param reorg_blocks: number of block hashes kept to detect reorgs
+        :param timeout: seconds the head is valid if not updated, then the node is queried again
+        """
+        self.redis = redis
+        self.ethereum_service = ethereum_service
+        self.reorg_blocks = reorg_blocks
+        self.timeout = timeout
+
+    def get_head(self) -> Optional[Dict[str, Any]]:
+        """
+        :return: `number` and `hash` of the head stored by `update`, `None` if not stored or expired
+        """
+        try:
+            head = self.redis.get(self.HEAD_KEY)
+        except RedisError:
+            logger.warning('Cannot get chain head', exc_info=True)
+            return None
+        return json.loads(head.decode()) if head else None
+
+    def get_current_block_number(self) -> int:
+        """
+        :return: block number of the head, queried to the node if not tracked
+        """
+        head = self.get_head()
+        return head['number'] if head else self.ethereum_service.current_block_number
+
+    def get_block_hashes(self) -> Dict[int, str]:
+        """
+        :return: hashes of the last blocks of the head stored, by block number
+        """
+        return {int(block_number): block_hash.decode()
+                for block_number, block_hash in self.redis.hgetall(self.BLOCKS_KEY).items()}
+
+    def update(self) -> Optional[int]:
+        """
+        Stores the current head and the hashes of its last `reorg_blocks` blocks, retrieved using one batch request.
+        If a stored hash changed (or the block is not in the chain anymore) a reorg event is published
+        :return: fork block number if a reorg was detected, `None` if not
+        :raises ValueError: if blocks cannot be retrieved
+        """
+        current_block_number = self.ethereum_service.current_block_number
+        first_block_number = max(current_block_number - max(self.reorg_blocks, 1) + 1, 0)
+        blocks = self.ethereum_service.batch_request([self.ethereum_service.build_get_block_request(block_number)
+                                                      for block_number in range(first_block_number,
+                                                                                current_block_number + 1)])
+        if not all(blocks):
+            raise ValueError('Blocks for head with block-number=%d not found' % current_block_number)
+        block_hashes = {int(block['number'], 16): block['hash'] for block in blocks}
+
+        # Stored blocks older than `first_block_number` are final
+        forked_block_numbers = [block_number for block_number, block_hash in self.get_block_hashes().items()
+                                if block_number >= first_block_number and block_hashes.get(block_number) != block_hash]
+        fork_block_number = min(forked_block_numbers) if forked_block_numbers else None
+
+        pipe = self.redis.pipeline()
+        pipe.delete(self.BLOCKS_KEY)
+        pipe.hmset(self.BLOCKS_KEY, block_hashes)
+        pipe.set(self.HEAD_KEY, json.dumps({'number': current_block_number,
+                                            'hash': block_hashes[current_block_number]}), ex=self.timeout)
+        if fork_block_number is not None:
+            logger.warning('Reorg detected from block-number=%d to block-number=%d', fork_block_number,
+                           current_block_number)
+            pipe.publish(self.REORGS_CHANNEL, json.dumps({'fork_block_number': fork_block_number,
+                                                          'block_number': current_block_number}))
+        pipe.execute()
+        return fork_block_number
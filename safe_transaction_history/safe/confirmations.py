@@ -0,0 +1,309 @@
+"""
+Validation, storage and reconciliation of many confirmations at once, sharing node requests and database queries
+"""
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.utils import timezone
+from hexbytes import HexBytes
+
+from .ethereum_service import BatchRequestError, EthereumServiceProvider
+from .history_cache_service import HistoryCacheServiceProvider
+from .models import MultisigConfirmation, MultisigTransaction
+from .owner_cache_service import OwnerCacheServiceProvider
+from .safe_service import SafeServiceProvider
+
+# Decisions for a stored confirmation, taken by `get_confirmation_decision`
+CONFIRMATION_PENDING = 'pending'  # Must be checked again later
+CONFIRMATION_APPROVED = 'approved'  # Approved by the owner, multisig transaction executed if `isExecuted`
+CONFIRMATION_EXECUTED = 'executed'  # Multisig transaction executed
+CONFIRMATION_REORGED = 'reorged'  # Must be deleted
+CONFIRMATION_ABANDONED = 'abandoned'  # Pending after the maximum age, it's not checked anymore
+
+# Error returned by `validate_confirmations_on_chain` if the transaction is known by the node but not mined yet
+TRANSACTION_NOT_MINED_ERROR = (400, 'Transaction is not mined yet')
+
+
+def validate_confirmations_on_chain(confirmations: List[Dict[str, Any]]) -> List[Optional[Tuple[int, str]]]:
+    """
+    Retrieves the transaction and approval status of every confirmation and the current block number using one
+    JSON-RPC batch request. Owners are retrieved once per Safe from `OwnerCacheService`. Timestamps of the blocks are
+    retrieved using `EthereumService.get_block_headers`, so only blocks not cached are requested to the node.
+    `block_number` and `block_date_time` are set on valid confirmations
+    :param confirmations: data validated by `BaseSafeMultisigConfirmationSerializer`
+    :return: for every confirmation `None` if valid, tuple of http status and error if not valid
+    (`TRANSACTION_NOT_MINED_ERROR` if it can be valid once the transaction is mined)
+    :raises IOError: if node cannot be reached or returns an error
+    :raises ValueError: if current block number or blocks cannot be retrieved
+    """
+    if not confirmations:
+        return []
+
+    ethereum_service = EthereumServiceProvider()
+    safe_service = SafeServiceProvider()
+    owner_cache = OwnerCacheServiceProvider()
+    owners_by_safe = {safe_address: owner_cache.get_owners(safe_address)
+                      for safe_address in {confirmation['safe'] for confirmation in confirmations}}
+
+    rpc_requests = [ethereum_service.build_block_number_request()]
+    slices = []  # Results of every confirmation
+    for confirmation in confirmations:
+        start = len(rpc_requests) - 1
+        rpc_requests.append(ethereum_service.build_get_transaction_request(confirmation['transaction_hash'].hex()))
+        if confirmation['sender'] in owners_by_safe[confirmation['safe']]:
+            rpc_requests += safe_service.build_approval_status_requests(confirmation['safe'],
+                                                                        confirmation['contract_transaction_hash'],
+                                                                        confirmation['sender'])
+        slices.append(slice(start, len(rpc_requests) - 1))
+
+    current_block_number, *results = ethereum_service.batch_request(rpc_requests)
+    if current_block_number is None:
+        raise ValueError('Cannot get current block number')
+    current_block_number = int(current_block_number, 16)
+
+    errors = []
+    block_hashes = {}
+    for confirmation, confirmation_slice in zip(confirmations, slices):
+        transaction_data, *call_results = results[confirmation_slice]
+        if not transaction_data:
+            errors.append((400, 'Cannot get info from transaction_hash %s' % confirmation['transaction_hash'].hex()))
+        elif not transaction_data['blockNumber']:
+            errors.append(TRANSACTION_NOT_MINED_ERROR)
+        elif not call_results or not safe_service.decode_approval_status(call_results):
+            errors.append((422, 'User is not an owner or tx not approved/executed'))
+        else:
+            errors.append(None)
+            confirmation['block_number'] = int(transaction_data['blockNumber'], 16)
+            block_hashes[confirmation['block_number']] = transaction_data['blockHash']
+
+    headers = ethereum_service.get_block_headers(block_hashes, current_block_number)
+    for confirmation, error in zip(confirmations, errors):
+        if error is None:
+            confirmation['block_date_time'] = datetime.datetime.fromtimestamp(
+                headers[confirmation['block_number']]['timestamp'], datetime.timezone.utc
+            )
+    return errors
+
+
+def save_confirmations(confirmations: List[Dict[str, Any]]) -> List[MultisigConfirmation]:
+    """
+    Same as `SafeMultisigTransactionSerializer.save` for many confirmations, using `bulk_upsert` and `bulk_create`.
+    Signals are not sent by them, so the history cache of the safes is invalidated here
+    :param confirmations: data validated by `SafeMultisigTransactionSerializer`
+    :return: confirmations created
+    """
+    if not confirmations:
+        return []
+
+    multisig_transactions = MultisigTransaction.objects.bulk_upsert([
+        MultisigTransaction(safe=confirmation['safe'], to=confirmation['to'], value=confirmation['value'],
+                            data=confirmation['data'], operation=confirmation['operation'], nonce=confirmation['nonce'],
+                            contract_transaction_hash=confirmation['contract_transaction_hash'])
+        for confirmation in confirmations
+    ])
+
+    multisig_confirmations = MultisigConfirmation.objects.bulk_create([
+        MultisigConfirmation(
+            block_number=confirmation['block_number'],
+            block_date_time=confirmation['block_date_time'],
+            contract_transaction_hash=confirmation['contract_transaction_hash'],
+            owner=confirmation['sender'],
+            type=confirmation['type'],
+            transaction_hash=confirmation['transaction_hash'],
+            multisig_transaction=multisig_transaction
+        )
+        for confirmation, multisig_transaction in zip(confirmations, multisig_transactions)
+    ])
+
+    history_cache = HistoryCacheServiceProvider()
+    for safe_address in {confirmation['safe'] for confirmation in confirmations}:
+        history_cache.bump_version(safe_address)
+    return multisig_confirmations
+
+
+def get_confirmation_decision(block_number: int, transaction_found: bool, transaction_block_number: Optional[int],
+                              is_executed_latest: bool, is_approved_latest: bool, is_approved_prev: bool,
+                              current_block_number: int, reorg_blocks: int) -> str:
+    """
+    Decision table shared by `check_approve_confirmation` and `reconcile_confirmations`
+    :param block_number: block number stored for the confirmation
+    :param transaction_found: `True` if the node returned the transaction
+    :param transaction_block_number: block number of the transaction on the node, `None` if not mined
+    :param is_executed_latest: `isExecuted` on the latest block
+    :param is_approved_latest: `isApproved` on the latest block
+    :param is_approved_prev: `isApproved` on `current_block_number - reorg_blocks`
+    :return: `CONFIRMATION_PENDING`, `CONFIRMATION_APPROVED`, `CONFIRMATION_EXECUTED` or `CONFIRMATION_REORGED`
+    """
+    if not transaction_found:
+        # Check if more than `reorg_blocks` have passed from the block number the transaction was stored
+        if current_block_number - block_number > reorg_blocks:
+            return CONFIRMATION_REORGED
+        return CONFIRMATION_PENDING
+
+    if transaction_block_number != block_number and is_approved_prev and not is_approved_latest \
+            and not is_executed_latest:
+        # Reorg, multisig transaction not executed and confirmation not approved anymore
+        return CONFIRMATION_REORGED
+    elif not is_approved_latest and is_executed_latest:
+        # Multisig transaction executed (approvals are set to 0)
+        return CONFIRMATION_EXECUTED
+    elif is_approved_latest:
+        return CONFIRMATION_APPROVED
+    return CONFIRMATION_PENDING
+
+
+def get_check_delay(check_attempts: int, reorg_blocks: int) -> int:
+    """
+    Exponential backoff for pending confirmations, in blocks. It's never longer than `reorg_blocks`, as a reorged
+    confirmation can be detected after that number of blocks
+    :param check_attempts: checks done without settling the confirmation
+    :return: number of blocks to wait before checking the confirmation again
+    """
+    return min(2 ** max(check_attempts - 1, 0), max(reorg_blocks, 1))
+
+
+def is_check_expired(block_number: int, current_block_number: int, max_age_blocks: int) -> bool:
+    """
+    :return: `True` if a pending confirmation must be abandoned
+    """
+    return current_block_number - block_number > max_age_blocks
+
+
+def recheck_confirmations_after_fork(fork_block_number: int) -> int:
+    """
+    Confirmations stored on blocks after the fork point of a reorg may have changed, so they are checked again on
+    the next block even if already approved. Confirmations of executed multisig transactions are not changed
+    :param fork_block_number: first block number changed by the reorg
+    :return: number of confirmations to check again
+    """
+    confirmations = MultisigConfirmation.objects.filter(block_number__gte=fork_block_number, abandoned=False,
+                                                        multisig_transaction__status=False)
+    safe_addresses = set(confirmations.values_list('multisig_transaction__safe', flat=True))
+    updated = confirmations.update(status=False, check_attempts=0, next_check_block_number=0, modified=timezone.now())
+
+    history_cache = HistoryCacheServiceProvider()
+    for safe_address in safe_addresses:
+        history_cache.bump_version(safe_address)
+    return updated
+
+
+def reconcile_confirmations(current_block_number: int, reorg_blocks: int, max_age_blocks: int, chunk_size: int,
+                            safe_address: Optional[str]=None,
+                            contract_transaction_hash: Optional[str]=None) -> Dict[str, int]:
+    """
+    Same as `check_approve_confirmation` for every unresolved confirmation (not approved, not abandoned and multisig
+    transaction not executed) due to be checked on `current_block_number`. If `contract_transaction_hash` is provided
+    every unresolved confirmation of that multisig transaction is checked, due or not. Confirmations are loaded in
+    chunks, and every chunk is checked using one JSON-RPC batch request and updated using bulk queries. Pending
+    confirmations are checked again after `get_check_delay` blocks, or left for the next block if the node returns an
+    error for any of their requests (a failed transaction lookup is not taken as the transaction not found). Bulk
+    updates don't send signals, so the history cache of the safes is invalidated here
+    :param current_block_number: block number confirmations are checked against
+    :param reorg_blocks: number of blocks needed to consider a transaction stable
+    :param max_age_blocks: pending confirmations older than this number of blocks are abandoned
+    :param chunk_size: number of confirmations checked using one batch request
+    :param safe_address: address of the safe of `contract_transaction_hash`
+    :param contract_transaction_hash: hash of a multisig transaction, to only check its confirmations
+    :return: number of confirmations for every decision
+    """
+    ethereum_service = EthereumServiceProvider()
+    safe_service = SafeServiceProvider()
+    history_cache = HistoryCacheServiceProvider()
+    prev_block_identifier = hex(max(current_block_number - reorg_blocks, 0))
+    counts = dict.fromkeys((CONFIRMATION_PENDING, CONFIRMATION_APPROVED, CONFIRMATION_EXECUTED,
+                            CONFIRMATION_REORGED, CONFIRMATION_ABANDONED), 0)
+
+    filters = {'status': False, 'abandoned': False, 'multisig_transaction__status': False}
+    if contract_transaction_hash is None:
+        filters['next_check_block_number__lte'] = current_block_number
+    else:
+        filters.update(multisig_transaction__safe=safe_address, contract_transaction_hash=contract_transaction_hash)
+
+    last_id = 0
+    while True:
+        confirmations = list(MultisigConfirmation.objects.filter(id__gt=last_id, **filters).values(
+            'id', 'owner', 'contract_transaction_hash', 'transaction_hash', 'block_number', 'multisig_transaction_id',
+            'multisig_transaction__safe', 'check_attempts'
+        ).order_by('id')[:chunk_size])
+        if not confirmations:
+            return counts
+        last_id = confirmations[-1]['id']
+
+        # Transactions and `isExecuted` can be shared by confirmations, so they are only requested once
+        rpc_requests = {}
+        for confirmation in confirmations:
+            confirmation_safe = confirmation['multisig_transaction__safe']
+            confirmation_hash = HexBytes(confirmation['contract_transaction_hash'])
+            transaction_hash = HexBytes(confirmation['transaction_hash'])
+            safe_contract = safe_service.get_contract(confirmation_safe)
+            is_approved_data = safe_contract.encodeABI(fn_name='isApproved',
+                                                       args=[confirmation_hash, confirmation['owner']])
+            confirmation['keys'] = (transaction_hash,
+                                    (confirmation_safe, confirmation_hash),
+                                    (confirmation_safe, is_approved_data, 'latest'),
+                                    (confirmation_safe, is_approved_data, prev_block_identifier))
+            if transaction_hash not in rpc_requests:
+                rpc_requests[transaction_hash] = ethereum_service.build_get_transaction_request(transaction_hash.hex())
+            if (confirmation_safe, confirmation_hash) not in rpc_requests:
+                rpc_requests[confirmation_safe, confirmation_hash] = ethereum_service.build_call_request(
+                    confirmation_safe, safe_contract.encodeABI(fn_name='isExecuted', args=[confirmation_hash])
+                )
+            for block_identifier in ('latest', prev_block_identifier):
+                is_approved_request = ethereum_service.build_call_request(confirmation_safe, is_approved_data,
+                                                                          block_identifier)
+                rpc_requests[confirmation_safe, is_approved_data, block_identifier] = is_approved_request
+
+        results = dict(zip(rpc_requests, ethereum_service.batch_request(list(rpc_requests.values()),
+                                                                        raise_on_error=False)))
+        approved_ids, executed_ids, reorged_ids, abandoned_ids = set(), set(), set(), set()
+        pending_ids = {}  # Grouped by number of check attempts
+        safe_addresses = set()
+        for confirmation in confirmations:
+            transaction_data, *call_results = confirmation_results = [results[key] for key in confirmation['keys']]
+            if any(isinstance(result, BatchRequestError) for result in confirmation_results):
+                # Node error, checked on the next run
+                counts[CONFIRMATION_PENDING] += 1
+                continue
+
+            is_executed_latest, is_approved_latest, is_approved_prev = [ethereum_service.decode_bool(result)
+                                                                        for result in call_results]
+            transaction_block_number = transaction_data and transaction_data['blockNumber']
+            decision = get_confirmation_decision(
+                confirmation['block_number'], bool(transaction_data),
+                int(transaction_block_number, 16) if transaction_block_number else None,
+                is_executed_latest, is_approved_latest, is_approved_prev, current_block_number, reorg_blocks
+            )
+            if decision == CONFIRMATION_PENDING and is_check_expired(confirmation['block_number'], current_block_number,
+                                                                     max_age_blocks):
+                decision = CONFIRMATION_ABANDONED
+            counts[decision] += 1
+
+            if decision == CONFIRMATION_PENDING:
+                pending_ids.setdefault(confirmation['check_attempts'] + 1, set()).add(confirmation['id'])
+                continue
+            elif decision == CONFIRMATION_ABANDONED:
+                abandoned_ids.add(confirmation['id'])
+                continue
+            safe_addresses.add(confirmation['multisig_transaction__safe'])
+            if decision == CONFIRMATION_REORGED:
+                reorged_ids.add(confirmation['id'])
+                continue
+            if decision == CONFIRMATION_APPROVED:
+                approved_ids.add(confirmation['id'])
+            if is_executed_latest:
+                executed_ids.add(confirmation['multisig_transaction_id'])
+
+        now = timezone.now()
+        MultisigConfirmation.objects.filter(id__in=approved_ids).update(status=True, modified=now)
+        MultisigTransaction.objects.filter(id__in=executed_ids, status=False).update(status=True,
+                                                                                     execution_date=now,
+                                                                                     modified=now)
+        MultisigConfirmation.objects.filter(id__in=reorged_ids).delete()
+        MultisigConfirmation.objects.filter(id__in=abandoned_ids).update(abandoned=True, modified=now)
+        for check_attempts, ids in pending_ids.items():
+            MultisigConfirmation.objects.filter(id__in=ids).update(
+                check_attempts=check_attempts,
+                next_check_block_number=current_block_number + get_check_delay(check_attempts, reorg_blocks)
+            )
+        for updated_safe_address in safe_addresses:
+            history_cache.bump_version(updated_safe_address)
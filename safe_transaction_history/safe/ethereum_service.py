@@ -1,5 +1,7 @@
 from logging import getLogger
+from typing import Any, Dict, List, Optional
 
+import requests
 from ethereum.utils import (check_checksum, checksum_encode, ecrecover_to_pub,
                             privtoaddr, sha3)
 from web3 import HTTPProvider, Web3
@@ -8,27 +10,39 @@ from web3.utils.threads import Timeout
 
 from django_eth.constants import NULL_ADDRESS
 
+from .block_cache_service import BlockCacheServiceProvider
+
 logger = getLogger(__name__)
 
 
+class BatchRequestError(IOError):
+    pass
+
+
 class EthereumServiceProvider:
     def __new__(cls):
         if not hasattr(cls, 'instance'):
             from django.conf import settings
             cls.instance = EthereumService(settings.ETHEREUM_NODE_URL,
                                            settings.SAFE_FUNDER_MAX_ETH,
-                                           settings.SAFE_FUNDER_PRIVATE_KEY)
+                                           settings.SAFE_FUNDER_PRIVATE_KEY,
+                                           settings.ETHEREUM_MAX_BATCH_REQUESTS,
+                                           settings.ETHEREUM_NODE_TIMEOUT)
         return cls.instance
 
 
 class EthereumService:
     NULL_ADDRESS = NULL_ADDRESS
 
-    def __init__(self, ethereum_node_url, max_eth_to_send=0.1, funder_private_key=None):
+    def __init__(self, ethereum_node_url, max_eth_to_send=0.1, funder_private_key=None, max_batch_requests=500,
+                 timeout=10):
         self.ethereum_node_url = ethereum_node_url
         self.max_eth_to_send = max_eth_to_send
         self.funder_private_key = funder_private_key
+        self.max_batch_requests = max_batch_requests
+        self.timeout = timeout
         self.w3 = Web3(HTTPProvider(self.ethereum_node_url))
+        self.http_session = requests.session()
         try:
             if self.w3.net.chainId != 1:
                 self.w3.middleware_stack.inject(geth_poa_middleware, layer=0)
@@ -75,6 +89,120 @@ class EthereumService:
     def get_block(self, block_number, full_transactions=False):
         return self.w3.eth.getBlock(block_number, full_transactions=full_transactions)
 
+    def get_block_header(self, block_number: int, block_hash: Optional[str]=None,
+                         current_block_number: Optional[int]=None) -> Dict[str, Any]:
+        """
+        Block is only retrieved from the node if its header is not cached on `BlockCacheService`
+        :param block_number: number of the block
+        :param block_hash: expected hash of the block, needed to use cached headers within reorg depth
+        :param current_block_number: current block number, needed to cache the header permanently
+        :return: header of the block with `number`, `hash`, `parentHash` and `timestamp`
+        :raises ValueError: if block is not found
+        """
+        return self.get_block_headers({block_number: block_hash}, current_block_number)[block_number]
+
+    def get_block_headers(self, block_hashes: Dict[int, Optional[str]],
+                          current_block_number: Optional[int]=None) -> Dict[int, Dict[str, Any]]:
+        """
+        Same as `get_block_header` for many blocks, blocks not cached are retrieved using one batch request
+        :param block_hashes: Dictionary with block number as key and expected block hash (can be `None`) as value
+        :param current_block_number: current block number, needed to cache the headers permanently
+        :return: Dictionary with block number as key and header as value
+        :raises ValueError: if a block is not found
+        :raises IOError: if node cannot be reached or returns an error
+        """
+        block_cache = BlockCacheServiceProvider()
+        headers = {block_number: block_cache.get_header(block_number, block_hash=block_hash,
+                                                        current_block_number=current_block_number)
+                   for block_number, block_hash in block_hashes.items()}
+        missing_block_numbers = [block_number for block_number, header in headers.items() if header is None]
+        if missing_block_numbers:
+            blocks = self.batch_request([self.build_get_block_request(block_number)
+                                         for block_number in missing_block_numbers])
+            if not all(blocks):
+                raise ValueError('Blocks with block-numbers=%s not found' % missing_block_numbers)
+            new_headers = block_cache.set_headers([block_cache.build_header(block) for block in blocks],
+                                                  max(max(missing_block_numbers), current_block_number or 0))
+            headers.update((header['number'], header) for header in new_headers)
+        return headers
+
+    def batch_request(self, rpc_requests: List[Dict[str, Any]], raise_on_error: bool=True) -> List[Any]:
+        """
+        Sends many JSON-RPC requests to the node using one HTTP request for every `max_batch_requests` requests
+        :param rpc_requests: requests built using `build_*_request` methods
+        :param raise_on_error: if `False` requests returning an error get a `BatchRequestError` as result instead of
+        raising it, so they can be told apart from requests returning `None` (e.g. transaction not found)
+        :return: result of every request, in the same order
+        :raises BatchRequestError: if a request returns an error and `raise_on_error`
+        :raises ValueError: if node response is not valid
+        :raises IOError: if node cannot be reached or doesn't answer in `timeout` seconds
+        """
+        results = []
+        for i in range(0, len(rpc_requests), self.max_batch_requests):
+            chunk_results = self._batch_request(rpc_requests[i:i + self.max_batch_requests])
+            if raise_on_error:
+                for result in chunk_results:
+                    if isinstance(result, BatchRequestError):
+                        raise result
+            results += chunk_results
+        return results
+
+    def _batch_request(self, rpc_requests: List[Dict[str, Any]]) -> List[Any]:
+        rpc_requests = [dict(rpc_request, id=i) for i, rpc_request in enumerate(rpc_requests)]
+        rpc_responses = self.http_session.post(self.ethereum_node_url, json=rpc_requests, timeout=self.timeout).json()
+        if not isinstance(rpc_responses, list) or len(rpc_responses) != len(rpc_requests):
+            raise ValueError('Batch request not supported by node, response=%s' % rpc_responses)
+
+        results = [None] * len(rpc_requests)
+        response_ids = set()
+        for rpc_response in rpc_responses:
+            # Errors not related to a request (e.g. parse errors) have `null` id
+            response_id = rpc_response.get('id') if isinstance(rpc_response, dict) else None
+            if (not isinstance(response_id, int) or isinstance(response_id, bool)
+                    or not 0 <= response_id < len(rpc_requests) or response_id in response_ids
+                    or ('error' not in rpc_response and 'result' not in rpc_response)):
+                raise ValueError('Invalid batch response, response=%s' % rpc_response)
+            response_ids.add(response_id)
+
+            if 'error' in rpc_response:
+                logger.warning('Error on batch request=%s', rpc_response)
+                results[response_id] = BatchRequestError(rpc_response['error'])
+            else:
+                results[response_id] = rpc_response['result']
+        return results
+
+    @staticmethod
+    def build_block_number_request() -> Dict[str, Any]:
+        return {'jsonrpc': '2.0',
+                'method': 'eth_blockNumber',
+                'params': []}
+
+    @staticmethod
+    def build_get_transaction_request(tx_hash: str) -> Dict[str, Any]:
+        return {'jsonrpc': '2.0',
+                'method': 'eth_getTransactionByHash',
+                'params': [tx_hash]}
+
+    @staticmethod
+    def build_get_block_request(block_number: int, full_transactions: bool=False) -> Dict[str, Any]:
+        return {'jsonrpc': '2.0',
+                'method': 'eth_getBlockByNumber',
+                'params': ['0x{:x}'.format(block_number), full_transactions]}
+
+    @staticmethod
+    def build_call_request(to: str, data: str, block_identifier: str='latest') -> Dict[str, Any]:
+        return {'jsonrpc': '2.0',
+                'method': 'eth_call',
+                'params': [{'to': to, 'data': data}, block_identifier]}
+
+    @staticmethod
+    def decode_bool(result: Optional[str]) -> bool:
+        """
+        :param result: result of an `eth_call` to a function returning `bool`
+        :return: `False` if no result (e.g. no contract deployed on the address)
+        """
+        return bool(result and int(result[2:] or '0', 16))
+
     def send_raw_transaction(self, raw_transaction):
         return self.w3.eth.sendRawTransaction(bytes(raw_transaction))
 
@@ -1,6 +1,151 @@
-from rest_framework.pagination import LimitOffsetPagination
+import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils import timezone
+from django_filters import rest_framework as filters
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import MultisigTransaction
 
 
 class DefaultPagination(LimitOffsetPagination):
     max_limit = 200
     default_limit = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination using a `(nonce, id)` keyset. Every page is retrieved using an indexed range condition on the
+    last element of the previous page, so deep pages cost the same as the first one. No `COUNT` is done,
+    only an opaque `next` cursor is returned.
+    Queryset must be ordered by `ordering`, it can return model instances or `.values()` dictionaries.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    max_limit = DefaultPagination.max_limit
+    default_limit = DefaultPagination.default_limit
+    ordering = ('-nonce', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_cursor_filter(self.cursor))
+
+        # Retrieve one more element to know if there's a next page
+        results = list(queryset[:self.limit + 1])
+        page = results[:self.limit]
+        if len(results) > self.limit:
+            last = page[-1]
+            if isinstance(last, dict):
+                self.next_cursor = tuple(last[field] for field in self.get_fields())
+            else:
+                self.next_cursor = tuple(getattr(last, field) for field in self.get_fields())
+        else:
+            self.next_cursor = None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+            if limit <= 0:
+                raise ValueError
+            return min(limit, self.max_limit)
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_cursor_filter(self, cursor) -> Q:
+        """
+        `(first, second) < (cursor_first, cursor_second)` for descending ordering (`>` for ascending). Redundant
+        `first <= cursor_first` condition is added so the database can use it as an index range
+        """
+        (first_field, second_field), (first_value, second_value) = self.get_fields(), cursor
+        operator = 'lt' if self.ordering[0].startswith('-') else 'gt'
+        return (Q(**{'{}__{}e'.format(first_field, operator): first_value})
+                & (Q(**{'{}__{}'.format(first_field, operator): first_value})
+                   | Q(**{'{}__{}'.format(second_field, operator): second_value})))
+
+    def get_fields(self):
+        return tuple(field.lstrip('-') for field in self.ordering)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param,
+                                   self.encode_cursor(self.next_cursor))
+
+    def decode_cursor(self, request):
+        """
+        :return: tuple with the values of the `ordering` fields for the last element of the previous page, `None`
+        if no cursor or empty cursor (first page) was provided
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            first_value, second_value = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split(':')
+            return int(first_value), int(second_value)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor) -> str:
+        return urlsafe_b64encode(':'.join(str(value) for value in cursor).encode('ascii')).decode('ascii')
+
+
+class CreatedKeysetPagination(KeysetPagination):
+    """
+    Pagination using a `(created, id)` keyset, newest first. `created` is stored on the cursor as microseconds
+    since epoch, so no precision is lost
+    """
+    ordering = ('-created', '-id')
+    epoch = datetime.datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+
+        created, id = cursor
+        try:
+            return self.epoch + datetime.timedelta(microseconds=created), id
+        except OverflowError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor) -> str:
+        created, id = cursor
+        return super().encode_cursor(((created - self.epoch) // datetime.timedelta(microseconds=1), id))
+
+
+class MultisigTransactionFilter(filters.FilterSet):
+    """
+    Filters for the history of a safe. Every filter is backed by an index on `MultisigTransaction` starting
+    with `safe`
+    """
+    executed = filters.BooleanFilter(field_name='status')
+    nonce__gte = filters.NumberFilter(field_name='nonce', lookup_expr='gte')
+    nonce__lte = filters.NumberFilter(field_name='nonce', lookup_expr='lte')
+    execution_date__gte = filters.IsoDateTimeFilter(field_name='execution_date', lookup_expr='gte')
+    execution_date__lte = filters.IsoDateTimeFilter(field_name='execution_date', lookup_expr='lte')
+    created__gte = filters.IsoDateTimeFilter(field_name='created', lookup_expr='gte')
+    created__lte = filters.IsoDateTimeFilter(field_name='created', lookup_expr='lte')
+    to = filters.CharFilter(field_name='to')
+
+    class Meta:
+        model = MultisigTransaction
+        fields = ('executed', 'nonce__gte', 'nonce__lte', 'execution_date__gte', 'execution_date__lte',
+                  'created__gte', 'created__lte', 'to')
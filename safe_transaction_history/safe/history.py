@@ -0,0 +1,151 @@
+"""
+Fast path to build the history of a safe directly from `.values()` rows, without using DRF serializers. Output
+must be the same than `SafeMultisigHistorySerializer` (camel cased), as it's rendered by the same renderer
+"""
+import datetime
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import MultisigConfirmation
+
+MULTISIG_TRANSACTION_VALUES = ('id', 'to', 'value', 'data', 'operation', 'nonce', 'created', 'execution_date',
+                               'status')
+MULTISIG_CONFIRMATION_VALUES = ('multisig_transaction_id', 'owner', 'created', 'type', 'transaction_hash')
+OWNER_CONFIRMATION_VALUES = ('id', 'created', 'type', 'transaction_hash', 'contract_transaction_hash',
+                             'multisig_transaction__safe', 'multisig_transaction__to', 'multisig_transaction__value',
+                             'multisig_transaction__data', 'multisig_transaction__operation',
+                             'multisig_transaction__nonce', 'multisig_transaction__created',
+                             'multisig_transaction__execution_date', 'multisig_transaction__status')
+
+
+def get_history_values(multisig_transactions: QuerySet) -> QuerySet:
+    """
+    :param multisig_transactions: MultisigTransaction queryset
+    :return: queryset with the values needed by `build_history`
+    """
+    return multisig_transactions.values(*MULTISIG_TRANSACTION_VALUES)
+
+
+def build_history(multisig_transactions: List[Dict[str, Any]],
+                  owners: Optional[List[str]]=None) -> List[Dict[str, Any]]:
+    """
+    Confirmations of all the multisig transactions are retrieved with one query
+    :param multisig_transactions: rows returned by `get_history_values`
+    :param owners: if provided, only confirmations from these owners are returned
+    :return: list of multisig transactions with their confirmations
+    """
+    confirmations_by_multisig_transaction = get_confirmations(
+        [multisig_transaction['id'] for multisig_transaction in multisig_transactions], owners=owners
+    )
+    return [
+        {
+            'to': multisig_transaction['to'],
+            'value': str(multisig_transaction['value']),
+            'data': _to_hex(multisig_transaction['data']),
+            'operation': int(multisig_transaction['operation']),
+            'nonce': int(multisig_transaction['nonce']),
+            'submissionDate': multisig_transaction['created'],
+            'executionDate': _to_iso_8601(multisig_transaction['execution_date']),
+            'confirmations': confirmations_by_multisig_transaction[multisig_transaction['id']],
+            'isExecuted': multisig_transaction['status'],
+        }
+        for multisig_transaction in multisig_transactions
+    ]
+
+
+def get_owner_confirmation_values(confirmations: QuerySet) -> QuerySet:
+    """
+    :param confirmations: MultisigConfirmation queryset
+    :return: queryset with the values needed by `build_owner_confirmations`, joined with their MultisigTransaction
+    """
+    return confirmations.values(*OWNER_CONFIRMATION_VALUES)
+
+
+def build_owner_confirmations(confirmations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    :param confirmations: rows returned by `get_owner_confirmation_values`
+    :return: list of confirmations with their multisig transaction
+    """
+    return [
+        {
+            'safe': confirmation['multisig_transaction__safe'],
+            'submissionDate': confirmation['created'],
+            'type': confirmation['type'],
+            'transactionHash': confirmation['transaction_hash'],
+            'contractTransactionHash': confirmation['contract_transaction_hash'],
+            'multisigTransaction': {
+                'to': confirmation['multisig_transaction__to'],
+                'value': str(confirmation['multisig_transaction__value']),
+                'data': _to_hex(confirmation['multisig_transaction__data']),
+                'operation': int(confirmation['multisig_transaction__operation']),
+                'nonce': int(confirmation['multisig_transaction__nonce']),
+                'submissionDate': confirmation['multisig_transaction__created'],
+                'executionDate': _to_iso_8601(confirmation['multisig_transaction__execution_date']),
+                'isExecuted': confirmation['multisig_transaction__status'],
+            },
+        }
+        for confirmation in confirmations
+    ]
+
+
+def add_owners_status(history: List[Dict[str, Any]], owners: List[str]) -> List[Dict[str, Any]]:
+    """
+    Adds to every multisig transaction the owners that confirmed it (`confirmedOwners`) and the ones that didn't
+    (`missingOwners`)
+    :param history: multisig transactions returned by `build_history`
+    :param owners: current owners of the safe
+    :return: same `history`
+    """
+    for multisig_transaction in history:
+        confirmed = {confirmation['owner'] for confirmation in multisig_transaction['confirmations']}
+        multisig_transaction['confirmedOwners'] = [owner for owner in owners if owner in confirmed]
+        multisig_transaction['missingOwners'] = [owner for owner in owners if owner not in confirmed]
+    return history
+
+
+def get_confirmations(multisig_transaction_ids: List[int],
+                      owners: Optional[List[str]]=None) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    :param multisig_transaction_ids: ids of the MultisigTransactions
+    :param owners: if provided, only confirmations from these owners are returned
+    :return: Dictionary with MultisigTransaction id as key and the list of its confirmations as value
+    """
+    confirmations_by_multisig_transaction = defaultdict(list)
+    if not multisig_transaction_ids:
+        return confirmations_by_multisig_transaction
+
+    confirmations = MultisigConfirmation.objects.filter(multisig_transaction_id__in=multisig_transaction_ids)
+    if owners:
+        confirmations = confirmations.filter(owner__in=owners)
+
+    for confirmation in confirmations.values_list(*MULTISIG_CONFIRMATION_VALUES):
+        multisig_transaction_id, owner, created, confirmation_type, transaction_hash = confirmation
+        confirmations_by_multisig_transaction[multisig_transaction_id].append({
+            'owner': owner,
+            'submissionDate': created,
+            'type': confirmation_type,
+            'transactionHash': transaction_hash,
+        })
+    return confirmations_by_multisig_transaction
+
+
+def _to_hex(value) -> Optional[str]:
+    """
+    Same as `DataHexField`
+    """
+    return value and '0x%s' % value.hex() or None
+
+
+def _to_iso_8601(value: Optional[datetime.datetime]) -> Optional[str]:
+    """
+    Same as DRF `DateTimeField` with default settings
+    """
+    if not value:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
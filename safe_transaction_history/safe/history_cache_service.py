@@ -0,0 +1,145 @@
+import json
+from hashlib import sha1
+from logging import getLogger
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from django.db import transaction
+from redis.exceptions import RedisError
+from rest_framework.utils.encoders import JSONEncoder
+
+from .redis_service import RedisService
+
+logger = getLogger(__name__)
+
+
+class HistoryCacheServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            from django.conf import settings
+            cls.instance = HistoryCacheService(RedisService().redis,
+                                               settings.SAFE_HISTORY_CACHE_TIMEOUT)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class HistoryCacheService:
+    """
+    Cache for pages of the history of a safe. Every safe has a version stored on Redis that is part of the key of
+    its cached pages. Setting a new version makes every cached page for the safe unreachable, so no scan is needed
+    to invalidate them, they just expire.
+    """
+    VERSION_KEY = 'safe-history:version:{}'
+    PAGE_KEY = 'safe-history:page:{}:{}'
+    HITS_KEY = 'safe-history:hits'
+    MISSES_KEY = 'safe-history:misses'
+
+    def __init__(self, redis, timeout: int):
+        """
+        :param redis: Redis instance
+        :param timeout: seconds a page is cached, 0 disables the cache
+        """
+        self.redis = redis
+        self.timeout = timeout
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout > 0
+
+    def get_version(self, safe_address: str) -> str:
+        """
+        :return: current version of the history of the safe. If there's no version a random one is set, so versions
+        are never reused even if Redis is flushed
+        """
+        key = self.VERSION_KEY.format(safe_address)
+        version = self.redis.get(key)
+        if version is None:
+            self.redis.set(key, uuid4().hex, nx=True)  # Don't override a version set by a concurrent request
+            version = self.redis.get(key)
+        return version.decode()
+
+    def bump_version(self, safe_address: str) -> None:
+        """
+        Sets a new version for the history of the safe. It's set again when the current database transaction is
+        committed, so pages cached by concurrent requests before the commit are not served
+        """
+        self._set_new_version(safe_address)
+        transaction.on_commit(lambda: self._set_new_version(safe_address))
+
+    def _set_new_version(self, safe_address: str) -> None:
+        try:
+            self.redis.set(self.VERSION_KEY.format(safe_address), uuid4().hex)
+        except RedisError:
+            logger.error('Cannot set a new history version for safe=%s', safe_address, exc_info=True)
+
+    def get_page_digest(self, safe_address: str, base_url: str, query_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Digest identifying the content of a page, it changes when the safe changes. Must be calculated before
+        retrieving the page from database, so if the safe changes meanwhile the page is related to an outdated version
+        :param safe_address: address of the safe
+        :param base_url: absolute url of the page, as pagination links depend on it
+        :param query_params: owners filter, pagination parameters...
+        :return: digest for the page, `None` if Redis is not available
+        """
+        try:
+            version = self.get_version(safe_address)
+        except RedisError:
+            logger.warning('Cannot get history version for safe=%s', safe_address, exc_info=True)
+            return None
+
+        query = json.dumps([version, base_url, sorted(query_params.items())])
+        return sha1(query.encode()).hexdigest()
+
+    def get_page_key(self, safe_address: str, page_digest: Optional[str]) -> Optional[str]:
+        """
+        :param safe_address: address of the safe
+        :param page_digest: digest returned by `get_page_digest`
+        :return: key for the page, `None` if cache is disabled or not available
+        """
+        if not self.enabled or not page_digest:
+            return None
+        return self.PAGE_KEY.format(safe_address, page_digest)
+
+    def get_page(self, key: Optional[str]) -> Optional[Any]:
+        """
+        :param key: key returned by `get_page_key`
+        :return: cached page, `None` if not found
+        """
+        if not key:
+            return None
+
+        try:
+            page = self.redis.get(key)
+            self.redis.incr(self.MISSES_KEY if page is None else self.HITS_KEY)
+        except RedisError:
+            logger.warning('Cannot get history page with key=%s', key, exc_info=True)
+            return None
+
+        return page if page is None else json.loads(page.decode())
+
+    def set_page(self, key: Optional[str], page: Any) -> None:
+        """
+        :param key: key returned by `get_page_key`
+        :param page: data of the page, it must be json serializable by DRF encoder
+        """
+        if not key:
+            return None
+
+        try:
+            self.redis.set(key, json.dumps(page, cls=JSONEncoder), ex=self.timeout)
+        except RedisError:
+            logger.warning('Cannot store history page with key=%s', key, exc_info=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        :return: Dictionary with number of `hits` and `misses` of the cache
+        """
+        hits, misses = self.redis.mget(self.HITS_KEY, self.MISSES_KEY)
+        return {
+            'hits': int(hits or 0),
+            'misses': int(misses or 0),
+        }
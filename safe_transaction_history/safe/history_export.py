@@ -0,0 +1,91 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, Iterator
+
+from django.db.models import prefetch_related_objects
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import MultisigTransaction
+from .renderers import camelize
+from .serializers import SafeMultisigHistorySerializer
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_TRANSACTION_FIELDS = ('safe', 'to', 'value', 'data', 'operation', 'nonce', 'submissionDate', 'executionDate',
+                          'isExecuted')
+CSV_CONFIRMATION_FIELDS = ('owner', 'submissionDate', 'type', 'transactionHash')
+
+
+def iterate_safe_history(safe_address: str, chunk_size: int=EXPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Iterates every multisig transaction of a safe with its confirmations, oldest first. Transactions are
+    retrieved using a server side cursor and confirmations are retrieved once per chunk of transactions, so
+    memory used doesn't depend on the size of the history
+    :param safe_address: address of the safe
+    :param chunk_size: number of transactions retrieved from database at once
+    :return: transactions serialized the same way as the history endpoint (camel case keys)
+    """
+    multisig_transactions = MultisigTransaction.objects.filter(
+        safe=safe_address
+    ).order_by('nonce', 'id').iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(multisig_transactions, chunk_size))
+        if not chunk:
+            return
+        prefetch_related_objects(chunk, SafeMultisigHistorySerializer.get_confirmations_prefetch())
+        for multisig_transaction, data in zip(chunk, SafeMultisigHistorySerializer(chunk, many=True).data):
+            data['safe'] = multisig_transaction.safe
+            yield camelize(data)
+
+
+def export_ndjson(history: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """
+    :param history: transactions returned by `iterate_safe_history`
+    :return: one json line per transaction, with its confirmations nested
+    """
+    for multisig_transaction in history:
+        yield json.dumps(multisig_transaction, cls=JSONEncoder) + '\n'
+
+
+class Echo:
+    """
+    File-like object returning what's written on it, so csv rows can be streamed
+    """
+    def write(self, value):
+        return value
+
+
+def export_csv(history: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    """
+    :param history: transactions returned by `iterate_safe_history`
+    :return: csv header and one row per confirmation, with the fields of its transaction. Transactions without
+    confirmations get one row with confirmation fields empty
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_TRANSACTION_FIELDS + tuple('confirmation' + field[0].upper() + field[1:]
+                                                         for field in CSV_CONFIRMATION_FIELDS))
+    for multisig_transaction in history:
+        transaction_row = [_csv_value(multisig_transaction[field]) for field in CSV_TRANSACTION_FIELDS]
+        confirmation_rows = [[_csv_value(confirmation[field]) for field in CSV_CONFIRMATION_FIELDS]
+                             for confirmation in multisig_transaction['confirmations']]
+        for confirmation_row in confirmation_rows or [[''] * len(CSV_CONFIRMATION_FIELDS)]:
+            yield writer.writerow(transaction_row + confirmation_row)
+
+
+def _csv_value(value: Any) -> str:
+    """
+    Formats values the same way they are formatted on json
+    """
+    if value is None:
+        return ''
+    elif isinstance(value, str):
+        return value
+    return json.dumps(value, cls=JSONEncoder).strip('"')
+
+
+EXPORTERS = {
+    'ndjson': export_ndjson,
+    'csv': export_csv,
+}
@@ -0,0 +1,71 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from djangorestframework_camel_case import render
+
+from ...history import build_history, get_history_values
+from ...models import MultisigConfirmation, MultisigTransaction
+from ...renderers import CamelCaseJSONRenderer
+from ...serializers import SafeMultisigHistorySerializer
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks rows per second rendering a page of the history of a safe, using the serializer and the '
+            '`.values()` fast path, and rows per second of the JSON renderers for the serialized page. Rows are '
+            'created inside a transaction that is rolled back')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Number of multisig transactions of the page')
+        parser.add_argument('--confirmations', type=int, default=2,
+                            help='Number of confirmations of every multisig transaction')
+        parser.add_argument('--iterations', type=int, default=20, help='Number of times the page is rendered')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            safe_address = self.create_history(options['rows'], options['confirmations'])
+            multisig_transactions = MultisigTransaction.objects.filter(safe=safe_address).order_by('-nonce', '-id')
+
+            self.benchmark('serializer', self.render_serializer, multisig_transactions, options)
+            self.benchmark('values', self.render_values, multisig_transactions, options)
+
+            page = multisig_transactions.prefetch_related(SafeMultisigHistorySerializer.get_confirmations_prefetch())
+            data = SafeMultisigHistorySerializer(page, many=True).data
+            self.benchmark('djangorestframework_camel_case renderer', render.CamelCaseJSONRenderer().render, data,
+                           options)
+            self.benchmark('cached camel case renderer', CamelCaseJSONRenderer().render, data, options)
+
+            transaction.set_rollback(True)
+
+    def benchmark(self, name: str, function, argument, options):
+        start = time.perf_counter()
+        for _ in range(options['iterations']):
+            function(argument)
+        elapsed = time.perf_counter() - start
+        self.stdout.write('{}: {:.0f} rows/s'.format(name, options['rows'] * options['iterations'] / elapsed))
+
+    def create_history(self, rows: int, confirmations: int) -> str:
+        safe_address = '0x' + os.urandom(20).hex()
+        multisig_transactions = MultisigTransaction.objects.bulk_create([
+            MultisigTransaction(safe=safe_address, to='0x' + os.urandom(20).hex(), value=nonce,
+                                data=os.urandom(nonce % 100), operation=0, nonce=nonce, status=nonce % 2 == 0,
+                                execution_date=timezone.now() if nonce % 2 == 0 else None,
+                                contract_transaction_hash=os.urandom(32).hex())
+            for nonce in range(rows)
+        ])
+        MultisigConfirmation.objects.bulk_create([
+            MultisigConfirmation(owner='0x' + os.urandom(20).hex(), contract_transaction_hash=os.urandom(32).hex(),
+                                 transaction_hash=os.urandom(32).hex(), type='confirmation', block_number=0,
+                                 block_date_time=timezone.now(), multisig_transaction=multisig_transaction)
+            for multisig_transaction in multisig_transactions for _ in range(confirmations)
+        ])
+        return safe_address
+
+    def render_serializer(self, multisig_transactions) -> bytes:
+        page = multisig_transactions.prefetch_related(SafeMultisigHistorySerializer.get_confirmations_prefetch())
+        return CamelCaseJSONRenderer().render(SafeMultisigHistorySerializer(page, many=True).data)
+
+    def render_values(self, multisig_transactions) -> bytes:
+        return CamelCaseJSONRenderer().render(build_history(list(get_history_values(multisig_transactions))))
@@ -0,0 +1,70 @@
+import os
+import time
+
+import eth_abi
+from django.core.management.base import BaseCommand, CommandError
+from ethereum.utils import sha3
+from hexbytes import HexBytes
+
+from django_eth.constants import NULL_ADDRESS
+
+from ...safe_service import SafeService
+
+
+def get_hash_for_safe_tx_eth_abi(safe_address: str, to: str, value: int, data: bytes,
+                                 operation: int, nonce: int) -> HexBytes:
+    """
+    Previous implementation of `SafeService.get_hash_for_safe_tx` using `eth_abi`, used as reference
+    """
+    data_bytes = (
+            bytes.fromhex('19') +
+            bytes.fromhex('00') +
+            HexBytes(safe_address) +
+            HexBytes(to or NULL_ADDRESS) +
+            eth_abi.encode_single('uint256', value) +
+            (data or b'') +
+            operation.to_bytes(1, byteorder='big') +
+            eth_abi.encode_single('uint256', nonce)
+    )
+    return HexBytes(sha3(data_bytes))
+
+
+class Command(BaseCommand):
+    help = ('Benchmarks safe transaction hashes per second using the previous `eth_abi` implementation, '
+            '`SafeService.get_hash_for_safe_tx` and `SafeService.get_hashes_for_safe_txs`, checking all of them '
+            'return the same hashes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 100000],
+                            help='Number of safe transactions hashed at once')
+        parser.add_argument('--min-hashes', type=int, default=100000,
+                            help='Small sizes are repeated until this number of hashes is reached')
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            safe_txs = [self.build_safe_tx(i) for i in range(size)]
+            repeat = max(1, options['min_hashes'] // size)
+
+            expected = [get_hash_for_safe_tx_eth_abi(*safe_tx) for safe_tx in safe_txs]
+            if ([SafeService.get_hash_for_safe_tx(*safe_tx) for safe_tx in safe_txs] != expected or
+                    SafeService.get_hashes_for_safe_txs(safe_txs) != expected):
+                raise CommandError('Hashes are not the same for size %d' % size)
+
+            self.benchmark('eth_abi', size, repeat,
+                           lambda: [get_hash_for_safe_tx_eth_abi(*safe_tx) for safe_tx in safe_txs])
+            self.benchmark('get_hash_for_safe_tx', size, repeat,
+                           lambda: [SafeService.get_hash_for_safe_tx(*safe_tx) for safe_tx in safe_txs])
+            self.benchmark('get_hashes_for_safe_txs', size, repeat,
+                           lambda: SafeService.get_hashes_for_safe_txs(safe_txs))
+
+    def benchmark(self, name: str, size: int, repeat: int, function):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        elapsed = time.perf_counter() - start
+        self.stdout.write('{} size={}: {:.0f} hashes/s'.format(name, size, size * repeat / elapsed))
+
+    @staticmethod
+    def build_safe_tx(i: int):
+        return ('0x' + os.urandom(20).hex(), '0x' + os.urandom(20).hex() if i % 10 else None, i * 10 ** 15,
+                os.urandom(i % 3 * 68) or None, i % 2, i)
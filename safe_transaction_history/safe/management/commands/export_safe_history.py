@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from ethereum.utils import check_checksum
+
+from ...history_export import EXPORT_CHUNK_SIZE, EXPORTERS, iterate_safe_history
+
+
+class Command(BaseCommand):
+    help = 'Exports every multisig transaction of a safe with its confirmations, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('safe_address', help='Checksummed address of the safe')
+        parser.add_argument('--format', choices=sorted(EXPORTERS.keys()), default='ndjson',
+                            help='`ndjson` for one json line per transaction, `csv` for one row per confirmation')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+                            help='Number of transactions retrieved from database at once')
+        parser.add_argument('--output', help='File to write the export to, stdout by default')
+
+    def handle(self, *args, **options):
+        safe_address = options['safe_address']
+        try:
+            if not check_checksum(safe_address):
+                raise ValueError
+        except Exception:
+            raise CommandError('Invalid ethereum address %s' % safe_address)
+
+        lines = EXPORTERS[options['format']](iterate_safe_history(safe_address, chunk_size=options['chunk_size']))
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
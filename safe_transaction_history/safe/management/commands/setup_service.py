@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+# Periodic tasks of the service: name, task and interval in seconds
+PERIODIC_TASKS = (
+    ('Track chain head', 'safe_transaction_history.safe.tasks.track_chain_head', 5),
+    ('Process owner changes', 'safe_transaction_history.safe.tasks.process_owner_changes', 15),
+    ('Index safe transactions', 'safe_transaction_history.safe.tasks.index_safe_transactions', 15),
+    ('Reconcile pending confirmations', 'safe_transaction_history.safe.tasks.reconcile_pending_confirmations', 5),
+)
+
+
+class Command(BaseCommand):
+    help = 'Creates or updates the periodic tasks needed by the service'
+
+    def handle(self, *args, **options):
+        for name, task, seconds in PERIODIC_TASKS:
+            interval, _ = IntervalSchedule.objects.get_or_create(every=seconds, period=IntervalSchedule.SECONDS)
+            periodic_task = PeriodicTask.objects.filter(task=task).first()
+            if periodic_task:
+                periodic_task.name = name
+                periodic_task.interval = interval
+                periodic_task.save()
+                self.stdout.write(self.style.SUCCESS('Updated task {}'.format(task)))
+            else:
+                PeriodicTask.objects.create(name=name, task=task, interval=interval)
+                self.stdout.write(self.style.SUCCESS('Created task {}'.format(task)))
@@ -0,0 +1,17 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0004_auto_20180813_1130'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='multisigtransaction',
+            index=models.Index(fields=['safe', 'nonce', 'id'], name='safe_multis_safe_7f2103_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0005_auto_20261018_0303'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='multisigtransaction',
+            index=models.Index(fields=['safe', 'status', 'nonce', 'id'], name='safe_multis_safe_cc20f7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multisigtransaction',
+            index=models.Index(fields=['safe', 'to', 'nonce', 'id'], name='safe_multis_safe_f2da15_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multisigtransaction',
+            index=models.Index(fields=['safe', 'execution_date'], name='safe_multis_safe_b01d99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='multisigtransaction',
+            index=models.Index(fields=['safe', 'created'], name='safe_multis_safe_f809d6_idx'),
+        ),
+    ]
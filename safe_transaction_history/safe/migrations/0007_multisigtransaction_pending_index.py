@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Partial index for the pending queue of a safe. Django 2.0 `Index` doesn't support conditions, so raw SQL is used
+    """
+
+    dependencies = [
+        ('safe', '0006_auto_20261018_0313'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX safe_multisigtransaction_pending_idx ON safe_multisigtransaction (safe, nonce, id) '
+            'WHERE status = false',
+            reverse_sql='DROP INDEX safe_multisigtransaction_pending_idx',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0007_multisigtransaction_pending_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='multisigconfirmation',
+            index=models.Index(fields=['owner', 'created', 'id'], name='safe_multis_owner_c9e510_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import django_eth.models
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0008_auto_20261018_0315'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MultisigConfirmationSubmission',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('safe', django_eth.models.EthereumAddressField()),
+                ('to', django_eth.models.EthereumAddressField(null=True)),
+                ('value', django_eth.models.Uint256Field()),
+                ('data', models.BinaryField(null=True)),
+                ('operation', models.PositiveSmallIntegerField()),
+                ('nonce', django_eth.models.Uint256Field()),
+                ('contract_transaction_hash', django_eth.models.Sha3HashField()),
+                ('transaction_hash', django_eth.models.Sha3HashField()),
+                ('sender', django_eth.models.EthereumAddressField()),
+                ('type', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('accepted', 'accepted'), ('rejected', 'rejected')], default='pending', max_length=8)),
+                ('error', models.TextField(blank=True)),
+                ('multisig_confirmation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submissions', to='safe.MultisigConfirmation')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
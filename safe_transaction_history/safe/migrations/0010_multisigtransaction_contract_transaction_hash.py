@@ -0,0 +1,73 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:32
+
+import eth_abi
+from django.db import migrations
+from ethereum.utils import sha3
+from hexbytes import HexBytes
+
+import django_eth.models
+
+
+def get_hash_for_safe_tx(safe_address: str, to: str, value: int, data: bytes, operation: int, nonce: int) -> str:
+    """
+    Same as `SafeService.get_hash_for_safe_tx`, copied so the migration doesn't depend on the service
+    """
+    data_bytes = (
+            bytes.fromhex('19') +
+            bytes.fromhex('00') +
+            HexBytes(safe_address) +
+            HexBytes(to or '0x' + '0' * 40) +
+            eth_abi.encode_single('uint256', value) +
+            (data or b'') +
+            operation.to_bytes(1, byteorder='big') +
+            eth_abi.encode_single('uint256', nonce)
+    )
+    return HexBytes(sha3(data_bytes)).hex()
+
+
+def backfill_contract_transaction_hash(apps, schema_editor):
+    """
+    Multisig transactions duplicated by concurrent `get_or_create` are merged into the oldest one
+    """
+    MultisigTransaction = apps.get_model('safe', 'MultisigTransaction')
+    MultisigConfirmation = apps.get_model('safe', 'MultisigConfirmation')
+
+    first_by_hash = {}
+    for multisig_transaction in MultisigTransaction.objects.order_by('id').iterator():
+        contract_transaction_hash = get_hash_for_safe_tx(multisig_transaction.safe, multisig_transaction.to,
+                                                         int(multisig_transaction.value),
+                                                         multisig_transaction.data and bytes(multisig_transaction.data),
+                                                         multisig_transaction.operation,
+                                                         int(multisig_transaction.nonce))
+        first = first_by_hash.get(contract_transaction_hash)
+        if first is None:
+            first_by_hash[contract_transaction_hash] = multisig_transaction
+            MultisigTransaction.objects.filter(pk=multisig_transaction.pk).update(
+                contract_transaction_hash=contract_transaction_hash
+            )
+        else:
+            MultisigConfirmation.objects.filter(multisig_transaction_id=multisig_transaction.pk).update(
+                multisig_transaction_id=first.pk
+            )
+            if multisig_transaction.status and not first.status:
+                first.status = True
+                first.execution_date = multisig_transaction.execution_date
+                MultisigTransaction.objects.filter(pk=first.pk).update(status=True,
+                                                                       execution_date=first.execution_date)
+            MultisigTransaction.objects.filter(pk=multisig_transaction.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0009_multisigconfirmationsubmission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='multisigtransaction',
+            name='contract_transaction_hash',
+            field=django_eth.models.Sha3HashField(null=True),
+        ),
+        migrations.RunPython(backfill_contract_transaction_hash, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:33
+
+from django.db import migrations
+
+import django_eth.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0010_multisigtransaction_contract_transaction_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='multisigtransaction',
+            name='contract_transaction_hash',
+            field=django_eth.models.Sha3HashField(unique=True),
+        ),
+    ]
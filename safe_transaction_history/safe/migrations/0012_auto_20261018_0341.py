@@ -0,0 +1,32 @@
+# Generated by Django 2.0.8 on 2026-10-18 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('safe', '0011_auto_20261018_0333'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='multisigconfirmation',
+            name='abandoned',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='multisigconfirmation',
+            name='check_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='multisigconfirmation',
+            name='next_check_block_number',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='multisigconfirmation',
+            index=models.Index(fields=['status', 'abandoned', 'id'], name='safe_multis_status_56e3ee_idx'),
+        ),
+    ]
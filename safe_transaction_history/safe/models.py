@@ -1,9 +1,60 @@
-from django.db import models
+from typing import Any, Dict, List
+
+from django.db import connection, models
+from hexbytes import HexBytes
 from model_utils.models import TimeStampedModel
 
 from django_eth.models import EthereumAddressField, Sha3HashField, Uint256Field
 
 
+class MultisigTransactionManager(models.Manager):
+    def upsert(self, multisig_transaction: 'MultisigTransaction') -> 'MultisigTransaction':
+        """
+        Same as `bulk_upsert` for one multisig transaction
+        """
+        return self.bulk_upsert([multisig_transaction])[0]
+
+    def bulk_upsert(self, multisig_transactions: List['MultisigTransaction']) -> List['MultisigTransaction']:
+        """
+        Inserts the multisig transactions not stored yet using one atomic `INSERT ... ON CONFLICT` on
+        `contract_transaction_hash`, so concurrent inserts of the same transaction cannot create duplicates.
+        Signals are not sent
+        :param multisig_transactions: not saved instances, `contract_transaction_hash` must be set
+        :return: same instances with `pk` set to the id of the stored multisig transaction. If it was already stored
+        the other fields are not updated
+        """
+        if not multisig_transactions:
+            return multisig_transactions
+
+        fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        hash_field = self.model._meta.get_field('contract_transaction_hash')
+        hash_index = fields.index(hash_field)
+        keys = []
+        rows = {}  # Duplicated rows cannot be updated by the same `ON CONFLICT DO UPDATE`
+        for multisig_transaction in multisig_transactions:
+            row = [field.get_db_prep_save(field.pre_save(multisig_transaction, True), connection) for field in fields]
+            keys.append(row[hash_index])
+            rows.setdefault(row[hash_index], row)
+
+        query = """
+            INSERT INTO {table} ({columns}) VALUES {values}
+            ON CONFLICT ({hash_column}) DO UPDATE SET {hash_column} = EXCLUDED.{hash_column}
+            RETURNING {hash_column}, id
+        """.format(table=connection.ops.quote_name(self.model._meta.db_table),
+                   columns=', '.join(connection.ops.quote_name(field.column) for field in fields),
+                   values=', '.join(['(%s)' % ', '.join(['%s'] * len(fields))] * len(rows)),
+                   hash_column=connection.ops.quote_name(hash_field.column))
+        with connection.cursor() as cursor:
+            cursor.execute(query, [value for row in rows.values() for value in row])
+            ids = dict(cursor.fetchall())
+
+        for multisig_transaction, key in zip(multisig_transactions, keys):
+            multisig_transaction.pk = ids[key]
+            multisig_transaction._state.adding = False
+            multisig_transaction._state.db = self.db
+        return multisig_transactions
+
+
 class MultisigTransaction(TimeStampedModel):
     safe = EthereumAddressField()
     to = EthereumAddressField()
@@ -14,6 +65,18 @@ class MultisigTransaction(TimeStampedModel):
     status = models.BooleanField(default=False)  # True if transaction executed, 0 otherwise
     # Defines when a multisig transaction gets executed (confirmations included)
     execution_date = models.DateTimeField(blank=True, null=True)
+    contract_transaction_hash = Sha3HashField(unique=True)
+
+    objects = MultisigTransactionManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['safe', 'nonce', 'id']),
+            models.Index(fields=['safe', 'status', 'nonce', 'id']),
+            models.Index(fields=['safe', 'to', 'nonce', 'id']),
+            models.Index(fields=['safe', 'execution_date']),
+            models.Index(fields=['safe', 'created']),
+        ]
 
     def __str__(self):
         executed = 'Executed' if self.status else 'Pending'
@@ -31,7 +94,63 @@ class MultisigConfirmation(TimeStampedModel):
     multisig_transaction = models.ForeignKey(MultisigTransaction,
                                              on_delete=models.CASCADE,
                                              related_name="confirmations")
+    # Checks on-chain done without settling the confirmation, and block number when it must be checked again
+    check_attempts = models.PositiveIntegerField(default=0)
+    next_check_block_number = models.BigIntegerField(default=0)
+    abandoned = models.BooleanField(default=False)  # True if not settled after the maximum age, it's not checked
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'created', 'id']),
+            models.Index(fields=['status', 'abandoned', 'id']),
+        ]
 
     def __str__(self):
         mined = 'Mined and executed' if self.status else 'Pending'
         return '{} - {}'.format(self.safe, mined)
+
+
+class MultisigConfirmationSubmission(TimeStampedModel):
+    """
+    Confirmation accepted without on-chain validation, it's validated later by a task. If valid a
+    `MultisigConfirmation` is created
+    """
+    PENDING = 'pending'
+    ACCEPTED = 'accepted'
+    REJECTED = 'rejected'
+    STATUS_CHOICES = ((PENDING, PENDING), (ACCEPTED, ACCEPTED), (REJECTED, REJECTED))
+
+    safe = EthereumAddressField()
+    to = EthereumAddressField(null=True)
+    value = Uint256Field()
+    data = models.BinaryField(null=True)
+    operation = models.PositiveSmallIntegerField()
+    nonce = Uint256Field()
+    contract_transaction_hash = Sha3HashField()
+    transaction_hash = Sha3HashField()
+    sender = EthereumAddressField()
+    type = models.CharField(max_length=20)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=PENDING)
+    error = models.TextField(blank=True)
+    multisig_confirmation = models.ForeignKey(MultisigConfirmation, null=True, blank=True,
+                                              on_delete=models.SET_NULL, related_name='submissions')
+
+    def __str__(self):
+        return '{} - {} - {}'.format(self.safe, self.transaction_hash, self.status)
+
+    def get_confirmation_data(self) -> Dict[str, Any]:
+        """
+        :return: same data as `BaseSafeMultisigConfirmationSerializer` validated data
+        """
+        return {
+            'safe': self.safe,
+            'to': self.to,
+            'value': int(self.value),
+            'data': None if self.data is None else bytes(self.data),
+            'operation': self.operation,
+            'nonce': int(self.nonce),
+            'contract_transaction_hash': HexBytes(self.contract_transaction_hash),
+            'transaction_hash': HexBytes(self.transaction_hash),
+            'sender': self.sender,
+            'type': self.type,
+        }
@@ -0,0 +1,208 @@
+import json
+import time
+from logging import getLogger
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import eth_abi
+from eth_abi.exceptions import DecodingError
+from hexbytes import HexBytes
+from redis.exceptions import RedisError
+from web3 import Web3
+
+from .contracts import GNOSIS_SAFE_TEAM_INTERFACE
+from .ethereum_service import EthereumServiceProvider
+from .redis_service import RedisService
+from .safe_indexer_service import EXEC_FUNCTION, build_function_selectors
+from .safe_service import SafeNotDeployed, SafeServiceProvider
+
+logger = getLogger(__name__)
+
+DELEGATE_CALL_OPERATION = 1
+
+# Functions of `OwnerManager` changing owners or threshold of a Safe. Safe contracts don't emit events for them
+OWNER_FUNCTION_SELECTORS = set(build_function_selectors(GNOSIS_SAFE_TEAM_INTERFACE['abi'],
+                                                        ('addOwnerWithThreshold', 'removeOwner', 'swapOwner',
+                                                         'changeThreshold')))
+
+# Safe functions executing a transaction from the Safe, with `to`, `value`, `data` and `operation` as first inputs
+SAFE_EXEC_FUNCTION_SELECTORS = build_function_selectors(GNOSIS_SAFE_TEAM_INTERFACE['abi'],
+                                                        (EXEC_FUNCTION, 'execTransactionFromModule'))
+
+
+class OwnerCacheServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            from django.conf import settings
+            cls.instance = OwnerCacheService(RedisService().redis,
+                                             SafeServiceProvider(),
+                                             settings.SAFE_OWNERS_CACHE_TIMEOUT,
+                                             settings.SAFE_REORG_BLOCKS)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class OwnerCacheService:
+    """
+    Cache for owners and threshold of Safes, shared by web and worker processes using Redis. Safe contracts don't
+    emit events when owners or threshold change, so entries are invalidated when transactions changing them are found
+    on the new blocks, and expire after `timeout` in case some change is missed (e.g. done by an internal
+    transaction). Safes cached are stored on a sorted set with their expiration time as score, so only transactions
+    sent to cached Safes are decoded
+    """
+    OWNERS_KEY = 'safe-owners:{}'
+    SAFES_KEY = 'safe-owners:safes'
+    LAST_BLOCK_KEY = 'safe-owners:last-block'
+    MAX_BLOCKS = 100
+
+    def __init__(self, redis, safe_service, timeout: int, reorg_blocks: int):
+        """
+        :param redis: Redis instance
+        :param safe_service: SafeService instance
+        :param timeout: seconds owners of a Safe are cached
+        :param reorg_blocks: number of blocks processed again every time new blocks are checked, so changes on
+        reorged blocks are not missed
+        """
+        self.redis = redis
+        self.safe_service = safe_service
+        self.timeout = timeout
+        self.reorg_blocks = reorg_blocks
+
+    def get_owners_and_threshold(self, safe_address: str) -> Tuple[List[str], int]:
+        """
+        :param safe_address: address of the Safe
+        :return: owners and threshold of the Safe, retrieved using one batch request if not cached
+        :raises IOError: if node cannot be reached or returns an error
+        :raises ValueError: if node response is not valid or no Safe is deployed on the address (`SafeNotDeployed`)
+        """
+        key = self.OWNERS_KEY.format(safe_address)
+        try:
+            cached = self.redis.get(key)
+        except RedisError:
+            logger.warning('Cannot get owners for safe=%s', safe_address, exc_info=True)
+            cached = None
+
+        if cached is not None:
+            owners_and_threshold = json.loads(cached.decode())
+            return owners_and_threshold['owners'], owners_and_threshold['threshold']
+
+        results = EthereumServiceProvider().batch_request(self.safe_service.build_owners_requests(safe_address))
+        owners, threshold = self.safe_service.decode_owners(results)
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(key, json.dumps({'owners': owners, 'threshold': threshold}), ex=self.timeout)
+            pipe.zadd(self.SAFES_KEY, safe_address, time.time() + self.timeout)
+            pipe.execute()
+        except RedisError:
+            logger.warning('Cannot store owners for safe=%s', safe_address, exc_info=True)
+        return owners, threshold
+
+    def get_owners(self, safe_address: str) -> Set[str]:
+        """
+        :return: owners of the Safe, empty if no Safe is deployed on the address
+        :raises IOError: if node cannot be reached or returns an error, so it's not taken as "not an owner"
+        :raises ValueError: if node response is not valid
+        """
+        try:
+            owners, _ = self.get_owners_and_threshold(safe_address)
+            return set(owners)
+        except SafeNotDeployed:
+            return set()
+
+    def is_owner(self, safe_address: str, address: str) -> bool:
+        """
+        :raises IOError: if node cannot be reached or returns an error
+        :raises ValueError: if node response is not valid
+        """
+        return address in self.get_owners(safe_address)
+
+    def invalidate(self, safe_addresses: Set[str]) -> None:
+        if not safe_addresses:
+            return None
+
+        pipe = self.redis.pipeline()
+        pipe.delete(*[self.OWNERS_KEY.format(safe_address) for safe_address in safe_addresses])
+        pipe.zrem(self.SAFES_KEY, *safe_addresses)
+        pipe.execute()
+
+    def get_cached_safes(self) -> List[str]:
+        """
+        :return: Safes with owners cached, expired ones are removed
+        """
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(self.SAFES_KEY, '-inf', time.time())
+        pipe.zrange(self.SAFES_KEY, 0, -1)
+        _, safe_addresses = pipe.execute()
+        return [safe_address.decode() for safe_address in safe_addresses]
+
+    @staticmethod
+    def get_safe_changing_owners(transaction: Dict[str, Any], safe_addresses: Set[str]) -> Optional[str]:
+        """
+        Owners and threshold can only be changed by the Safe itself, so transactions executing a call from the Safe
+        to one of the `OwnerManager` functions are taken into account. Delegate calls can run any code on the Safe, so
+        they are taken into account too. Failed transactions are not filtered out, invalidating an entry is cheap
+        :param transaction: transaction returned by web3 or by a raw `eth_getBlockByNumber`
+        :param safe_addresses: Safes cached
+        :return: Safe if transaction can change its owners or threshold, `None` otherwise
+        """
+        if not transaction['to']:
+            return None
+
+        safe_address = Web3.toChecksumAddress(transaction['to'])
+        if safe_address not in safe_addresses:
+            return None
+
+        transaction_data = HexBytes(transaction['input'])
+        selector = bytes(transaction_data[:4])
+        if selector in OWNER_FUNCTION_SELECTORS:
+            return safe_address
+        elif selector not in SAFE_EXEC_FUNCTION_SELECTORS:
+            return None
+
+        function_name, types = SAFE_EXEC_FUNCTION_SELECTORS[selector]
+        try:
+            to, _, data, operation, *_ = eth_abi.decode_abi(types, transaction_data[4:])
+        except (DecodingError, ValueError):
+            logger.warning('Cannot decode %s for transaction=%s', function_name, transaction['hash'])
+            return None
+
+        if operation == DELEGATE_CALL_OPERATION or (Web3.toChecksumAddress(to) == safe_address
+                                                    and bytes(data[:4]) in OWNER_FUNCTION_SELECTORS):
+            return safe_address
+        return None
+
+    def process_owner_changes(self, web3_service, current_block_number: int) -> Set[str]:
+        """
+        Invalidates the cached Safes with transactions changing their owners or threshold from the last block
+        processed to `current_block_number`. If there are more than `MAX_BLOCKS` blocks to process (e.g. task was not
+        running) every cached Safe is invalidated instead of retrieving the blocks
+        :param web3_service: Web3Service instance, used to get the blocks
+        :param current_block_number: last block to check
+        :return: Safes invalidated
+        """
+        last_block_number = self.redis.get(self.LAST_BLOCK_KEY)
+        if last_block_number is None:
+            from_block_number = current_block_number - self.reorg_blocks
+        else:
+            from_block_number = int(last_block_number) + 1 - self.reorg_blocks
+        from_block_number = max(min(from_block_number, current_block_number), 0)
+
+        invalidated = set()
+        safe_addresses = set(self.get_cached_safes())
+        if current_block_number - from_block_number >= self.MAX_BLOCKS:
+            invalidated = safe_addresses
+        elif safe_addresses:
+            blocks = web3_service.get_blocks(list(range(from_block_number, current_block_number + 1)),
+                                             full_transactions=True)
+            for block in blocks.values():
+                for transaction in block['transactions']:
+                    safe_address = self.get_safe_changing_owners(transaction, safe_addresses)
+                    if safe_address:
+                        invalidated.add(safe_address)
+
+        self.invalidate(invalidated)
+        self.redis.set(self.LAST_BLOCK_KEY, current_block_number)
+        return invalidated
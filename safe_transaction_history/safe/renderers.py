@@ -0,0 +1,61 @@
+import re
+from collections import OrderedDict
+from functools import lru_cache
+
+from djangorestframework_camel_case.util import camelize_re, underscore_to_camel
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+@lru_cache(maxsize=1024)
+def _camelize_key(key: str) -> str:
+    return re.sub(camelize_re, underscore_to_camel, key)
+
+
+def camelize(data):
+    """
+    Same output as `djangorestframework_camel_case.util.camelize`, but camel case keys are cached and dicts and
+    lists are only rebuilt if some key inside them changes, so already camel cased data is returned as it is
+    """
+    if isinstance(data, dict):
+        items = [(_camelize_key(key) if isinstance(key, str) and '_' in key else key, camelize(value))
+                 for key, value in data.items()]
+        if all(new_key is key and new_value is value for (new_key, new_value), (key, value)
+               in zip(items, data.items())):
+            return data
+        return OrderedDict(items)
+    if isinstance(data, (list, tuple)):
+        items = [camelize(item) for item in data]
+        if all(new_item is item for new_item, item in zip(items, data)):
+            return data
+        return items
+    return data
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement of `djangorestframework_camel_case.render.CamelCaseJSONRenderer` using cached `camelize`.
+    Encoding is done by DRF `JSONRenderer`, that uses the C accelerated encoder of the standard library
+    """
+    def render(self, data, *args, **kwargs):
+        return super().render(camelize(data), *args, **kwargs)
+
+
+class StreamRenderer(BaseRenderer):
+    """
+    Renderer used for content negotiation of views returning a `StreamingHttpResponse`, so only responses not
+    streamed (errors) are rendered by it, as plain text
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'' if data is None else str(data).encode(self.charset)
+
+
+class NdjsonRenderer(StreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CsvRenderer(StreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
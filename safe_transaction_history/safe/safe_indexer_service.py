@@ -0,0 +1,181 @@
+import datetime
+from logging import getLogger
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import eth_abi
+from django.db.models import Q
+from django.utils import timezone
+from eth_abi.exceptions import DecodingError
+from hexbytes import HexBytes
+from web3 import Web3
+
+from .block_cache_service import BlockCacheServiceProvider
+from .contracts import GNOSIS_SAFE_TEAM_INTERFACE
+from .history_cache_service import HistoryCacheServiceProvider
+from .models import MultisigConfirmation, MultisigTransaction
+from .redis_service import RedisService
+from .safe_service import SafeService
+
+logger = getLogger(__name__)
+
+APPROVE_FUNCTION = 'approveTransactionWithParameters'
+EXEC_FUNCTION = 'execTransactionIfApproved'
+
+
+def build_function_selectors(abi: List[Dict[str, Any]],
+                             function_names: Iterable[str]) -> Dict[bytes, Tuple[str, List[str]]]:
+    """
+    :param abi: contract ABI
+    :param function_names: functions to decode
+    :return: name and input types of every function, by 4 bytes selector
+    """
+    selectors = {}
+    for function_abi in abi:
+        if function_abi.get('type') == 'function' and function_abi['name'] in function_names:
+            types = [function_input['type'] for function_input in function_abi['inputs']]
+            selector = Web3.sha3(text='{}({})'.format(function_abi['name'], ','.join(types)))[:4]
+            selectors[bytes(selector)] = (function_abi['name'], types)
+    return selectors
+
+
+# Safe functions approving or executing a multisig transaction, both with `to`, `value`, `data`, `operation` and
+# `nonce` as inputs
+SAFE_FUNCTION_SELECTORS = build_function_selectors(GNOSIS_SAFE_TEAM_INTERFACE['abi'],
+                                                   (APPROVE_FUNCTION, EXEC_FUNCTION))
+
+
+class SafeIndexerServiceProvider:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            from django.conf import settings
+            cls.instance = SafeIndexerService(RedisService().redis,
+                                              settings.SAFE_REORG_BLOCKS,
+                                              settings.SAFE_INDEXER_MAX_BLOCKS)
+        return cls.instance
+
+    @classmethod
+    def del_singleton(cls):
+        if hasattr(cls, "instance"):
+            del cls.instance
+
+
+class SafeIndexerService:
+    """
+    Indexes approvals and executions of multisig transactions of the Safes with multisig transactions not executed.
+    Safe contracts don't emit events for them, so transactions sent to the Safes are found on the blocks (retrieved
+    using batch requests) and decoded using the Safe ABI. Only blocks deeper than `reorg_blocks` are indexed, so
+    confirmations and multisig transactions updated are final
+    """
+    LAST_BLOCK_KEY = 'safe-indexer:last-block'
+
+    def __init__(self, redis, reorg_blocks: int, max_blocks: int):
+        """
+        :param redis: Redis instance
+        :param reorg_blocks: number of blocks from the current block number needed to consider a block final
+        :param max_blocks: maximum number of blocks indexed every time
+        """
+        self.redis = redis
+        self.reorg_blocks = reorg_blocks
+        self.max_blocks = max_blocks
+
+    def get_tracked_safes(self) -> Set[str]:
+        return set(MultisigTransaction.objects.filter(status=False).values_list('safe', flat=True).distinct())
+
+    @staticmethod
+    def decode_safe_transaction(transaction: Dict[str, Any],
+                                safe_addresses: Set[str]) -> Optional[Tuple[str, str, HexBytes]]:
+        """
+        :param transaction: transaction returned by web3 or by a raw `eth_getBlockByNumber`
+        :param safe_addresses: Safes indexed
+        :return: function name, Safe and contract transaction hash if transaction approves or executes a multisig
+        transaction of one of the Safes, `None` otherwise
+        """
+        if not transaction['to']:
+            return None
+
+        safe_address = Web3.toChecksumAddress(transaction['to'])
+        if safe_address not in safe_addresses:
+            return None
+
+        transaction_data = HexBytes(transaction['input'])
+        if bytes(transaction_data[:4]) not in SAFE_FUNCTION_SELECTORS:
+            return None
+
+        function_name, types = SAFE_FUNCTION_SELECTORS[bytes(transaction_data[:4])]
+        try:
+            to, value, data, operation, nonce = eth_abi.decode_abi(types, transaction_data[4:])
+        except (DecodingError, ValueError):
+            logger.warning('Cannot decode %s for transaction=%s', function_name, transaction['hash'])
+            return None
+        return function_name, safe_address, SafeService.get_hash_for_safe_tx(safe_address, to, value, data, operation,
+                                                                             nonce)
+
+    def process_blocks(self, web3_service, current_block_number: int) -> Dict[str, int]:
+        """
+        Indexes up to `max_blocks` final blocks after the last block indexed. First time only the last final block is
+        indexed. Only successful transactions are taken into account, so receipts of the transactions found are
+        retrieved. Confirmations and multisig transactions are updated using bulk queries. Headers of the blocks
+        retrieved are stored on `BlockCacheService`
+        :param web3_service: Web3Service instance, used to get the blocks and receipts
+        :param current_block_number: current block number
+        :return: number of confirmations approved and multisig transactions executed
+        """
+        to_block_number = current_block_number - self.reorg_blocks
+        last_block_number = self.redis.get(self.LAST_BLOCK_KEY)
+        from_block_number = to_block_number if last_block_number is None else int(last_block_number) + 1
+        to_block_number = min(to_block_number, from_block_number + self.max_blocks - 1)
+        counts = {APPROVE_FUNCTION: 0, EXEC_FUNCTION: 0}
+        if from_block_number > to_block_number:
+            return counts
+
+        safe_addresses = self.get_tracked_safes()
+        safe_transactions = []  # Function name, Safe, contract transaction hash, sender, hash and block timestamp
+        if safe_addresses:
+            blocks = web3_service.get_blocks(list(range(from_block_number, to_block_number + 1)),
+                                             full_transactions=True)
+            block_cache = BlockCacheServiceProvider()
+            block_cache.set_headers([block_cache.build_header(block) for block in blocks.values()],
+                                    current_block_number)
+            for block in blocks.values():
+                for transaction in block['transactions']:
+                    decoded = self.decode_safe_transaction(transaction, safe_addresses)
+                    if decoded:
+                        safe_transactions.append(decoded + (Web3.toChecksumAddress(transaction['from']),
+                                                            HexBytes(transaction['hash']).hex(),
+                                                            block['timestamp']))
+
+        if safe_transactions:
+            receipts = web3_service.get_transaction_receipts([transaction_hash for *_, transaction_hash, _
+                                                              in safe_transactions])
+            approvals = Q()
+            execution_dates = {}
+            safe_addresses_updated = set()
+            for function_name, safe_address, contract_transaction_hash, sender, transaction_hash, timestamp \
+                    in safe_transactions:
+                status = receipts[transaction_hash]['status']
+                if not (int(status, 16) if isinstance(status, str) else status):
+                    continue
+                safe_addresses_updated.add(safe_address)
+                if function_name == APPROVE_FUNCTION:
+                    approvals |= Q(contract_transaction_hash=contract_transaction_hash.hex(), owner=sender)
+                else:
+                    execution_dates.setdefault(timestamp, []).append(contract_transaction_hash.hex())
+
+            now = timezone.now()
+            if approvals:
+                counts[APPROVE_FUNCTION] = MultisigConfirmation.objects.filter(approvals, status=False).update(
+                    status=True, modified=now
+                )
+            for timestamp, contract_transaction_hashes in execution_dates.items():
+                counts[EXEC_FUNCTION] += MultisigTransaction.objects.filter(
+                    contract_transaction_hash__in=contract_transaction_hashes, status=False
+                ).update(status=True, execution_date=datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc),
+                         modified=now)
+
+            # Bulk updates don't send signals
+            history_cache = HistoryCacheServiceProvider()
+            for safe_address in safe_addresses_updated:
+                history_cache.bump_version(safe_address)
+
+        self.redis.set(self.LAST_BLOCK_KEY, to_block_number)
+        return counts
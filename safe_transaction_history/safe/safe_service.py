@@ -1,9 +1,10 @@
 from logging import getLogger
-from typing import List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import eth_abi
 from ethereum.utils import sha3
 from hexbytes import HexBytes
+from web3 import Web3
 
 from django_eth.constants import NULL_ADDRESS
 
@@ -12,9 +13,14 @@ from .contracts import (get_paying_proxy_contract,
                         get_safe_team_contract)
 from .ethereum_service import EthereumServiceProvider
 from .safe_creation_tx import SafeCreationTx
+from .signature_verifier import (SignatureJob, check_signatures,
+                                 check_signatures_batch)
 
 logger = getLogger(__name__)
 
+# safe_address, to, value, data, operation and nonce
+SafeTx = Tuple[str, Optional[str], int, Optional[bytes], int, int]
+
 
 class InvalidMultisigTx(Exception):
     pass
@@ -28,6 +34,10 @@ class InvalidMasterCopyAddress(Exception):
     pass
 
 
+class SafeNotDeployed(ValueError):
+    pass
+
+
 class SafeServiceProvider:
     def __new__(cls):
         if not hasattr(cls, 'instance'):
@@ -35,7 +45,8 @@ class SafeServiceProvider:
             cls.instance = SafeService(settings.SAFE_TEAM_CONTRACT_ADDRESS,
                                        settings.SAFE_TEAM_VALID_CONTRACT_ADDRESSES,
                                        settings.SAFE_TX_SENDER_PRIVATE_KEY,
-                                       settings.SAFE_FUNDER_PRIVATE_KEY)
+                                       settings.SAFE_FUNDER_PRIVATE_KEY,
+                                       settings.SAFE_SIGNATURE_VERIFIER_MAX_WORKERS)
         return cls.instance
 
     @classmethod
@@ -46,13 +57,15 @@ class SafeServiceProvider:
 
 class SafeService:
     def __init__(self, master_copy_address: str, valid_master_copy_addresses: List[str],
-                 tx_sender_private_key: str=None, funder_private_key: str=None):
+                 tx_sender_private_key: str=None, funder_private_key: str=None,
+                 signature_verifier_max_workers: int=1):
         self.ethereum_service = EthereumServiceProvider()
         self.w3 = self.ethereum_service.w3
         self.master_copy_address = master_copy_address
         self.valid_master_copy_addresses = valid_master_copy_addresses
         self.tx_sender_private_key = tx_sender_private_key
         self.funder_private_key = funder_private_key
+        self.signature_verifier_max_workers = signature_verifier_max_workers
         if self.funder_private_key:
             self.funder_address = self.ethereum_service.private_key_to_address(self.funder_private_key)
         else:
@@ -155,6 +168,61 @@ class SafeService:
     def retrieve_threshold(self, safe_address) -> int:
         return self.get_contract(safe_address).functions.getThreshold().call()
 
+    def retrieve_owners(self, safe_address) -> List[str]:
+        return self.get_contract(safe_address).functions.getOwners().call()
+
+    def build_owners_requests(self, safe_address: str) -> List[Dict[str, Any]]:
+        """
+        Builds JSON-RPC requests to retrieve the owners and threshold of a Safe, so they can be sent using
+        `EthereumService.batch_request`
+        :return: `getOwners` and `getThreshold` `eth_call` requests
+        """
+        safe_contract = self.get_contract(safe_address)
+        return [
+            self.ethereum_service.build_call_request(safe_address, safe_contract.encodeABI(fn_name=fn_name))
+            for fn_name in ('getOwners', 'getThreshold')
+        ]
+
+    @staticmethod
+    def decode_owners(results: List[Optional[str]]) -> Tuple[List[str], int]:
+        """
+        :param results: results of the requests built by `build_owners_requests`
+        :return: owners (checksumed) and threshold of the Safe
+        :raises IOError: if node returned an error
+        :raises SafeNotDeployed: if node returned no data (no Safe deployed on the address)
+        """
+        owners_result, threshold_result = results
+        if owners_result is None or threshold_result is None:
+            raise IOError('Cannot retrieve owners from node')
+        if owners_result == '0x' or threshold_result == '0x':
+            raise SafeNotDeployed('No Safe deployed')
+        owners = eth_abi.decode_single('address[]', HexBytes(owners_result))
+        threshold = eth_abi.decode_single('uint256', HexBytes(threshold_result))
+        return [Web3.toChecksumAddress(owner) for owner in owners], threshold
+
+    def build_approval_status_requests(self, safe_address: str, contract_transaction_hash: bytes,
+                                       owner: str) -> List[Dict[str, Any]]:
+        """
+        Builds JSON-RPC requests to check whether `contract_transaction_hash` was approved by an owner or executed,
+        so they can be sent using `EthereumService.batch_request`. Owners are checked using `OwnerCacheService`
+        :return: `isApproved` and `isExecuted` `eth_call` requests
+        """
+        safe_contract = self.get_contract(safe_address)
+        return [
+            self.ethereum_service.build_call_request(safe_address, call_data) for call_data in (
+                safe_contract.encodeABI(fn_name='isApproved', args=[contract_transaction_hash, owner]),
+                safe_contract.encodeABI(fn_name='isExecuted', args=[contract_transaction_hash]),
+            )
+        ]
+
+    def decode_approval_status(self, results: List[Optional[str]]) -> bool:
+        """
+        :param results: results of the requests built by `build_approval_status_requests`
+        :return: `True` if transaction was approved by the owner or executed
+        """
+        is_approved, is_executed = [self.ethereum_service.decode_bool(result) for result in results]
+        return is_approved or is_executed
+
     def estimate_tx_gas(self, safe_address: str, to: str, value: int, data: bytes, operation: int) -> int:
         try:
             self.get_contract(safe_address).functions.requiredTxGas(
@@ -283,32 +351,53 @@ class SafeService:
 
         return self.w3.eth.sendRawTransaction(tx_signed.rawTransaction), tx
 
-    @staticmethod
-    def get_hash_for_safe_tx(safe_address: str, to: str, value: int, data: bytes,
+    @classmethod
+    def get_hash_for_safe_tx(cls, safe_address: str, to: str, value: int, data: bytes,
                              operation: int, nonce: int) -> HexBytes:
+        return cls.get_hashes_for_safe_txs([(safe_address, to, value, data, operation, nonce)])[0]
 
-        data = data or b''
-        to = to or NULL_ADDRESS
-
-        data_bytes = (
-                bytes.fromhex('19') +
-                bytes.fromhex('00') +
-                HexBytes(safe_address) +
-                HexBytes(to) +
-                eth_abi.encode_single('uint256', value) +
-                data +  # Data is always zero-padded to be even on solidity. So, 0x1 becomes 0x01
-                operation.to_bytes(1, byteorder='big') +  # abi.encodePacked packs it on 1 byte
-                eth_abi.encode_single('uint256', nonce)
-        )
-
-        return HexBytes(sha3(data_bytes))
-
-    def check_hash(self, tx_hash: str, signatures: bytes, owners: List[str]) -> bool:
-        for i, owner in enumerate(sorted(owners, key=lambda x: x.lower())):
-            v, r, s = self.signature_split(signatures, i)
-            if self.ethereum_service.get_signing_address(tx_hash, v, r, s) != owner:
-                return False
-        return True
+    @staticmethod
+    def get_hashes_for_safe_txs(safe_txs: Iterable[SafeTx]) -> List[HexBytes]:
+        """
+        Hashes many safe transactions at once. Fields are packed the same way `abi.encodePacked` does on the
+        contract, using `int.to_bytes` instead of `eth_abi` encoding
+        :param safe_txs: tuples of `safe_address`, `to`, `value`, `data`, `operation` and `nonce`
+        :return: hash of every safe transaction, in the same order
+        :raises ValueError: if `value` or `nonce` are not valid `uint256` or an address is not valid hex
+        """
+        def address_to_bytes(address) -> bytes:
+            if isinstance(address, str):
+                return bytes.fromhex(address[2:] if address.startswith('0x') else address)
+            return bytes(address)
+
+        prefix = b'\x19\x00'
+        null_address = address_to_bytes(NULL_ADDRESS)
+        hashes = []
+        for safe_address, to, value, data, operation, nonce in safe_txs:
+            try:
+                hashes.append(HexBytes(sha3(b''.join((
+                    prefix,
+                    address_to_bytes(safe_address),
+                    address_to_bytes(to) if to else null_address,
+                    value.to_bytes(32, byteorder='big'),
+                    data or b'',  # Data is always zero-padded to be even on solidity. So, 0x1 becomes 0x01
+                    operation.to_bytes(1, byteorder='big'),  # abi.encodePacked packs it on 1 byte
+                    nonce.to_bytes(32, byteorder='big'),
+                )))))
+            except OverflowError as exc:
+                raise ValueError('Value or nonce is not a valid uint256') from exc
+        return hashes
+
+    def check_hash(self, tx_hash: bytes, signatures: bytes, owners: List[str]) -> bool:
+        return check_signatures(tx_hash, signatures, owners)
+
+    def check_hashes(self, jobs: List[SignatureJob]) -> List[bool]:
+        """
+        Same as `check_hash` for many hashes, verified on a process pool of `signature_verifier_max_workers`
+        :param jobs: tuples of `tx_hash`, `signatures` and `owners`
+        :return: result of every job, in the same order
+        """
+        return check_signatures_batch(jobs, self.signature_verifier_max_workers)
 
     @staticmethod
     def signature_split(signatures: bytes, pos: int) -> Tuple[int, int, int]:
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.db.models import Prefetch
 from ethereum.utils import check_checksum
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
@@ -6,7 +7,9 @@ from rest_framework.exceptions import ValidationError
 from django_eth.serializers import (EthereumAddressField, HexadecimalField,
                                     Sha3HashField)
 
-from .models import MultisigConfirmation, MultisigTransaction
+from .filters import DefaultPagination
+from .models import (MultisigConfirmation, MultisigConfirmationSubmission,
+                     MultisigTransaction)
 from .safe_service import SafeServiceProvider
 
 
@@ -35,6 +38,18 @@ class SafeMultisigConfirmationSerializer(serializers.ModelSerializer):
         return obj.created
 
 
+class MultisigConfirmationSubmissionSerializer(serializers.ModelSerializer):
+    submission_date = serializers.SerializerMethodField()
+
+    class Meta:
+        model = MultisigConfirmationSubmission
+        fields = ('safe', 'submission_date', 'contract_transaction_hash', 'transaction_hash', 'sender', 'type',
+                  'status', 'error',)
+
+    def get_submission_date(self, obj):
+        return obj.created
+
+
 class BaseSafeMultisigTransactionSerializer(serializers.Serializer):
     to = EthereumAddressField()
     value = serializers.IntegerField(min_value=0)
@@ -43,13 +58,14 @@ class BaseSafeMultisigTransactionSerializer(serializers.Serializer):
     nonce = serializers.IntegerField(allow_null=True, min_value=0)
 
 
-class SafeMultisigTransactionSerializer(BaseSafeMultisigTransactionSerializer):
+class BaseSafeMultisigConfirmationSerializer(BaseSafeMultisigTransactionSerializer):
+    """
+    Validates a confirmation without using the node, `contract_transaction_hash` is calculated locally
+    """
     safe = EthereumAddressField()
     contract_transaction_hash = Sha3HashField()
     transaction_hash = Sha3HashField()
     sender = EthereumAddressField()
-    block_number = serializers.IntegerField()
-    block_date_time = serializers.DateTimeField()
     type = serializers.ChoiceField(settings.SAFE_TRANSACTION_TYPES)
 
     def validate(self, data):
@@ -75,15 +91,21 @@ class SafeMultisigTransactionSerializer(BaseSafeMultisigTransactionSerializer):
 
         return data
 
+
+class SafeMultisigTransactionSerializer(BaseSafeMultisigConfirmationSerializer):
+    block_number = serializers.IntegerField()
+    block_date_time = serializers.DateTimeField()
+
     def save(self, **kwargs):
-        multisig_instance, _ = MultisigTransaction.objects.get_or_create(
+        multisig_instance = MultisigTransaction.objects.upsert(MultisigTransaction(
             safe=self.validated_data['safe'],
             to=self.validated_data['to'],
             value=self.validated_data['value'],
             data=self.validated_data['data'],
             operation=self.validated_data['operation'],
-            nonce=self.validated_data['nonce']
-        )
+            nonce=self.validated_data['nonce'],
+            contract_transaction_hash=self.validated_data['contract_transaction_hash']
+        ))
 
         # Confirmation Transaction
         confirmation_instance = MultisigConfirmation.objects.create(
@@ -122,15 +144,41 @@ class SafeMultisigHistorySerializer(BaseSafeMultisigTransactionSerializer):
     def get_is_executed(self, obj):
         return obj.status
 
+    @staticmethod
+    def get_confirmations_prefetch(owners=None) -> Prefetch:
+        """
+        Builds the prefetch for the `confirmations` of a MultisigTransaction queryset, so confirmations for a whole
+        page are retrieved using just one query
+        :param owners: if provided, only confirmations from these owners are prefetched
+        :return: Prefetch object for the `confirmations` relation
+        """
+        confirmations = MultisigConfirmation.objects.all()
+        if owners:
+            confirmations = confirmations.filter(owner__in=owners)
+        return Prefetch('confirmations', queryset=confirmations)
+
     def get_confirmations(self, obj):
         """
-        Filters confirmations queryset
-        :param obj: MultisigConfirmation instance
+        Filters confirmations queryset. It relies on confirmations being prefetched using
+        `get_confirmations_prefetch`, if not one query per MultisigTransaction will be done
+        :param obj: MultisigTransaction instance
         :return: serialized queryset
         """
+        confirmations = obj.confirmations.all()
         if self.owners:
-            confirmations = MultisigConfirmation.objects.filter(owner__in=self.owners, multisig_transaction=obj.id)
-        else:
-            confirmations = MultisigConfirmation.objects.filter(multisig_transaction=obj.id)
+            confirmations = [confirmation for confirmation in confirmations if confirmation.owner in self.owners]
 
         return SafeMultisigConfirmationSerializer(confirmations, many=True).data
+
+
+class SafeMultisigHistoryBatchSerializer(serializers.Serializer):
+    safes = serializers.ListField(child=serializers.CharField(), min_length=1,
+                                  max_length=settings.SAFE_HISTORY_BATCH_MAX_SAFES)
+    owners = serializers.ListField(child=serializers.CharField(), required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=DefaultPagination.max_limit,
+                                     default=DefaultPagination.default_limit)
+
+
+class SafeMultisigConfirmationBulkSerializer(serializers.Serializer):
+    confirmations = serializers.ListField(child=serializers.DictField(), min_length=1,
+                                          max_length=settings.SAFE_CONFIRMATIONS_BULK_MAX)
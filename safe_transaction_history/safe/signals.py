@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .history_cache_service import HistoryCacheServiceProvider
+from .models import MultisigConfirmation, MultisigTransaction
+
+
+@receiver([post_save, post_delete], sender=MultisigTransaction)
+def invalidate_multisig_transaction_history(sender, instance: MultisigTransaction, **kwargs):
+    HistoryCacheServiceProvider().bump_version(instance.safe)
+
+
+@receiver([post_save, post_delete], sender=MultisigConfirmation)
+def invalidate_multisig_confirmation_history(sender, instance: MultisigConfirmation, **kwargs):
+    HistoryCacheServiceProvider().bump_version(instance.multisig_transaction.safe)
@@ -0,0 +1,63 @@
+"""
+Verification of owner signatures for safe transaction hashes. Recovering addresses is CPU bound, so many
+verifications are distributed to a process pool
+"""
+import concurrent.futures
+from typing import List, Sequence, Tuple
+
+from ethereum.utils import ecrecover_to_pub, sha3
+
+# tx_hash, signatures ({bytes32 r}{bytes32 s}{uint8 v} for every owner) and owners
+SignatureJob = Tuple[bytes, bytes, Sequence[str]]
+
+MIN_JOBS_PER_WORKER = 100  # Pool is not worth it for less jobs
+
+
+def address_to_bytes(address: str) -> bytes:
+    """
+    :param address: address starting by 0x, checksumed or not
+    :return: raw 20 bytes address
+    """
+    return bytes.fromhex(address[2:])
+
+
+def check_signatures(tx_hash: bytes, signatures: bytes, owners: Sequence[str]) -> bool:
+    """
+    Recovers the signer of every signature and compares it with the owner in the same position (owners are sorted
+    the same way the contract does). Raw 20 bytes addresses are compared, so no checksum encoding is done
+    :return: `True` if every owner signed `tx_hash`. It returns as soon as a signature doesn't match
+    """
+    if len(signatures) < 65 * len(owners):
+        return False
+
+    for i, owner in enumerate(sorted(owners, key=lambda x: x.lower())):
+        signature_pos = 65 * i
+        v = signatures[64 + signature_pos]
+        r = int.from_bytes(signatures[signature_pos:32 + signature_pos], 'big')
+        s = int.from_bytes(signatures[32 + signature_pos:64 + signature_pos], 'big')
+        try:
+            signer = sha3(ecrecover_to_pub(tx_hash, v, r, s))[-20:]
+        except ValueError:  # Not valid signature
+            return False
+        if signer != address_to_bytes(owner):
+            return False
+    return True
+
+
+def _check_signatures_job(job: SignatureJob) -> bool:
+    return check_signatures(*job)
+
+
+def check_signatures_batch(jobs: List[SignatureJob], max_workers: int) -> List[bool]:
+    """
+    Same as `check_signatures` for many jobs. If there are enough jobs they are verified by a process pool
+    :param jobs: tuples of `tx_hash`, `signatures` and `owners`
+    :param max_workers: maximum number of processes of the pool, 1 or less verifies everything in this process
+    :return: result of every job, in the same order
+    """
+    workers = min(max_workers, len(jobs) // MIN_JOBS_PER_WORKER)
+    if workers <= 1:
+        return [check_signatures(*job) for job in jobs]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_check_signatures_job, jobs, chunksize=-(-len(jobs) // (workers * 4))))
@@ -1,12 +1,27 @@
+from typing import Dict, List, Optional
+
 from celery import app
 from celery.utils.log import get_task_logger
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from eth_abi import decoding
+from redis.exceptions import RedisError
 
+from ..ether.web3_service import Web3Service
+from .chain_head_service import ChainHeadServiceProvider
+from .confirmations import (CONFIRMATION_APPROVED, CONFIRMATION_PENDING,
+                            CONFIRMATION_REORGED, TRANSACTION_NOT_MINED_ERROR,
+                            get_check_delay, get_confirmation_decision,
+                            is_check_expired, recheck_confirmations_after_fork,
+                            reconcile_confirmations, save_confirmations,
+                            validate_confirmations_on_chain)
 from .contracts import get_safe_team_contract
 from .ethereum_service import EthereumServiceProvider
-from .models import MultisigConfirmation
+from .models import MultisigConfirmation, MultisigConfirmationSubmission
+from .owner_cache_service import OwnerCacheServiceProvider
+from .redis_service import RedisService
+from .safe_indexer_service import SafeIndexerServiceProvider
 
 logger = get_task_logger(__name__)
 
@@ -14,6 +29,19 @@ ethereum_service = EthereumServiceProvider()
 
 
 COUNTDOWN = 60  # seconds
+NODE_ERROR_MAX_RETRIES = 3
+RECONCILE_TIMEOUT = 5 * 60  # seconds
+RECONCILE_LAST_BLOCK_KEY = 'safe-confirmations:reconciled-block'
+RECONCILE_LOCK_KEY = 'safe-confirmations:reconcile-lock'
+# Check requests of a multisig transaction since its `check_multisig_transaction` task was scheduled
+IN_FLIGHT_KEY = 'safe-confirmations:in-flight:{}:{}'
+# Deletes the in-flight key only if no requests arrived while checking
+RELEASE_IN_FLIGHT_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
 
 def read_data_from_stream(self, stream):
@@ -24,94 +52,265 @@ def read_data_from_stream(self, stream):
 decoding.Fixed32ByteSizeDecoder.read_data_from_stream = read_data_from_stream
 
 
-@app.shared_task(bind=True)
-def check_approve_transaction(self, safe_address: str, contract_transaction_hash: str,
-                              transaction_hash: str, owner: str, retry: bool=True) -> None:
+def check_approve_confirmation(safe_address: str, contract_transaction_hash: str, transaction_hash: str,
+                               owner: str) -> Optional[int]:
+    """
+    Updates the status of a confirmation and its multisig transaction using the node, deletes it if it was reorged.
+    Node is not queried until the block number scheduled for the next check, and confirmations pending after
+    `SAFE_CONFIRMATIONS_MAX_AGE_BLOCKS` are abandoned
+    :return: `None` if confirmation is settled or abandoned, number of blocks to wait before checking it again if not
+    """
+    current_block_number = ChainHeadServiceProvider().get_current_block_number()
+    try:
+        multisig_confirmation = MultisigConfirmation.objects.get(contract_transaction_hash=contract_transaction_hash,
+                                                                 owner=owner, transaction_hash=transaction_hash)
+    except MultisigConfirmation.DoesNotExist:
+        # TODO decide what todo in this case
+        return None
+
+    if multisig_confirmation.abandoned:
+        return None
+    elif current_block_number < multisig_confirmation.next_check_block_number:
+        return multisig_confirmation.next_check_block_number - current_block_number
+
     w3 = ethereum_service.w3  # Web3 instance
     safe_contract = get_safe_team_contract(w3, safe_address)
+    block_identifier = current_block_number - settings.SAFE_REORG_BLOCKS
+
+    is_executed_latest = safe_contract.functions.isExecuted(
+        multisig_confirmation.contract_transaction_hash
+    ).call(block_identifier='latest')
+    # is_executed_prev = safe_contract.functions.isExecuted(multisig_confirmation.contract_transaction_hash).call(
+    #    block_identifier=block_identifier)
+
+    is_approved_latest = safe_contract.functions.isApproved(
+        contract_transaction_hash, multisig_confirmation.owner
+    ).call(block_identifier='latest')
+
+    is_approved_prev = safe_contract.functions.isApproved(
+        contract_transaction_hash, multisig_confirmation.owner
+    ).call(block_identifier=block_identifier)
+
+    transaction_data = ethereum_service.get_transaction(transaction_hash)
+
+    decision = get_confirmation_decision(multisig_confirmation.block_number, bool(transaction_data),
+                                         transaction_data and transaction_data['blockNumber'],
+                                         is_executed_latest, is_approved_latest, is_approved_prev,
+                                         current_block_number, settings.SAFE_REORG_BLOCKS)
+    if decision == CONFIRMATION_PENDING:
+        # Updated without sending signals, history doesn't change
+        confirmations = MultisigConfirmation.objects.filter(pk=multisig_confirmation.pk)
+        if is_check_expired(multisig_confirmation.block_number, current_block_number,
+                            settings.SAFE_CONFIRMATIONS_MAX_AGE_BLOCKS):
+            logger.warning('Confirmation with transaction-hash=%s abandoned', transaction_hash)
+            confirmations.update(abandoned=True, modified=timezone.now())
+            return None
 
-    block_identifier = ethereum_service.current_block_number - settings.SAFE_REORG_BLOCKS
+        check_attempts = multisig_confirmation.check_attempts + 1
+        delay = get_check_delay(check_attempts, settings.SAFE_REORG_BLOCKS)
+        confirmations.update(check_attempts=check_attempts, next_check_block_number=current_block_number + delay)
+        return delay
+    elif decision == CONFIRMATION_REORGED:
+        multisig_confirmation.delete()
+        return None
+
+    if decision == CONFIRMATION_APPROVED:
+        multisig_confirmation.status = is_approved_latest
+        multisig_confirmation.save()
+
+    if is_executed_latest:
+        # Check if multisig transaction executed
+        multisig_transaction = multisig_confirmation.multisig_transaction
+        if not multisig_transaction.status:
+            multisig_transaction.status = is_executed_latest
+            multisig_transaction.execution_date = timezone.now()
+            multisig_transaction.save()
+    return None
+
+
+@app.shared_task(bind=True, max_retries=None)
+def check_approve_transaction(self, safe_address: str, contract_transaction_hash: str,
+                              transaction_hash: str, owner: str, retry: bool=True) -> None:
+    """
+    Confirmation is checked again when the blocks returned by `check_approve_confirmation` are expected to be mined,
+    until it's settled or abandoned
+    """
+    blocks = check_approve_confirmation(safe_address, contract_transaction_hash, transaction_hash, owner)
+    if blocks is not None and retry:
+        self.retry(countdown=blocks * settings.ETHEREUM_BLOCK_TIME)
+
+
+@app.shared_task
+def check_approve_transactions(confirmations: List[Dict[str, str]], retry: bool=True) -> None:
+    """
+    Deprecated, only kept for tasks queued before confirmations were checked by `check_multisig_transaction`. Their
+    multisig transactions are scheduled using `schedule_multisig_transaction_check`
+    :param confirmations: list of dictionaries with `safe_address`, `contract_transaction_hash`, `transaction_hash`
+    and `owner`
+    :param retry: ignored
+    """
+    for safe_address, contract_transaction_hash in {(confirmation['safe_address'],
+                                                     confirmation['contract_transaction_hash'])
+                                                    for confirmation in confirmations}:
+        schedule_multisig_transaction_check(safe_address, contract_transaction_hash)
+
+
+def schedule_multisig_transaction_check(safe_address: str, contract_transaction_hash: str) -> bool:
+    """
+    Schedules `check_multisig_transaction` for a new confirmation, at most one task is in flight for every multisig
+    transaction. If a task is already scheduled or running the request is counted, and the running task checks the
+    multisig transaction again before finishing
+    :return: `True` if a task was scheduled, `False` if the request piggybacks on the task in flight
+    """
+    key = IN_FLIGHT_KEY.format(safe_address, contract_transaction_hash)
     try:
-        multisig_confirmation = MultisigConfirmation.objects.get(contract_transaction_hash=contract_transaction_hash,
-                                                                 owner=owner, transaction_hash=transaction_hash)
+        # Expiration is only set by the first request, so a key left by a lost task always expires
+        pipe = RedisService().redis.pipeline()
+        pipe.set(key, 0, ex=RECONCILE_TIMEOUT, nx=True)
+        pipe.incr(key)
+        _, requests = pipe.execute()
+    except RedisError:
+        logger.warning('Cannot check in-flight task for contract-transaction-hash=%s', contract_transaction_hash,
+                       exc_info=True)
+        requests = 1
 
-        is_executed_latest = safe_contract.functions.isExecuted(
-            multisig_confirmation.contract_transaction_hash
-        ).call(block_identifier='latest')
-        # is_executed_prev = safe_contract.functions.isExecuted(multisig_confirmation.contract_transaction_hash).call(
-        #    block_identifier=block_identifier)
-
-        is_approved_latest = safe_contract.functions.isApproved(
-            contract_transaction_hash, multisig_confirmation.owner
-        ).call(block_identifier='latest')
-
-        is_approved_prev = safe_contract.functions.isApproved(
-            contract_transaction_hash, multisig_confirmation.owner
-        ).call(block_identifier=block_identifier)
-
-        transaction_data = ethereum_service.get_transaction(transaction_hash)
-
-        if transaction_data and transaction_data['blockNumber'] == multisig_confirmation.block_number:
-            # ok
-            if not is_approved_latest and is_executed_latest:
-                # Check if multisig transaction executed
-                multisig_transaction = multisig_confirmation.multisig_transaction
-                if not multisig_transaction.status:
-                    multisig_transaction.status = is_executed_latest
-                    multisig_transaction.execution_date = timezone.now()
-                    multisig_transaction.save()
-                return
-            elif is_approved_latest:
-                multisig_confirmation.status = is_approved_latest
-                multisig_confirmation.save()
-
-                if is_executed_latest:
-                    # Check if multisig transaction executed
-                    multisig_transaction = multisig_confirmation.multisig_transaction
-                    if not multisig_transaction.status:
-                        multisig_transaction.status = is_executed_latest
-                        multisig_transaction.execution_date = timezone.now()
-                        multisig_transaction.save()
-                return
-        elif transaction_data and transaction_data['blockNumber'] != multisig_confirmation.block_number:
-            # check reorg
-            if is_approved_prev and not is_approved_latest and not is_executed_latest:
-                # reorg, multisig transaction not executed, also confirmation not approved either before and after
-                # blocks check.
-                # delete confirmation
-                multisig_confirmation.delete()
-                return
-            # case with wrong blockNumber and multisig transaction executed (which sets attrs to 0)
-            elif not is_approved_latest and is_executed_latest:
-                # Check if multisig transaction executed
-                multisig_transaction = multisig_confirmation.multisig_transaction
-                if not multisig_transaction.status:
-                    multisig_transaction.status = is_executed_latest
-                    multisig_transaction.execution_date = timezone.now()
-                    multisig_transaction.save()
-                return
-            # case with multisig transaction not executed and approval True
-            elif is_approved_latest:
-                multisig_confirmation.status = is_approved_latest
-                multisig_confirmation.save()
-
-                if is_executed_latest:
-                    # Check if multisig transaction executed
-                    multisig_transaction = multisig_confirmation.multisig_transaction
-                    if not multisig_transaction.status:
-                        multisig_transaction.status = is_executed_latest
-                        multisig_transaction.execution_date = timezone.now()
-                        multisig_transaction.save()
-                return
-        elif not transaction_data:
-            # Check if more then X blocks have passed from the block number the transaction was created in DB
-            if ethereum_service.current_block_number - multisig_confirmation.block_number > settings.SAFE_REORG_BLOCKS:
-                # reorg, delete confirmation
-                multisig_confirmation.delete()
+    if requests == 1:
+        check_multisig_transaction.delay(safe_address, contract_transaction_hash)
+        return True
+    return False
+
+
+@app.shared_task(soft_time_limit=RECONCILE_TIMEOUT)
+def check_multisig_transaction(safe_address: str, contract_transaction_hash: str) -> None:
+    """
+    Checks every unresolved confirmation of a multisig transaction in one pass using `reconcile_confirmations`,
+    scheduled by `schedule_multisig_transaction_check`. It's repeated while new requests arrive, confirmations still
+    pending are checked by `reconcile_pending_confirmations`. If it fails the in-flight key is deleted, so new
+    requests schedule a new task
+    """
+    redis = RedisService().redis
+    key = IN_FLIGHT_KEY.format(safe_address, contract_transaction_hash)
+    release_in_flight = redis.register_script(RELEASE_IN_FLIGHT_SCRIPT)
+    try:
+        while True:
+            requests = redis.get(key)
+            current_block_number = ChainHeadServiceProvider().get_current_block_number()
+            counts = reconcile_confirmations(current_block_number, settings.SAFE_REORG_BLOCKS,
+                                             settings.SAFE_CONFIRMATIONS_MAX_AGE_BLOCKS,
+                                             settings.SAFE_CONFIRMATIONS_RECONCILE_CHUNK_SIZE,
+                                             safe_address=safe_address,
+                                             contract_transaction_hash=contract_transaction_hash)
+            logger.info('Confirmations checked for contract-transaction-hash=%s: %s', contract_transaction_hash,
+                        counts)
+            if requests is None or release_in_flight(keys=[key], args=[requests]):
                 return
+    except Exception:
+        redis.delete(key)
+        raise
 
-        if retry:
-            self.retry(countdown=COUNTDOWN)
-    except MultisigConfirmation.DoesNotExist:
-        # TODO decide what todo in this case
+
+@app.shared_task(bind=True, max_retries=None)
+def validate_confirmation_submission(self, submission_id: int, retry: bool=True, node_errors: int=0) -> None:
+    """
+    Validates on-chain a confirmation submitted using the asynchronous mode. If valid the confirmation is stored
+    and checked by `check_multisig_transaction`, if not it's rejected. If node is not available it's retried up to
+    `NODE_ERROR_MAX_RETRIES` times, and rejected when retries are exhausted. If the transaction is not mined yet it's
+    validated again on the next block, until it's mined or dropped by the node (then it's rejected as not found)
+    :param submission_id: id of the `MultisigConfirmationSubmission`
+    :param node_errors: number of retries done because of node errors
+    """
+    try:
+        submission = MultisigConfirmationSubmission.objects.get(pk=submission_id,
+                                                                status=MultisigConfirmationSubmission.PENDING)
+    except MultisigConfirmationSubmission.DoesNotExist:
+        logger.warning('Pending confirmation submission with id=%d was not found', submission_id)
+        return
+
+    confirmation = submission.get_confirmation_data()
+    try:
+        error, = validate_confirmations_on_chain([confirmation])
+    except (IOError, ValueError):
+        if retry and node_errors < NODE_ERROR_MAX_RETRIES:
+            raise self.retry(countdown=COUNTDOWN, args=(submission_id,),
+                             kwargs={'retry': retry, 'node_errors': node_errors + 1})
+        error = (None, 'Cannot get info from node')
+
+    if error == TRANSACTION_NOT_MINED_ERROR and retry:
+        raise self.retry(countdown=settings.ETHEREUM_BLOCK_TIME)
+
+    if error:
+        submission.status = MultisigConfirmationSubmission.REJECTED
+        submission.error = error[1]
+        submission.save(update_fields=['status', 'error', 'modified'])
         return
+
+    with transaction.atomic():
+        submission.multisig_confirmation, = save_confirmations([confirmation])
+        submission.status = MultisigConfirmationSubmission.ACCEPTED
+        submission.save(update_fields=['status', 'multisig_confirmation', 'modified'])
+        transaction.on_commit(lambda: schedule_multisig_transaction_check(
+            submission.safe, confirmation['contract_transaction_hash'].hex()
+        ))
+
+
+@app.shared_task(soft_time_limit=60)
+def process_owner_changes() -> None:
+    """
+    Invalidates the cached owners of Safes with transactions changing their owners or threshold on the new blocks
+    """
+    current_block_number = ChainHeadServiceProvider().get_current_block_number()
+    safe_addresses = OwnerCacheServiceProvider().process_owner_changes(Web3Service(), current_block_number)
+    if safe_addresses:
+        logger.info('Owners cache invalidated for safes=%s', safe_addresses)
+
+
+@app.shared_task(soft_time_limit=60)
+def index_safe_transactions() -> None:
+    """
+    Indexes approvals and executions of multisig transactions on the new final blocks
+    """
+    current_block_number = ChainHeadServiceProvider().get_current_block_number()
+    counts = SafeIndexerServiceProvider().process_blocks(Web3Service(), current_block_number)
+    if any(counts.values()):
+        logger.info('Safe transactions indexed: %s', counts)
+
+
+@app.shared_task(soft_time_limit=RECONCILE_TIMEOUT)
+def reconcile_pending_confirmations() -> None:
+    """
+    Checks every unresolved confirmation using `reconcile_confirmations`, only once per new block. Runs are not
+    overlapped
+    """
+    redis = RedisService().redis
+    current_block_number = ChainHeadServiceProvider().get_current_block_number()
+    last_block_number = redis.get(RECONCILE_LAST_BLOCK_KEY)
+    if last_block_number is not None and int(last_block_number) >= current_block_number:
+        return
+
+    lock = redis.lock(RECONCILE_LOCK_KEY, timeout=RECONCILE_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        logger.info('Confirmations are already being reconciled')
+        return
+
+    try:
+        counts = reconcile_confirmations(current_block_number, settings.SAFE_REORG_BLOCKS,
+                                         settings.SAFE_CONFIRMATIONS_MAX_AGE_BLOCKS,
+                                         settings.SAFE_CONFIRMATIONS_RECONCILE_CHUNK_SIZE)
+        redis.set(RECONCILE_LAST_BLOCK_KEY, current_block_number)
+        logger.info('Confirmations reconciled for block-number=%d: %s', current_block_number, counts)
+    finally:
+        lock.release()
+
+
+@app.shared_task(soft_time_limit=60)
+def track_chain_head() -> None:
+    """
+    Updates the chain head shared by the workers. If a reorg is detected confirmations after the fork point are
+    checked again by `reconcile_pending_confirmations`, even if the new head is not higher
+    """
+    fork_block_number = ChainHeadServiceProvider().update()
+    if fork_block_number is not None:
+        RedisService().redis.delete(RECONCILE_LAST_BLOCK_KEY)
+        confirmations = recheck_confirmations_after_fork(fork_block_number)
+        logger.warning('%d confirmations will be checked again after reorg from block-number=%d', confirmations,
+                       fork_block_number)
@@ -46,6 +46,7 @@ class MultisigTransactionFactory(factory_boy.DjangoModelFactory):
     operation = FuzzyInteger(low=0, high=3)
     nonce = FuzzyInteger(low=0, high=10)
     status = False
+    contract_transaction_hash = factory_boy.Sequence(lambda n: '{:064x}'.format(n))
 
 
 class MultisigTransactionConfirmationFactory(factory_boy.DjangoModelFactory):
@@ -0,0 +1,60 @@
+import os
+from random import randint
+
+from django.test import TestCase
+
+from ..block_cache_service import BlockCacheService
+from ..redis_service import RedisService
+
+
+class TestBlockCacheService(TestCase):
+
+    def setUp(self):
+        self.redis = RedisService().redis
+        self.block_cache = BlockCacheService(self.redis, reorg_blocks=10, max_size=2)
+        self.block_number = randint(10 ** 9, 10 ** 10)
+        self.addCleanup(self.redis.delete, *[self.block_cache.HEADER_KEY.format(self.block_number + i)
+                                             for i in range(3)])
+
+    def build_block(self, block_number: int):
+        return {'number': hex(block_number), 'hash': '0x' + os.urandom(32).hex(),
+                'parentHash': '0x' + os.urandom(32).hex(), 'timestamp': '0x5b7c0000'}
+
+    def test_final_header(self):
+        header = self.block_cache.build_header(self.build_block(self.block_number))
+        self.assertEqual(header['number'], self.block_number)
+        self.assertEqual(header['timestamp'], 0x5b7c0000)
+
+        self.assertIsNone(self.block_cache.get_header(self.block_number))
+        self.assertTrue(self.block_cache.set_header(header, self.block_number + 10)['final'])
+        self.assertIsNone(self.redis.ttl(self.block_cache.HEADER_KEY.format(self.block_number)))
+        self.assertEqual(self.block_cache.get_header(self.block_number)['hash'], header['hash'])
+
+        # Header is shared using Redis
+        other_block_cache = BlockCacheService(self.redis, reorg_blocks=10, max_size=2)
+        self.assertEqual(other_block_cache.get_header(self.block_number, block_hash='0x' + '0' * 64),
+                         self.block_cache.get_header(self.block_number))
+
+    def test_recent_header(self):
+        header = self.block_cache.build_header(self.build_block(self.block_number))
+        self.assertFalse(self.block_cache.set_header(header, self.block_number + 9)['final'])
+        self.assertGreater(self.redis.ttl(self.block_cache.HEADER_KEY.format(self.block_number)), 0)
+
+        # Headers within reorg depth are only returned if hash matches
+        self.assertIsNone(self.block_cache.get_header(self.block_number))
+        self.assertIsNone(self.block_cache.get_header(self.block_number, block_hash='0x' + '0' * 64))
+        self.assertEqual(self.block_cache.get_header(self.block_number, block_hash=header['hash'])['timestamp'],
+                         header['timestamp'])
+
+        # When they become final they are stored permanently
+        self.block_cache.get_header(self.block_number, block_hash=header['hash'],
+                                    current_block_number=self.block_number + 10)
+        self.assertTrue(self.block_cache.get_header(self.block_number)['final'])
+        self.assertIsNone(self.redis.ttl(self.block_cache.HEADER_KEY.format(self.block_number)))
+
+    def test_local_cache_size(self):
+        headers = [self.block_cache.build_header(self.build_block(self.block_number + i)) for i in range(3)]
+        self.block_cache.set_headers(headers, self.block_number + 100)
+        self.assertEqual(list(self.block_cache.headers), [self.block_number + 1, self.block_number + 2])
+        self.assertEqual(self.block_cache.get_header(self.block_number)['hash'], headers[0]['hash'])
+        self.assertEqual(list(self.block_cache.headers), [self.block_number + 2, self.block_number])
@@ -0,0 +1,62 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+
+from ..chain_head_service import ChainHeadService
+from ..ethereum_service import EthereumService
+from ..redis_service import RedisService
+
+
+class TestChainHeadService(TestCase):
+
+    def setUp(self):
+        self.redis = RedisService().redis
+        self.ethereum_service = mock.MagicMock(build_get_block_request=EthereumService.build_get_block_request)
+        self.chain_head = ChainHeadService(self.redis, self.ethereum_service, reorg_blocks=3, timeout=60)
+        self.addCleanup(self.redis.delete, self.chain_head.HEAD_KEY, self.chain_head.BLOCKS_KEY)
+        self.block_hashes = {}
+
+        def batch_request(rpc_requests):
+            block_numbers = [int(rpc_request['params'][0], 16) for rpc_request in rpc_requests]
+            return [{'number': hex(block_number), 'hash': self.block_hashes[block_number]}
+                    if block_number in self.block_hashes else None for block_number in block_numbers]
+        self.ethereum_service.batch_request.side_effect = batch_request
+
+    def set_chain(self, current_block_number: int, fork: str='a'):
+        self.ethereum_service.current_block_number = current_block_number
+        self.block_hashes = {block_number: '0x%s%063x' % (fork, block_number)
+                             for block_number in range(current_block_number + 1)}
+
+    def test_update(self):
+        self.set_chain(10)
+        self.assertEqual(self.chain_head.get_current_block_number(), 10)  # Not tracked, node is queried
+        self.assertIsNone(self.chain_head.get_head())
+
+        self.assertIsNone(self.chain_head.update())
+        self.assertEqual(self.chain_head.get_head(), {'number': 10, 'hash': self.block_hashes[10]})
+        self.assertEqual(self.chain_head.get_block_hashes(), {block_number: self.block_hashes[block_number]
+                                                              for block_number in (8, 9, 10)})
+        self.assertTrue(0 < self.redis.ttl(self.chain_head.HEAD_KEY) <= 60)
+
+        self.ethereum_service.current_block_number = 12
+        self.assertEqual(self.chain_head.get_current_block_number(), 10)  # Cached head
+        self.set_chain(12)
+        self.assertIsNone(self.chain_head.update())
+        self.assertEqual(set(self.chain_head.get_block_hashes()), {10, 11, 12})
+
+        # Reorg from block 11, chain is shorter
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.chain_head.REORGS_CHANNEL)
+        self.addCleanup(pubsub.close)
+        pubsub.get_message(timeout=1)  # Subscription
+        self.set_chain(11)
+        self.block_hashes[11] = '0xb%063x' % 11
+        self.assertEqual(self.chain_head.update(), 11)
+        self.assertEqual(self.chain_head.get_current_block_number(), 11)
+        message = pubsub.get_message(timeout=1)
+        self.assertEqual(json.loads(message['data'].decode()), {'fork_block_number': 11, 'block_number': 11})
+
+        self.block_hashes.pop(10)
+        with self.assertRaises(ValueError):
+            self.chain_head.update()
@@ -0,0 +1,46 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django_celery_beat.models import PeriodicTask
+
+from ..management.commands.setup_service import PERIODIC_TASKS
+from .factories import (MultisigTransactionConfirmationFactory,
+                        MultisigTransactionFactory, get_eth_address)
+
+
+class TestCommands(TestCase):
+
+    def test_export_safe_history(self):
+        safe_address = get_eth_address()
+        for nonce in range(5):
+            multisig_transaction = MultisigTransactionFactory(safe=safe_address, nonce=nonce)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction)
+
+        buf = StringIO()
+        call_command('export_safe_history', safe_address, chunk_size=2, stdout=buf)
+        lines = buf.getvalue().splitlines()
+        self.assertEquals(len(lines), 5)
+        self.assertEquals([json.loads(line)['nonce'] for line in lines], list(range(5)))
+        self.assertTrue(all(len(json.loads(line)['confirmations']) == 1 for line in lines))
+
+        buf = StringIO()
+        call_command('export_safe_history', safe_address, format='csv', stdout=buf)
+        self.assertEquals(len(buf.getvalue().splitlines()), 1 + 5)
+
+        with self.assertRaises(CommandError):
+            call_command('export_safe_history', safe_address.lower(), stdout=buf)
+
+    def test_setup_service(self):
+        buf = StringIO()
+        call_command('setup_service', stdout=buf)
+        call_command('setup_service', stdout=buf)
+        for _, task, seconds in PERIODIC_TASKS:
+            periodic_task = PeriodicTask.objects.get(task=task)
+            self.assertEquals(periodic_task.interval.every, seconds)
+
+    def test_benchmark_safe_tx_hashing(self):
+        buf = StringIO()
+        call_command('benchmark_safe_tx_hashing', sizes=[1, 10], min_hashes=10, stdout=buf)
+        self.assertEquals(len(buf.getvalue().splitlines()), 2 * 3)
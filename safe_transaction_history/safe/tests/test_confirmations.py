@@ -0,0 +1,315 @@
+import os
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.test import TestCase
+from django.utils import timezone
+
+from hexbytes import HexBytes
+
+from ..confirmations import (CONFIRMATION_ABANDONED, CONFIRMATION_APPROVED,
+                             CONFIRMATION_EXECUTED, CONFIRMATION_PENDING,
+                             CONFIRMATION_REORGED, TRANSACTION_NOT_MINED_ERROR,
+                             get_check_delay, recheck_confirmations_after_fork,
+                             reconcile_confirmations, save_confirmations)
+from ..ethereum_service import BatchRequestError, EthereumService
+from ..history_cache_service import HistoryCacheService
+from ..models import (MultisigConfirmation, MultisigConfirmationSubmission,
+                      MultisigTransaction)
+from ..redis_service import RedisService
+from ..safe_service import SafeService, SafeServiceProvider
+from ..tasks import (IN_FLIGHT_KEY, NODE_ERROR_MAX_RETRIES,
+                     check_approve_transactions, check_multisig_transaction,
+                     schedule_multisig_transaction_check,
+                     validate_confirmation_submission)
+from .factories import (MultisigTransactionConfirmationFactory,
+                        MultisigTransactionFactory, get_eth_address)
+
+
+class TestConfirmations(TestCase):
+
+    def build_confirmation(self, safe, to, nonce, **kwargs):
+        confirmation = {
+            'safe': safe,
+            'to': to,
+            'value': 5,
+            'data': None,
+            'operation': 0,
+            'nonce': nonce,
+            'transaction_hash': HexBytes('0x%064x' % (nonce + 1000)),
+            'sender': get_eth_address(),
+            'type': 'confirmation',
+            'block_number': 1,
+            'block_date_time': timezone.now(),
+        }
+        confirmation.update(kwargs)
+        confirmation['contract_transaction_hash'] = SafeService.get_hash_for_safe_tx(
+            safe, to, confirmation['value'], confirmation['data'], confirmation['operation'], nonce
+        )
+        return confirmation
+
+    def test_save_confirmations(self):
+        self.assertEqual(save_confirmations([]), [])
+
+        safe_address = get_eth_address()
+        other_safe_address = get_eth_address()
+        to = get_eth_address()
+        existing = MultisigTransactionFactory(safe=safe_address, to=to, value=5, data=None, operation=0, nonce=1,
+                                              contract_transaction_hash=SafeService.get_hash_for_safe_tx(
+                                                  safe_address, to, 5, None, 0, 1))
+
+        confirmations = [
+            self.build_confirmation(safe_address, to, 1),  # Existing transaction
+            self.build_confirmation(safe_address, to, 2),  # New transaction
+            self.build_confirmation(safe_address, to, 2),  # Same new transaction, other owner
+            self.build_confirmation(safe_address, to, 3, data=b'\x12'),
+            self.build_confirmation(other_safe_address, to, 1),
+        ]
+
+        with mock.patch.object(HistoryCacheService, 'bump_version') as bump_version_mock:
+            multisig_confirmations = save_confirmations(confirmations)
+        self.assertEqual({call[0][0] for call in bump_version_mock.call_args_list},
+                         {safe_address, other_safe_address})
+
+        self.assertEqual(len(multisig_confirmations), len(confirmations))
+        self.assertEqual(MultisigConfirmation.objects.count(), len(confirmations))
+        self.assertEqual(MultisigTransaction.objects.filter(safe=safe_address).count(), 3)
+        self.assertEqual(MultisigTransaction.objects.filter(safe=other_safe_address).count(), 1)
+        self.assertEqual(existing.confirmations.get().owner, confirmations[0]['sender'])
+
+        new_multisig_transaction = MultisigTransaction.objects.get(safe=safe_address, nonce=2)
+        self.assertEqual(set(new_multisig_transaction.confirmations.values_list('owner', flat=True)),
+                         {confirmations[1]['sender'], confirmations[2]['sender']})
+        self.assertEqual(bytes(MultisigTransaction.objects.get(safe=safe_address, nonce=3).data), b'\x12')
+
+        # Stored again, multisig transactions are reused
+        save_confirmations([self.build_confirmation(safe_address, to, 2)])
+        self.assertEqual(MultisigTransaction.objects.count(), 4)
+        self.assertEqual(new_multisig_transaction.confirmations.count(), 3)
+
+    def test_validate_confirmation_submission(self):
+        def validate_confirmations_on_chain(confirmations):
+            confirmations[0].update(block_number=5, block_date_time=timezone.now())
+            return [None]
+
+        safe_address = get_eth_address()
+        confirmation = self.build_confirmation(safe_address, get_eth_address(), 1)
+        submission_data = {key: value for key, value in confirmation.items()
+                           if key not in ('block_number', 'block_date_time')}
+        submission = MultisigConfirmationSubmission.objects.create(**submission_data)
+        self.assertEqual(submission.get_confirmation_data(), submission_data)
+
+        with mock.patch('safe_transaction_history.safe.tasks.validate_confirmations_on_chain',
+                        side_effect=validate_confirmations_on_chain):
+            validate_confirmation_submission(submission.id)
+
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, MultisigConfirmationSubmission.ACCEPTED)
+        self.assertEqual(submission.multisig_confirmation.block_number, 5)
+        self.assertEqual(submission.multisig_confirmation.multisig_transaction.safe, safe_address)
+
+        submission = MultisigConfirmationSubmission.objects.create(**submission_data)
+        with mock.patch('safe_transaction_history.safe.tasks.validate_confirmations_on_chain',
+                        return_value=[(422, 'User is not an owner or tx not approved/executed')]):
+            validate_confirmation_submission(submission.id)
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, MultisigConfirmationSubmission.REJECTED)
+        self.assertEqual(submission.error, 'User is not an owner or tx not approved/executed')
+
+        submission = MultisigConfirmationSubmission.objects.create(**submission_data)
+        with mock.patch('safe_transaction_history.safe.tasks.validate_confirmations_on_chain',
+                        side_effect=ValueError):
+            with self.assertRaises(Retry):
+                validate_confirmation_submission(submission.id)
+            validate_confirmation_submission(submission.id, node_errors=NODE_ERROR_MAX_RETRIES)
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, MultisigConfirmationSubmission.REJECTED)
+        self.assertEqual(submission.error, 'Cannot get info from node')
+
+        # Transaction not mined yet, validated again later
+        submission = MultisigConfirmationSubmission.objects.create(**submission_data)
+        with mock.patch('safe_transaction_history.safe.tasks.validate_confirmations_on_chain',
+                        return_value=[TRANSACTION_NOT_MINED_ERROR]):
+            with self.assertRaises(Retry):
+                validate_confirmation_submission(submission.id, node_errors=NODE_ERROR_MAX_RETRIES)
+            submission.refresh_from_db()
+            self.assertEqual(submission.status, MultisigConfirmationSubmission.PENDING)
+
+            validate_confirmation_submission(submission.id, retry=False)
+        submission.refresh_from_db()
+        self.assertEqual(submission.status, MultisigConfirmationSubmission.REJECTED)
+        self.assertEqual(submission.error, TRANSACTION_NOT_MINED_ERROR[1])
+
+    def test_reconcile_confirmations(self):
+        safe_address = get_eth_address()
+        safe_contract = SafeServiceProvider().get_contract(safe_address)
+        current_block_number = 100
+        prev_block_identifier = hex(current_block_number - 10)
+        node_transactions = {}
+        node_calls = {}
+
+        def create_confirmation(multisig_transaction, transaction_block_number=50, transaction_error=False,
+                                is_approved=False, is_approved_prev=False, is_executed=False, block_number=50,
+                                **kwargs):
+            owner = get_eth_address()
+            transaction_hash = HexBytes(os.urandom(32))
+            contract_transaction_hash = HexBytes(multisig_transaction.contract_transaction_hash)
+            if transaction_error:
+                node_transactions[transaction_hash.hex()] = BatchRequestError({'code': -32000, 'message': 'error'})
+            elif transaction_block_number:
+                node_transactions[transaction_hash.hex()] = {'blockNumber': hex(transaction_block_number)}
+            is_approved_data = safe_contract.encodeABI(fn_name='isApproved', args=[contract_transaction_hash, owner])
+            is_executed_data = safe_contract.encodeABI(fn_name='isExecuted', args=[contract_transaction_hash])
+            node_calls[is_approved_data, 'latest'] = is_approved
+            node_calls[is_approved_data, prev_block_identifier] = is_approved_prev
+            node_calls[is_executed_data, 'latest'] = is_executed
+            return MultisigConfirmation.objects.create(
+                owner=owner, contract_transaction_hash=contract_transaction_hash, transaction_hash=transaction_hash,
+                type='confirmation', block_number=block_number, block_date_time=timezone.now(),
+                multisig_transaction=multisig_transaction, **kwargs
+            )
+
+        def batch_request(rpc_requests, raise_on_error=True):
+            self.assertFalse(raise_on_error)
+            results = []
+            for rpc_request in rpc_requests:
+                if rpc_request['method'] == 'eth_getTransactionByHash':
+                    results.append(node_transactions.get(rpc_request['params'][0]))
+                else:
+                    value = node_calls[rpc_request['params'][0]['data'], rpc_request['params'][1]]
+                    results.append(BatchRequestError({'code': -32000, 'message': 'error'}) if value is None
+                                   else '0x%064x' % value)
+            return results
+
+        multisig_transaction, executed_multisig_transaction, reorged_multisig_transaction = [
+            MultisigTransactionFactory(safe=safe_address) for _ in range(3)
+        ]
+        approved = create_confirmation(multisig_transaction, is_approved=True)
+        pending = create_confirmation(multisig_transaction, transaction_block_number=51)
+        node_error = create_confirmation(multisig_transaction, is_approved=None)
+        # Old enough to be deleted if the transaction was not found
+        transaction_node_error = create_confirmation(multisig_transaction, transaction_error=True)
+        already_approved = create_confirmation(multisig_transaction, status=True)
+        abandoned = create_confirmation(multisig_transaction, transaction_block_number=1, block_number=1)
+        not_due = create_confirmation(multisig_transaction, next_check_block_number=101)
+        executed = create_confirmation(executed_multisig_transaction, is_executed=True)
+        reorged = create_confirmation(reorged_multisig_transaction, transaction_block_number=None)
+        reorged_prev = create_confirmation(reorged_multisig_transaction, transaction_block_number=51,
+                                           is_approved_prev=True)
+
+        with mock.patch.object(EthereumService, 'batch_request', side_effect=batch_request) as batch_request_mock, \
+                mock.patch.object(HistoryCacheService, 'bump_version') as bump_version_mock:
+            counts = reconcile_confirmations(current_block_number, 10, max_age_blocks=90, chunk_size=2)
+        self.assertEqual(counts, {CONFIRMATION_PENDING: 3, CONFIRMATION_APPROVED: 1, CONFIRMATION_EXECUTED: 1,
+                                  CONFIRMATION_REORGED: 2, CONFIRMATION_ABANDONED: 1})
+        self.assertEqual(batch_request_mock.call_count, 4)
+        bump_version_mock.assert_called_with(safe_address)
+
+        self.assertEqual(set(MultisigConfirmation.objects.values_list('id', flat=True)),
+                         {approved.id, pending.id, node_error.id, transaction_node_error.id, already_approved.id,
+                          abandoned.id, not_due.id, executed.id})
+        self.assertFalse(MultisigConfirmation.objects.filter(id__in=[reorged.id, reorged_prev.id]).exists())
+        self.assertEqual(set(MultisigConfirmation.objects.filter(status=True).values_list('id', flat=True)),
+                         {approved.id, already_approved.id})
+        self.assertEqual(set(MultisigTransaction.objects.filter(status=True).values_list('id', flat=True)),
+                         {executed_multisig_transaction.id})
+        self.assertIsNotNone(MultisigTransaction.objects.get(id=executed_multisig_transaction.id).execution_date)
+        self.assertEqual(list(MultisigConfirmation.objects.filter(abandoned=True).values_list('id', flat=True)),
+                         [abandoned.id])
+
+        # Pending confirmations are checked again after 1, 2, 4... blocks. Confirmations with node errors are not
+        # delayed
+        self.assertEqual([(confirmation.check_attempts, confirmation.next_check_block_number)
+                          for confirmation in MultisigConfirmation.objects.filter(
+                              id__in=[pending.id, node_error.id, transaction_node_error.id, not_due.id]
+                          ).order_by('id')],
+                         [(1, 101), (0, 0), (0, 0), (0, 101)])
+        MultisigConfirmation.objects.filter(id=pending.id).update(check_attempts=3, next_check_block_number=0)
+        with mock.patch.object(EthereumService, 'batch_request', side_effect=batch_request), \
+                mock.patch.object(HistoryCacheService, 'bump_version'):
+            counts = reconcile_confirmations(current_block_number, 10, max_age_blocks=90, chunk_size=2)
+        self.assertEqual(counts[CONFIRMATION_PENDING], 3)
+        self.assertEqual(MultisigConfirmation.objects.get(id=pending.id).next_check_block_number, 108)
+
+        # Every unresolved confirmation of a multisig transaction, due or not
+        with mock.patch.object(EthereumService, 'batch_request', side_effect=batch_request) as batch_request_mock, \
+                mock.patch.object(HistoryCacheService, 'bump_version'):
+            counts = reconcile_confirmations(current_block_number, 10, max_age_blocks=90, chunk_size=10,
+                                             safe_address=safe_address,
+                                             contract_transaction_hash=multisig_transaction.contract_transaction_hash)
+        self.assertEqual(counts[CONFIRMATION_PENDING], 4)
+        self.assertEqual(batch_request_mock.call_count, 1)
+
+    def test_get_check_delay(self):
+        self.assertEqual([get_check_delay(check_attempts, 10) for check_attempts in range(7)], [1, 1, 2, 4, 8, 10, 10])
+        self.assertEqual(get_check_delay(3, 0), 1)
+
+    def test_check_multisig_transaction(self):
+        safe_address = get_eth_address()
+        contract_transaction_hash = '0x' + os.urandom(32).hex()
+        redis = RedisService().redis
+        key = IN_FLIGHT_KEY.format(safe_address, contract_transaction_hash)
+        self.addCleanup(redis.delete, key)
+
+        with mock.patch('safe_transaction_history.safe.tasks.check_multisig_transaction') as task_mock:
+            self.assertTrue(schedule_multisig_transaction_check(safe_address, contract_transaction_hash))
+            self.assertFalse(schedule_multisig_transaction_check(safe_address, contract_transaction_hash))
+        task_mock.delay.assert_called_once_with(safe_address, contract_transaction_hash)
+
+        # Request arriving while checking, multisig transaction is checked again by the same task
+        def reconcile_and_schedule(*args, **kwargs):
+            if reconcile_confirmations_mock.call_count == 1:
+                self.assertFalse(schedule_multisig_transaction_check(safe_address, contract_transaction_hash))
+            return {}
+
+        with mock.patch('safe_transaction_history.safe.tasks.reconcile_confirmations',
+                        side_effect=reconcile_and_schedule) as reconcile_confirmations_mock, \
+                mock.patch('safe_transaction_history.safe.tasks.ChainHeadServiceProvider'):
+            check_multisig_transaction(safe_address, contract_transaction_hash)
+        self.assertEqual(reconcile_confirmations_mock.call_count, 2)
+        self.assertEqual(reconcile_confirmations_mock.call_args[1],
+                         {'safe_address': safe_address, 'contract_transaction_hash': contract_transaction_hash})
+        self.assertIsNone(redis.get(key))
+
+        with mock.patch('safe_transaction_history.safe.tasks.check_multisig_transaction') as task_mock:
+            self.assertTrue(schedule_multisig_transaction_check(safe_address, contract_transaction_hash))
+            # Expiration is not extended by new requests
+            redis.expire(key, 10)
+            self.assertFalse(schedule_multisig_transaction_check(safe_address, contract_transaction_hash))
+            self.assertLessEqual(redis.ttl(key), 10)
+
+        # Failed task doesn't leave the key, so new requests are not piggybacked on it
+        with mock.patch('safe_transaction_history.safe.tasks.reconcile_confirmations', side_effect=ValueError), \
+                mock.patch('safe_transaction_history.safe.tasks.ChainHeadServiceProvider'):
+            with self.assertRaises(ValueError):
+                check_multisig_transaction(safe_address, contract_transaction_hash)
+        self.assertIsNone(redis.get(key))
+
+    def test_check_approve_transactions(self):
+        safe_address = get_eth_address()
+        contract_transaction_hash = '0x' + os.urandom(32).hex()
+        confirmations = [{'safe_address': safe_address, 'contract_transaction_hash': contract_transaction_hash,
+                          'transaction_hash': '0x' + os.urandom(32).hex(), 'owner': get_eth_address()}
+                         for _ in range(2)]
+        with mock.patch('safe_transaction_history.safe.tasks.schedule_multisig_transaction_check') as schedule_mock:
+            check_approve_transactions(confirmations)
+        schedule_mock.assert_called_once_with(safe_address, contract_transaction_hash)
+
+    def test_recheck_confirmations_after_fork(self):
+        multisig_transaction = MultisigTransactionFactory()
+        executed_multisig_transaction = MultisigTransactionFactory(status=True)
+        confirmations = [
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction, block_number=block_number,
+                                                   status=True, check_attempts=2, next_check_block_number=50)
+            for block_number in (9, 10, 11)
+        ]
+        MultisigTransactionConfirmationFactory(multisig_transaction=executed_multisig_transaction, block_number=11,
+                                               status=True)
+
+        with mock.patch.object(HistoryCacheService, 'bump_version') as bump_version_mock:
+            self.assertEqual(recheck_confirmations_after_fork(10), 2)
+        bump_version_mock.assert_called_once_with(multisig_transaction.safe)
+        self.assertEqual([(confirmation.status, confirmation.check_attempts, confirmation.next_check_block_number)
+                          for confirmation in MultisigConfirmation.objects.filter(id__in=[c.id for c in confirmations])
+                         .order_by('block_number')],
+                         [(True, 2, 50), (False, 0, 0), (False, 0, 0)])
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from ..ethereum_service import BatchRequestError, EthereumServiceProvider
+from .factories import get_eth_address
+
+
+class TestEthereumService(TestCase):
+
+    def test_batch_request(self):
+        ethereum_service = EthereumServiceProvider()
+        block, transaction, call_result = ethereum_service.batch_request([
+            ethereum_service.build_get_block_request(0),
+            ethereum_service.build_get_transaction_request('0x' + '0' * 64),
+            ethereum_service.build_call_request(get_eth_address(), '0x2f54bf6e'),
+        ])
+        self.assertEqual(int(block['number'], 16), 0)
+        self.assertEqual(block['hash'], ethereum_service.get_block(0)['hash'].hex())
+        self.assertIsNone(transaction)
+        self.assertFalse(ethereum_service.decode_bool(call_result))
+        self.assertEqual(ethereum_service.batch_request([]), [])
+
+    def test_batch_request_chunks(self):
+        ethereum_service = EthereumServiceProvider()
+        rpc_requests = [ethereum_service.build_get_block_request(block_number) for block_number in range(5)]
+
+        def post(url, json=None, timeout=None):
+            return mock.MagicMock(json=lambda: [{'id': rpc_request['id'], 'result': rpc_request['params'][0]}
+                                                for rpc_request in json])
+
+        with mock.patch.object(ethereum_service, 'max_batch_requests', 2), \
+                mock.patch.object(ethereum_service.http_session, 'post', side_effect=post) as post_mock:
+            self.assertEqual(ethereum_service.batch_request(rpc_requests), [hex(i) for i in range(5)])
+        self.assertEqual([len(call[1]['json']) for call in post_mock.call_args_list], [2, 2, 1])
+        self.assertEqual({call[1]['timeout'] for call in post_mock.call_args_list}, {ethereum_service.timeout})
+
+    def test_batch_request_errors(self):
+        ethereum_service = EthereumServiceProvider()
+        rpc_requests = [ethereum_service.build_get_transaction_request('0x' + '0' * 64),
+                        ethereum_service.build_block_number_request()]
+        rpc_responses = [{'id': 0, 'result': None}, {'id': 1, 'error': {'code': -32000, 'message': 'error'}}]
+        with mock.patch.object(ethereum_service.http_session, 'post',
+                               return_value=mock.MagicMock(json=lambda: rpc_responses)):
+            with self.assertRaises(BatchRequestError):
+                ethereum_service.batch_request(rpc_requests)
+
+            # Errors can be told apart from results not found
+            transaction, block_number = ethereum_service.batch_request(rpc_requests, raise_on_error=False)
+        self.assertIsNone(transaction)
+        self.assertIsInstance(block_number, BatchRequestError)
+
+    def test_batch_request_invalid_response(self):
+        ethereum_service = EthereumServiceProvider()
+        rpc_requests = [ethereum_service.build_get_transaction_request('0x' + '0' * 64),
+                        ethereum_service.build_block_number_request()]
+        for invalid_response in ({'id': None, 'error': {'code': -32700, 'message': 'Parse error'}},
+                                 {'error': {'code': -32600, 'message': 'Invalid request'}},
+                                 {'id': 2, 'result': '0x1'},
+                                 {'id': 0, 'result': None},  # Repeated id
+                                 {'id': 1}):
+            rpc_responses = [{'id': 0, 'result': None}, invalid_response]
+            with mock.patch.object(ethereum_service.http_session, 'post',
+                                   return_value=mock.MagicMock(json=lambda: rpc_responses)):
+                with self.assertRaisesRegex(ValueError, 'Invalid batch response'):
+                    ethereum_service.batch_request(rpc_requests, raise_on_error=False)
+
+    def test_decode_bool(self):
+        decode_bool = EthereumServiceProvider().decode_bool
+        self.assertTrue(decode_bool('0x' + '0' * 63 + '1'))
+        self.assertFalse(decode_bool('0x' + '0' * 64))
+        self.assertFalse(decode_bool('0x'))
+        self.assertFalse(decode_bool(None))
@@ -0,0 +1,38 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from ..history import build_history, get_history_values
+from ..models import MultisigTransaction
+from ..renderers import CamelCaseJSONRenderer
+from ..serializers import SafeMultisigHistorySerializer
+from .factories import (MultisigTransactionConfirmationFactory,
+                        MultisigTransactionFactory, get_eth_address)
+
+
+class TestHistory(TestCase):
+
+    def test_build_history_parity(self):
+        safe_address = get_eth_address()
+        owner = get_eth_address()
+        for nonce in range(6):
+            multisig_transaction = MultisigTransactionFactory(safe=safe_address, nonce=nonce,
+                                                              data=b'\x12\x34' * nonce or None,
+                                                              status=nonce % 2 == 0,
+                                                              execution_date=timezone.now() if nonce % 2 else None)
+            for _ in range(nonce % 3):
+                MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction,
+                                                       transaction_hash=get_eth_address())
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction, owner=owner,
+                                                   transaction_hash=get_eth_address())
+
+        multisig_transactions = MultisigTransaction.objects.filter(safe=safe_address).order_by('-nonce', '-id')
+        renderer = CamelCaseJSONRenderer()
+        for owners in (None, [owner]):
+            page = multisig_transactions.prefetch_related(
+                SafeMultisigHistorySerializer.get_confirmations_prefetch(owners=owners)
+            )
+            expected = renderer.render(SafeMultisigHistorySerializer(page, many=True, owners=owners).data)
+            rendered = renderer.render(build_history(list(get_history_values(multisig_transactions)), owners=owners))
+            self.assertEqual(rendered, expected)
+
+        self.assertEqual(build_history([]), [])
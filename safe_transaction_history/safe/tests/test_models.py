@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from hexbytes import HexBytes
+
+from ..models import MultisigTransaction
+from .factories import MultisigTransactionFactory, get_eth_address
+
+
+class TestMultisigTransactionManager(TestCase):
+
+    def test_bulk_upsert(self):
+        self.assertEqual(MultisigTransaction.objects.bulk_upsert([]), [])
+
+        safe_address = get_eth_address()
+        existing = MultisigTransactionFactory(safe=safe_address, nonce=0, value=3, status=True)
+        multisig_transactions = [
+            MultisigTransaction(safe=safe_address, to=existing.to, value=0, data=b'\x12', operation=0, nonce=nonce,
+                                contract_transaction_hash='{:064x}'.format(nonce + 1000))
+            for nonce in range(3)
+        ]
+        multisig_transactions.append(MultisigTransaction(safe=safe_address, to=existing.to, value=1, data=None,
+                                                         operation=0, nonce=0,
+                                                         contract_transaction_hash=existing.contract_transaction_hash))
+        # Duplicated in the same upsert
+        multisig_transactions.append(MultisigTransaction(safe=safe_address, to=existing.to, value=0, data=b'\x12',
+                                                         operation=0, nonce=0,
+                                                         contract_transaction_hash='{:064x}'.format(1000)))
+
+        upserted = MultisigTransaction.objects.bulk_upsert(multisig_transactions)
+        self.assertEqual(MultisigTransaction.objects.filter(safe=safe_address).count(), 4)
+        self.assertEqual(upserted[3].pk, existing.pk)
+        self.assertEqual(upserted[4].pk, upserted[0].pk)
+        for multisig_transaction in upserted[:3]:
+            stored = MultisigTransaction.objects.get(pk=multisig_transaction.pk)
+            self.assertEqual(HexBytes(stored.contract_transaction_hash),
+                             HexBytes(multisig_transaction.contract_transaction_hash))
+            self.assertEqual(bytes(stored.data), b'\x12')
+            self.assertFalse(stored.status)
+
+        # Existing multisig transaction is not updated
+        existing.refresh_from_db()
+        self.assertTrue(existing.status)
+        self.assertEqual(existing.value, 3)
+
+        multisig_transaction = MultisigTransaction(safe=safe_address, to=existing.to, value=0, data=None, operation=0,
+                                                   nonce=5, contract_transaction_hash='{:064x}'.format(2000))
+        self.assertEqual(MultisigTransaction.objects.upsert(multisig_transaction), multisig_transaction)
+        self.assertIsNotNone(multisig_transaction.pk)
+        self.assertEqual(MultisigTransaction.objects.upsert(MultisigTransaction(
+            safe=safe_address, to=existing.to, value=1, data=None, operation=0, nonce=5,
+            contract_transaction_hash='{:064x}'.format(2000))).pk, multisig_transaction.pk)
@@ -0,0 +1,174 @@
+import os
+from unittest import mock
+
+from django.test import TestCase
+
+import eth_abi
+from hexbytes import HexBytes
+
+from ...ether.web3_service import Web3Service
+from ..owner_cache_service import (DELEGATE_CALL_OPERATION,
+                                   OWNER_FUNCTION_SELECTORS,
+                                   SAFE_EXEC_FUNCTION_SELECTORS,
+                                   OwnerCacheService)
+from ..redis_service import RedisService
+from ..safe_indexer_service import EXEC_FUNCTION
+from ..safe_service import SafeService
+from .factories import get_eth_address
+from .safe_test_case import TestCaseWithSafeContractMixin
+
+
+class TestOwnerCacheService(TestCase):
+
+    def setUp(self):
+        self.redis = RedisService().redis
+        self.safe_service = mock.MagicMock(decode_owners=SafeService.decode_owners)
+        self.owner_cache = OwnerCacheService(self.redis, self.safe_service, timeout=60, reorg_blocks=10)
+        self.safe_address = get_eth_address()
+        self.owners = [get_eth_address() for _ in range(3)]
+        self.addCleanup(self.redis.delete, self.owner_cache.OWNERS_KEY.format(self.safe_address),
+                        self.owner_cache.SAFES_KEY, self.owner_cache.LAST_BLOCK_KEY)
+
+        ethereum_service_patcher = mock.patch('safe_transaction_history.safe.owner_cache_service.'
+                                              'EthereumServiceProvider')
+        self.batch_request = ethereum_service_patcher.start().return_value.batch_request
+        self.batch_request.return_value = ['0x' + eth_abi.encode_single('address[]', self.owners).hex(),
+                                           '0x' + eth_abi.encode_single('uint256', 2).hex()]
+        self.addCleanup(ethereum_service_patcher.stop)
+
+    def test_get_owners_and_threshold(self):
+        self.assertEqual(self.owner_cache.get_owners_and_threshold(self.safe_address), (self.owners, 2))
+        self.assertEqual(self.owner_cache.get_owners_and_threshold(self.safe_address), (self.owners, 2))
+        self.assertEqual(self.batch_request.call_count, 1)
+        self.assertTrue(0 < self.redis.ttl(self.owner_cache.OWNERS_KEY.format(self.safe_address)) <= 60)
+        self.assertEqual(self.owner_cache.get_cached_safes(), [self.safe_address])
+
+        self.assertTrue(self.owner_cache.is_owner(self.safe_address, self.owners[1]))
+        self.assertFalse(self.owner_cache.is_owner(self.safe_address, get_eth_address()))
+        self.assertEqual(self.batch_request.call_count, 1)
+
+        self.owner_cache.invalidate({self.safe_address})
+        self.assertEqual(self.owner_cache.get_cached_safes(), [])
+        self.assertEqual(self.owner_cache.get_owners_and_threshold(self.safe_address), (self.owners, 2))
+        self.assertEqual(self.batch_request.call_count, 2)
+
+        # No Safe deployed
+        self.redis.delete(self.owner_cache.OWNERS_KEY.format(self.safe_address))
+        self.batch_request.return_value = ['0x', '0x']
+        with self.assertRaises(ValueError):
+            self.owner_cache.get_owners_and_threshold(self.safe_address)
+        self.assertFalse(self.owner_cache.is_owner(self.safe_address, self.owners[0]))
+
+        # Node errors are not taken as not being an owner
+        self.batch_request.return_value = [None, None]
+        with self.assertRaises(IOError):
+            self.owner_cache.is_owner(self.safe_address, self.owners[0])
+        self.batch_request.side_effect = IOError
+        with self.assertRaises(IOError):
+            self.owner_cache.get_owners(self.safe_address)
+
+    def build_exec_transaction(self, safe_address: str, to: str, data: bytes, operation: int=0):
+        selector, = [selector for selector, (function_name, _) in SAFE_EXEC_FUNCTION_SELECTORS.items()
+                     if function_name == EXEC_FUNCTION]
+        exec_data = selector + eth_abi.encode_abi(['address', 'uint256', 'bytes', 'uint8', 'uint256'],
+                                                  [to, 0, data, operation, 0])
+        return {'hash': HexBytes(os.urandom(32)), 'to': safe_address.lower(), 'input': HexBytes(exec_data).hex()}
+
+    def test_get_safe_changing_owners(self):
+        safe_addresses = {self.safe_address}
+        owner_data = next(iter(OWNER_FUNCTION_SELECTORS)) + eth_abi.encode_single('uint256', 1)
+
+        for transaction in (self.build_exec_transaction(self.safe_address, self.safe_address, owner_data),
+                            self.build_exec_transaction(self.safe_address, get_eth_address(), b'',
+                                                        operation=DELEGATE_CALL_OPERATION),
+                            {'hash': HexBytes(os.urandom(32)), 'to': self.safe_address,
+                             'input': HexBytes(owner_data).hex()}):
+            self.assertEqual(self.owner_cache.get_safe_changing_owners(transaction, safe_addresses),
+                             self.safe_address)
+
+        for transaction in (self.build_exec_transaction(self.safe_address, get_eth_address(), owner_data),
+                            self.build_exec_transaction(self.safe_address, self.safe_address, b''),
+                            self.build_exec_transaction(get_eth_address(), self.safe_address, owner_data),
+                            dict(self.build_exec_transaction(self.safe_address, self.safe_address, owner_data),
+                                 to=None),
+                            dict(self.build_exec_transaction(self.safe_address, self.safe_address, owner_data),
+                                 input=HexBytes(next(iter(SAFE_EXEC_FUNCTION_SELECTORS))).hex())):
+            self.assertIsNone(self.owner_cache.get_safe_changing_owners(transaction, safe_addresses))
+
+    def test_process_owner_changes(self):
+        other_safe_address = get_eth_address()
+        self.addCleanup(self.redis.delete, self.owner_cache.OWNERS_KEY.format(other_safe_address))
+        self.owner_cache.get_owners(self.safe_address)
+        self.owner_cache.get_owners(other_safe_address)
+
+        owner_data = next(iter(OWNER_FUNCTION_SELECTORS)) + eth_abi.encode_single('uint256', 1)
+        blocks = {
+            95: {'transactions': [self.build_exec_transaction(self.safe_address, self.safe_address, owner_data)]},
+            97: {'transactions': [self.build_exec_transaction(other_safe_address, get_eth_address(), b'')]},
+        }
+        web3_service = mock.MagicMock()
+        web3_service.get_blocks.side_effect = lambda block_numbers, **kwargs: {
+            block_number: blocks.get(block_number, {'transactions': []}) for block_number in block_numbers
+        }
+        self.assertEqual(self.owner_cache.process_owner_changes(web3_service, 100), {self.safe_address})
+        web3_service.get_blocks.assert_called_once_with(list(range(90, 101)), full_transactions=True)
+        self.assertEqual(self.owner_cache.get_cached_safes(), [other_safe_address])
+
+        # Last reorg blocks are processed again
+        self.assertEqual(self.owner_cache.process_owner_changes(web3_service, 105), set())
+        web3_service.get_blocks.assert_called_with(list(range(91, 106)), full_transactions=True)
+        self.assertEqual(self.owner_cache.get_cached_safes(), [other_safe_address])
+
+        # If there are too many blocks to process every cached Safe is invalidated
+        self.assertEqual(self.owner_cache.process_owner_changes(web3_service, 105 + self.owner_cache.MAX_BLOCKS),
+                         {other_safe_address})
+        self.assertEqual(web3_service.get_blocks.call_count, 2)
+        self.assertEqual(self.owner_cache.get_cached_safes(), [])
+
+        # No cached Safes, no blocks are retrieved
+        self.assertEqual(self.owner_cache.process_owner_changes(web3_service, 110 + self.owner_cache.MAX_BLOCKS),
+                         set())
+        self.assertEqual(web3_service.get_blocks.call_count, 2)
+        self.assertEqual(int(self.redis.get(self.owner_cache.LAST_BLOCK_KEY)), 110 + self.owner_cache.MAX_BLOCKS)
+
+
+class TestOwnerCacheServiceWithSafe(TestCase, TestCaseWithSafeContractMixin):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.prepare_safe_tests()
+
+    def setUp(self):
+        self.redis = RedisService().redis
+        self.owner_cache = OwnerCacheService(self.redis, self.safe_service, timeout=60, reorg_blocks=0)
+        self.addCleanup(self.redis.delete, self.owner_cache.SAFES_KEY, self.owner_cache.LAST_BLOCK_KEY)
+
+    def test_process_owner_changes(self):
+        safe_address, safe_instance, owners, _, _, threshold = self.deploy_safe()
+        self.addCleanup(self.redis.delete, self.owner_cache.OWNERS_KEY.format(safe_address))
+        self.assertEqual(self.owner_cache.get_owners_and_threshold(safe_address), (owners, threshold))
+        self.owner_cache.process_owner_changes(Web3Service(), self.w3.eth.blockNumber)
+
+        # Owner 2 is removed by a multisig transaction approved by owners 0 and 1
+        data = HexBytes(safe_instance.encodeABI(fn_name='removeOwner', args=[owners[1], owners[2], 1]))
+        safe_nonce = 0
+        for owner in owners[:2]:
+            safe_instance.functions.approveTransactionWithParameters(
+                safe_address, 0, data, self.CALL_OPERATION, safe_nonce
+            ).transact({
+                'from': owner
+            })
+        tx_hash = safe_instance.functions.execTransactionIfApproved(
+            safe_address, 0, data, self.CALL_OPERATION, safe_nonce
+        ).transact({
+            'from': owners[2]
+        })
+        self.w3.eth.waitForTransactionReceipt(tx_hash)
+        self.assertEqual(safe_instance.functions.getOwners().call(), owners[:2])
+
+        # Cache is stale until the new blocks are processed
+        self.assertTrue(self.owner_cache.is_owner(safe_address, owners[2]))
+        self.assertEqual(self.owner_cache.process_owner_changes(Web3Service(), self.w3.eth.blockNumber),
+                         {safe_address})
+        self.assertEqual(self.owner_cache.get_owners_and_threshold(safe_address), (owners[:2], 1))
+        self.assertFalse(self.owner_cache.is_owner(safe_address, owners[2]))
@@ -0,0 +1,31 @@
+from collections import OrderedDict
+
+from django.test import TestCase
+from django.utils import timezone
+from djangorestframework_camel_case import render
+
+from ..renderers import CamelCaseJSONRenderer, camelize
+
+
+class TestRenderers(TestCase):
+
+    def test_camel_case_json_renderer(self):
+        data = OrderedDict([
+            ('count', 2),
+            ('next_page', None),
+            ('results', [
+                {'to': '0x1', 'submission_date': timezone.now(), 'is_executed': True,
+                 'confirmations': ({'owner': '0x2', 'transaction_hash': '0x3'},)},
+                {'to': None, 'submissionDate': timezone.now(), 'isExecuted': False, 'confirmations': []},
+            ]),
+            (2, {'value_1': '1', 'value_2': [1, 'a_b']}),
+        ])
+        self.assertEqual(CamelCaseJSONRenderer().render(data), render.CamelCaseJSONRenderer().render(data))
+        self.assertEqual(CamelCaseJSONRenderer().render(None), render.CamelCaseJSONRenderer().render(None))
+
+        # Camel cased data is not rebuilt
+        camel_data = camelize(data)
+        self.assertIsNot(camel_data, data)
+        self.assertIs(camelize(camel_data), camel_data)
+        self.assertEqual(list(camel_data), ['count', 'nextPage', 'results', 2])
+        self.assertEqual(list(camel_data[2]), ['value1', 'value2'])
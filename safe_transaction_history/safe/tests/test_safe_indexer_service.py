@@ -0,0 +1,124 @@
+import os
+from unittest import mock
+
+from django.test import TestCase
+
+import eth_abi
+from hexbytes import HexBytes
+
+from ..block_cache_service import BlockCacheServiceProvider
+from ..models import MultisigTransaction
+from ..redis_service import RedisService
+from ..safe_indexer_service import (APPROVE_FUNCTION, EXEC_FUNCTION,
+                                    SAFE_FUNCTION_SELECTORS,
+                                    SafeIndexerService)
+from ..safe_service import SafeService
+from .factories import (MultisigTransactionConfirmationFactory,
+                        MultisigTransactionFactory, get_eth_address)
+
+
+class TestSafeIndexerService(TestCase):
+
+    def setUp(self):
+        self.redis = RedisService().redis
+        self.safe_indexer = SafeIndexerService(self.redis, reorg_blocks=10, max_blocks=5)
+        self.addCleanup(self.redis.delete, self.safe_indexer.LAST_BLOCK_KEY)
+        self.selectors = {function_name: selector
+                          for selector, (function_name, _) in SAFE_FUNCTION_SELECTORS.items()}
+
+    def build_safe_transaction(self, function_name: str, multisig_transaction: MultisigTransaction,
+                               sender: str):
+        data = self.selectors[function_name] + eth_abi.encode_abi(
+            ['address', 'uint256', 'bytes', 'uint8', 'uint256'],
+            [multisig_transaction.to, multisig_transaction.value, multisig_transaction.data or b'',
+             multisig_transaction.operation, multisig_transaction.nonce]
+        )
+        return {'hash': HexBytes(os.urandom(32)), 'from': sender, 'to': multisig_transaction.safe.lower(),
+                'input': HexBytes(data).hex()}
+
+    def create_multisig_transaction(self, safe_address: str) -> MultisigTransaction:
+        multisig_transaction = MultisigTransactionFactory(safe=safe_address, to=get_eth_address(), operation=0)
+        multisig_transaction.contract_transaction_hash = SafeService.get_hash_for_safe_tx(
+            safe_address, multisig_transaction.to, multisig_transaction.value, multisig_transaction.data,
+            multisig_transaction.operation, multisig_transaction.nonce
+        ).hex()[2:]
+        multisig_transaction.save()
+        return multisig_transaction
+
+    def test_decode_safe_transaction(self):
+        safe_address = get_eth_address()
+        multisig_transaction = self.create_multisig_transaction(safe_address)
+        transaction = self.build_safe_transaction(APPROVE_FUNCTION, multisig_transaction, get_eth_address())
+        self.assertEqual(self.safe_indexer.decode_safe_transaction(transaction, {safe_address}),
+                         (APPROVE_FUNCTION, safe_address, HexBytes(multisig_transaction.contract_transaction_hash)))
+        self.assertIsNone(self.safe_indexer.decode_safe_transaction(transaction, {get_eth_address()}))
+        self.assertIsNone(self.safe_indexer.decode_safe_transaction(dict(transaction, to=None), {safe_address}))
+        self.assertIsNone(self.safe_indexer.decode_safe_transaction(dict(transaction, input='0x12345678'),
+                                                                    {safe_address}))
+        # Not valid inputs
+        self.assertIsNone(self.safe_indexer.decode_safe_transaction(
+            dict(transaction, input=HexBytes(self.selectors[APPROVE_FUNCTION]).hex()), {safe_address}
+        ))
+
+    def test_process_blocks(self):
+        safe_address = get_eth_address()
+        multisig_transaction = self.create_multisig_transaction(safe_address)
+        executed_multisig_transaction = self.create_multisig_transaction(safe_address)
+        owner = get_eth_address()
+        other_owner = get_eth_address()
+        confirmation = MultisigTransactionConfirmationFactory(
+            owner=owner, multisig_transaction=multisig_transaction,
+            contract_transaction_hash=multisig_transaction.contract_transaction_hash, transaction_hash='0' * 64
+        )
+        other_confirmation = MultisigTransactionConfirmationFactory(
+            owner=other_owner, multisig_transaction=multisig_transaction,
+            contract_transaction_hash=multisig_transaction.contract_transaction_hash, transaction_hash='0' * 64
+        )
+
+        approval = self.build_safe_transaction(APPROVE_FUNCTION, multisig_transaction, owner)
+        failed_approval = self.build_safe_transaction(APPROVE_FUNCTION, multisig_transaction, other_owner)
+        execution = self.build_safe_transaction(EXEC_FUNCTION, executed_multisig_transaction, owner)
+        not_safe = {'hash': HexBytes(os.urandom(32)), 'from': owner, 'to': get_eth_address(), 'input': '0x'}
+        transactions = {
+            90: [approval, not_safe],
+            92: [failed_approval, execution],
+        }
+        blocks = {block_number: {'number': block_number, 'hash': HexBytes(os.urandom(32)),
+                                 'parentHash': HexBytes(os.urandom(32)), 'timestamp': 1500000000 + block_number - 90,
+                                 'transactions': transactions.get(block_number, [])}
+                  for block_number in range(90, 96)}
+        web3_service = mock.MagicMock()
+        web3_service.get_blocks.side_effect = lambda block_numbers, **kwargs: {
+            block_number: blocks[block_number] for block_number in block_numbers
+        }
+        block_cache = BlockCacheServiceProvider()
+        self.addCleanup(self.redis.delete, *[block_cache.HEADER_KEY.format(block_number) for block_number in blocks])
+        web3_service.get_transaction_receipts.side_effect = lambda transaction_hashes: {
+            transaction_hash: {'status': '0x0' if transaction_hash == failed_approval['hash'].hex() else 1}
+            for transaction_hash in transaction_hashes
+        }
+
+        # First time only the last final block is indexed
+        self.assertEqual(self.safe_indexer.process_blocks(web3_service, 100), {APPROVE_FUNCTION: 1, EXEC_FUNCTION: 0})
+        web3_service.get_blocks.assert_called_once_with([90], full_transactions=True)
+        web3_service.get_transaction_receipts.assert_called_once_with([approval['hash'].hex()])
+        self.assertEqual(int(self.redis.get(self.safe_indexer.LAST_BLOCK_KEY)), 90)
+        # Headers of the blocks retrieved are cached, they are final
+        self.assertTrue(block_cache.get_header(90)['final'])
+        self.assertEqual(block_cache.get_header(90)['hash'], blocks[90]['hash'].hex())
+        confirmation.refresh_from_db()
+        self.assertTrue(confirmation.status)
+
+        # No new final blocks
+        self.assertEqual(self.safe_indexer.process_blocks(web3_service, 100), {APPROVE_FUNCTION: 0, EXEC_FUNCTION: 0})
+        self.assertEqual(web3_service.get_blocks.call_count, 1)
+
+        # Up to `max_blocks` are indexed at once, failed transactions are ignored
+        self.assertEqual(self.safe_indexer.process_blocks(web3_service, 120), {APPROVE_FUNCTION: 0, EXEC_FUNCTION: 1})
+        web3_service.get_blocks.assert_called_with(list(range(91, 96)), full_transactions=True)
+        self.assertEqual(int(self.redis.get(self.safe_indexer.LAST_BLOCK_KEY)), 95)
+        other_confirmation.refresh_from_db()
+        executed_multisig_transaction.refresh_from_db()
+        self.assertFalse(other_confirmation.status)
+        self.assertTrue(executed_multisig_transaction.status)
+        self.assertEqual(executed_multisig_transaction.execution_date.timestamp(), 1500000002)
@@ -0,0 +1,22 @@
+from django.test import TestCase
+
+from ..management.commands.benchmark_safe_tx_hashing import (
+    Command, get_hash_for_safe_tx_eth_abi)
+from ..safe_service import SafeService
+
+
+class TestSafeService(TestCase):
+
+    def test_get_hashes_for_safe_txs(self):
+        safe_txs = [Command.build_safe_tx(i) for i in range(30)]
+        safe_txs.append((safe_txs[0][0], safe_txs[0][1], 2 ** 256 - 1, b'\x01', 2, 2 ** 256 - 1))
+        expected = [get_hash_for_safe_tx_eth_abi(*safe_tx) for safe_tx in safe_txs]
+
+        self.assertEqual(SafeService.get_hashes_for_safe_txs(safe_txs), expected)
+        self.assertEqual([SafeService.get_hash_for_safe_tx(*safe_tx) for safe_tx in safe_txs], expected)
+        self.assertEqual(SafeService.get_hashes_for_safe_txs([]), [])
+        self.assertEqual(SafeService.get_hash_for_safe_tx(*safe_txs[0]).hex(), expected[0].hex())
+
+        for value, nonce in ((2 ** 256, 0), (0, -1)):
+            with self.assertRaises(ValueError):
+                SafeService.get_hash_for_safe_tx(safe_txs[0][0], safe_txs[0][1], value, None, 0, nonce)
@@ -0,0 +1,40 @@
+import os
+from unittest import mock
+
+from django.test import TestCase
+
+from ethereum.utils import checksum_encode, ecsign, privtoaddr
+
+from ..safe_service import SafeService
+from ..signature_verifier import check_signatures, check_signatures_batch
+
+
+class TestSignatureVerifier(TestCase):
+
+    def build_job(self, number_owners: int=3):
+        tx_hash = os.urandom(32)
+        keys = [os.urandom(32) for _ in range(number_owners)]
+        owners_keys = sorted([(checksum_encode(privtoaddr(key)), key) for key in keys], key=lambda x: x[0].lower())
+        signatures = SafeService.signatures_to_bytes([ecsign(tx_hash, key) for _, key in owners_keys])
+        return tx_hash, signatures, [owner for owner, _ in owners_keys]
+
+    def test_check_signatures(self):
+        tx_hash, signatures, owners = self.build_job()
+        self.assertTrue(check_signatures(tx_hash, signatures, owners))
+        self.assertTrue(check_signatures(tx_hash, signatures, list(reversed(owners))))
+        self.assertTrue(check_signatures(tx_hash, signatures, [owner.lower() for owner in owners]))
+
+        self.assertFalse(check_signatures(os.urandom(32), signatures, owners))
+        self.assertFalse(check_signatures(tx_hash, signatures[:-1], owners))
+        self.assertFalse(check_signatures(tx_hash, signatures[65:] + signatures[:65], owners))
+        self.assertFalse(check_signatures(tx_hash, b'\x00' * len(signatures), owners))
+
+    def test_check_signatures_batch(self):
+        jobs = [self.build_job(i % 3 + 1) for i in range(6)]
+        jobs[1] = (os.urandom(32), jobs[1][1], jobs[1][2])
+        expected = [True, False, True, True, True, True]
+
+        self.assertEqual(check_signatures_batch(jobs, 1), expected)
+        self.assertEqual(check_signatures_batch([], 4), [])
+        with mock.patch('safe_transaction_history.safe.signature_verifier.MIN_JOBS_PER_WORKER', 1):
+            self.assertEqual(check_signatures_batch(jobs, 2), expected)
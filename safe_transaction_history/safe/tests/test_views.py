@@ -1,16 +1,27 @@
+import csv
 import datetime
+import json
 import logging
 from random import randint
+from unittest import mock
 
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from ..models import MultisigConfirmation, MultisigTransaction
+from ..history_cache_service import HistoryCacheServiceProvider
+from ..models import (MultisigConfirmation, MultisigConfirmationSubmission,
+                      MultisigTransaction)
+from ..owner_cache_service import OwnerCacheService
+from ..safe_service import SafeService, SafeServiceProvider
 from ..serializers import SafeMultisigTransactionSerializer
 from .factories import (MultisigTransactionConfirmationFactory,
                         MultisigTransactionFactory,
-                        generate_multisig_transactions)
+                        generate_multisig_transactions, get_eth_address)
 from .safe_test_case import TestCaseWithSafeContractMixin
 
 logger = logging.getLogger(__name__)
@@ -389,6 +400,133 @@ class TestViews(APITestCase, TestCaseWithSafeContractMixin):
         serializer = SafeMultisigTransactionSerializer(data=transaction_data)
         self.assertTrue((serializer.is_valid()))
 
+    def test_multisig_confirmations_bulk(self):
+        safe_address, safe_instance, owners, funder, fund_amount, _ = self.deploy_safe()
+        safe_nonce = randint(0, 10)
+
+        confirmations = []
+        for owner in owners[:2]:
+            tx_hash = safe_instance.functions.approveTransactionWithParameters(
+                owners[0], self.WITHDRAW_AMOUNT, b'', self.CALL, safe_nonce
+            ).transact({
+                'from': owner
+            })
+
+            internal_tx_hash = safe_instance.functions.getTransactionHash(
+                owners[0], self.WITHDRAW_AMOUNT, b'', self.CALL, safe_nonce
+            ).call({
+                'from': owner
+            })
+
+            confirmations.append({
+                'sender': owner,
+                'to': owners[0],
+                'value': self.WITHDRAW_AMOUNT,
+                'safe': safe_address,
+                'operation': self.CALL,
+                'nonce': safe_nonce,
+                'data': None,
+                'contract_transaction_hash': internal_tx_hash.hex(),
+                'transaction_hash': tx_hash.hex(),
+                'type': 'confirmation'
+            })
+
+        # Not approved by the sender
+        confirmations.append(dict(confirmations[0], sender=funder))
+        # Not valid contract_transaction_hash
+        confirmations.append(dict(confirmations[0], nonce=safe_nonce + 1))
+
+        request = self.client.post(reverse('v1:multisig-confirmations-bulk'),
+                                   data={'confirmations': confirmations}, format='json')
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status'] for result in request.json()],
+                         [status.HTTP_202_ACCEPTED, status.HTTP_202_ACCEPTED,
+                          status.HTTP_422_UNPROCESSABLE_ENTITY, status.HTTP_400_BAD_REQUEST])
+
+        multisig_transaction = MultisigTransaction.objects.get(safe=safe_address, nonce=safe_nonce)
+        self.assertEqual(set(multisig_transaction.confirmations.values_list('owner', flat=True)), set(owners[:2]))
+
+        request = self.client.post(reverse('v1:multisig-confirmations-bulk'),
+                                   data={'confirmations': []}, format='json')
+        self.assertEqual(request.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_multisig_confirmations_node_error(self):
+        safe_address = get_eth_address()
+        to = get_eth_address()
+        confirmation = {
+            'sender': get_eth_address(),
+            'to': to,
+            'value': self.WITHDRAW_AMOUNT,
+            'operation': self.CALL,
+            'nonce': 0,
+            'data': None,
+            'contract_transaction_hash': SafeService.get_hash_for_safe_tx(safe_address, to, self.WITHDRAW_AMOUNT, None,
+                                                                          self.CALL, 0).hex(),
+            'transaction_hash': '0x' + '2' * 64,
+            'type': 'confirmation'
+        }
+
+        # Owners cannot be retrieved, it's not taken as the sender not being an owner
+        with mock.patch.object(OwnerCacheService, 'get_owners', side_effect=IOError):
+            request = self.client.post(reverse('v1:multisig-transactions', kwargs={'address': safe_address}),
+                                       data=confirmation, format='json')
+            self.assertEqual(request.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+            request = self.client.post(reverse('v1:multisig-confirmations-bulk'),
+                                       data={'confirmations': [dict(confirmation, safe=safe_address)]}, format='json')
+            self.assertEqual(request.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(MultisigConfirmation.objects.exists())
+
+    @override_settings(SAFE_CONFIRMATIONS_ASYNC=True)
+    def test_multisig_confirmation_submission(self):
+        safe_address = get_eth_address()
+        to = get_eth_address()
+        safe_nonce = randint(0, 10)
+        contract_transaction_hash = SafeServiceProvider().get_hash_for_safe_tx(safe_address, to, self.WITHDRAW_AMOUNT,
+                                                                               b'', self.CALL, safe_nonce)
+        transaction_data = {
+            'sender': get_eth_address(),
+            'to': to,
+            'value': self.WITHDRAW_AMOUNT,
+            'operation': self.CALL,
+            'nonce': safe_nonce,
+            'data': None,
+            'contract_transaction_hash': contract_transaction_hash.hex()[:-2],
+            'transaction_hash': '0x' + '12' * 32,
+            'type': 'confirmation'
+        }
+
+        request = self.client.post(reverse('v1:multisig-transactions', kwargs={'address': safe_address}),
+                                   data=transaction_data, format='json')
+        self.assertEqual(request.status_code, status.HTTP_400_BAD_REQUEST)
+
+        transaction_data['contract_transaction_hash'] = contract_transaction_hash.hex()
+        request = self.client.post(reverse('v1:multisig-transactions', kwargs={'address': safe_address}),
+                                   data=transaction_data, format='json')
+        self.assertEqual(request.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(request.json()['status'], MultisigConfirmationSubmission.PENDING)
+        self.assertEqual(request.json()['url'], request['Location'])
+        self.assertEqual(MultisigConfirmation.objects.count(), 0)
+
+        submission = MultisigConfirmationSubmission.objects.get()
+        self.assertEqual(submission.safe, safe_address)
+        self.assertEqual(submission.sender, transaction_data['sender'])
+
+        request = self.client.get(request['Location'])
+        self.assertEqual(request.status_code, status.HTTP_200_OK)
+        self.assertEqual(request.json()['status'], MultisigConfirmationSubmission.PENDING)
+        self.assertEqual(request.json()['contractTransactionHash'], contract_transaction_hash.hex())
+
+        submission.status = MultisigConfirmationSubmission.REJECTED
+        submission.error = 'User is not an owner or tx not approved/executed'
+        submission.save()
+        request = self.client.get(reverse('v1:multisig-confirmation-submission', kwargs={'pk': submission.id}))
+        self.assertEqual(request.json()['status'], MultisigConfirmationSubmission.REJECTED)
+        self.assertEqual(request.json()['error'], submission.error)
+
+        request = self.client.get(reverse('v1:multisig-confirmation-submission', kwargs={'pk': submission.id + 1}))
+        self.assertEqual(request.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_get_multisig_transactions(self):
         safe_address, safe_instance, owners, funder, fund_amount, _ = self.deploy_safe()
 
@@ -498,6 +636,347 @@ class TestViews(APITestCase, TestCaseWithSafeContractMixin):
         self.assertEquals(request.status_code, status.HTTP_200_OK)
         self.assertEquals(request.json()['count'], MultisigTransaction.objects.all().count())
 
+    def test_get_multisig_transactions_number_of_queries(self):
+        safe_address = get_eth_address()
+        owner = get_eth_address()
+        multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address)
+        MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance, owner=owner)
+
+        url = reverse('v1:multisig-transactions', kwargs={'address': safe_address})
+        with CaptureQueriesContext(connection) as captured_queries:
+            request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        number_of_queries = len(captured_queries)
+
+        for _ in range(20):
+            multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance, owner=owner)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+
+        with self.assertNumQueries(number_of_queries):
+            request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(request.json()['results']), 21)
+        self.assertEquals(sum([len(result['confirmations']) for result in request.json()['results']]), 41)
+
+        # Filtering by owners must not add queries either
+        with self.assertNumQueries(number_of_queries):
+            request = self.client.get(url + '?owners=' + owner, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(sum([len(result['confirmations']) for result in request.json()['results']]), 21)
+
+    def test_get_multisig_transactions_pagination(self):
+        safe_address = get_eth_address()
+        for nonce in range(5):
+            multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address, nonce=nonce)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+
+        url = reverse('v1:multisig-transactions', kwargs={'address': safe_address})
+        request = self.client.get(url + '?limit=2', format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(request.json()['count'], 5)
+        self.assertIsNone(request.json()['previous'])
+        self.assertIsNotNone(request.json()['next'])
+        self.assertEquals([result['nonce'] for result in request.json()['results']], [4, 3])
+        self.assertEquals(len(request.json()['results'][0]['confirmations']), 1)
+
+        request = self.client.get(url + '?limit=2&offset=4', format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(request.json()['count'], 5)
+        self.assertIsNotNone(request.json()['previous'])
+        self.assertIsNone(request.json()['next'])
+        self.assertEquals([result['nonce'] for result in request.json()['results']], [0])
+
+    def test_get_multisig_transactions_cursor_pagination(self):
+        safe_address = get_eth_address()
+        url = reverse('v1:multisig-transactions', kwargs={'address': safe_address})
+
+        request = self.client.get(url + '?cursor=', format='json')
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+        nonces = [0, 1, 1, 1, 2, 3, 4]
+        for nonce in nonces:
+            MultisigTransactionFactory(safe=safe_address, nonce=nonce)
+
+        request = self.client.get(url + '?cursor=&limit=2', format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', request.json())
+        self.assertEquals(len(request.json()['results']), 2)
+
+        results = request.json()['results']
+        next_url = request.json()['next']
+        while next_url:
+            request = self.client.get(next_url, format='json')
+            self.assertEquals(request.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(request.json()['results']), 2)
+            results += request.json()['results']
+            next_url = request.json()['next']
+
+        # No transaction is skipped or repeated, even with the same nonce between pages
+        self.assertEquals([result['nonce'] for result in results], sorted(nonces, reverse=True))
+
+        request = self.client.get(url + '?cursor=invalid', format='json')
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_multisig_transactions_filters(self):
+        safe_address = get_eth_address()
+        to = get_eth_address()
+        execution_date = timezone.now()
+        for nonce in range(6):
+            MultisigTransactionFactory(safe=safe_address, nonce=nonce, status=nonce % 2 == 0,
+                                       to=to if nonce < 2 else get_eth_address(),
+                                       execution_date=execution_date + datetime.timedelta(days=nonce))
+
+        url = reverse('v1:multisig-transactions', kwargs={'address': safe_address})
+
+        def get_nonces(query):
+            request = self.client.get(url + query, format='json')
+            self.assertEquals(request.status_code, status.HTTP_200_OK)
+            return [result['nonce'] for result in request.json()['results']]
+
+        self.assertEquals(get_nonces('?executed=true'), [4, 2, 0])
+        self.assertEquals(get_nonces('?executed=false'), [5, 3, 1])
+        self.assertEquals(get_nonces('?nonce__gte=2&nonce__lte=4'), [4, 3, 2])
+        self.assertEquals(get_nonces('?to=' + to), [1, 0])
+        self.assertEquals(get_nonces('?executed=true&nonce__gte=1&cursor='), [4, 2])
+        date_query = '?execution_date__gte={}&execution_date__lte={}'.format(
+            (execution_date + datetime.timedelta(days=1)).isoformat(),
+            (execution_date + datetime.timedelta(days=2)).isoformat()
+        ).replace('+', '%2B')
+        self.assertEquals(get_nonces(date_query), [2, 1])
+        self.assertEquals(get_nonces('?created__gte=' + (execution_date - datetime.timedelta(days=1)).date().isoformat()
+                                     + 'T00:00:00Z'), [5, 4, 3, 2, 1, 0])
+        self.assertEquals(get_nonces('?created__lte=2000-01-01T00:00:00Z'), [])
+
+        request = self.client.get(url + '?nonce__gte=a', format='json')
+        self.assertEquals(request.status_code, status.HTTP_400_BAD_REQUEST)
+
+        request = self.client.get(reverse('v1:multisig-transactions', kwargs={'address': get_eth_address()})
+                                  + '?executed=true', format='json')
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(SAFE_HISTORY_CACHE_TIMEOUT=60)
+    def test_get_multisig_transactions_cache(self):
+        HistoryCacheServiceProvider.del_singleton()
+        self.addCleanup(HistoryCacheServiceProvider.del_singleton)
+        history_cache = HistoryCacheServiceProvider()
+
+        safe_address = get_eth_address()
+        multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address)
+        url = reverse('v1:multisig-transactions', kwargs={'address': safe_address})
+
+        stats = history_cache.get_stats()
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(history_cache.get_stats()['misses'], stats['misses'] + 1)
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            cached_request = self.client.get(url, format='json')
+        self.assertFalse([query for query in captured_queries if query['sql'].startswith('SELECT')])
+        self.assertEquals(cached_request.status_code, status.HTTP_200_OK)
+        self.assertEquals(cached_request.content, request.content)
+        self.assertEquals(history_cache.get_stats()['hits'], stats['hits'] + 1)
+
+        # Pages with different parameters are cached separately
+        request = self.client.get(url + '?limit=1', format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(history_cache.get_stats()['misses'], stats['misses'] + 2)
+
+        # New confirmation invalidates the cached pages
+        MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(request.json()['results'][0]['confirmations']), 1)
+
+        # Executing the transaction invalidates the cached pages
+        multisig_transaction_instance.status = True
+        multisig_transaction_instance.save()
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertTrue(request.json()['results'][0]['isExecuted'])
+
+        # Deleting the confirmation invalidates the cached pages
+        multisig_transaction_instance.confirmations.all().delete()
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(request.json()['results'][0]['confirmations']), 0)
+
+    def test_get_multisig_transactions_etag(self):
+        safe_address = get_eth_address()
+        multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address)
+        url = reverse('v1:multisig-transactions', kwargs={'address': safe_address})
+
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        etag = request['ETag']
+        self.assertTrue(etag.startswith('"'))
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            request = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(request.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(request['ETag'], etag)
+        self.assertFalse(request.content)
+        self.assertFalse([query for query in captured_queries if query['sql'].startswith('SELECT')])
+
+        # Other pages have other ETags
+        request = self.client.get(url + '?limit=1', format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertNotEquals(request['ETag'], etag)
+
+        # ETag changes when the safe changes
+        MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+        request = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertNotEquals(request['ETag'], etag)
+        self.assertEquals(len(request.json()['results'][0]['confirmations']), 1)
+
+    def test_get_pending_multisig_transactions(self):
+        safe_address, _, owners, _, _, threshold = self.deploy_safe()
+        url = reverse('v1:pending-multisig-transactions', kwargs={'address': safe_address})
+
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+        for nonce in (2, 0, 1, 3):
+            multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address, nonce=nonce,
+                                                                       status=nonce == 0)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance,
+                                                   owner=owners[nonce % len(owners)])
+
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(request.json()['owners'], owners)
+        self.assertEquals(request.json()['threshold'], threshold)
+        results = request.json()['results']
+        self.assertEquals([result['nonce'] for result in results], [1, 2, 3])
+        self.assertFalse(any(result['isExecuted'] for result in results))
+        for result in results:
+            owner = owners[result['nonce'] % len(owners)]
+            self.assertEquals(result['confirmedOwners'], [owner])
+            self.assertEquals(result['missingOwners'], [o for o in owners if o != owner])
+
+        MultisigTransaction.objects.filter(safe=safe_address).update(status=True)
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(request.json()['results'], [])
+
+        request = self.client.get(reverse('v1:pending-multisig-transactions',
+                                          kwargs={'address': safe_address.lower()}), format='json')
+        self.assertEquals(request.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_get_owner_confirmations(self):
+        owner = get_eth_address()
+        url = reverse('v1:owner-confirmations', kwargs={'address': owner})
+        request = self.client.get(url, format='json')
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+        safe_addresses = [get_eth_address() for _ in range(2)]
+        for nonce in range(5):
+            multisig_transaction_instance = MultisigTransactionFactory(safe=safe_addresses[nonce % 2], nonce=nonce)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance, owner=owner)
+            MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+
+        results = []
+        next_url = url + '?limit=2'
+        while next_url:
+            request = self.client.get(next_url, format='json')
+            self.assertEquals(request.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(request.json()['results']), 2)
+            results += request.json()['results']
+            next_url = request.json()['next']
+
+        self.assertEquals([result['multisigTransaction']['nonce'] for result in results], [4, 3, 2, 1, 0])
+        self.assertEquals([result['safe'] for result in results],
+                          [safe_addresses[nonce % 2] for nonce in (4, 3, 2, 1, 0)])
+        self.assertEquals(set(results[0].keys()), {'safe', 'submissionDate', 'type', 'transactionHash',
+                                                   'contractTransactionHash', 'multisigTransaction'})
+
+        request = self.client.get(url + '?cursor=invalid', format='json')
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+        request = self.client.get(reverse('v1:owner-confirmations', kwargs={'address': owner.lower()}), format='json')
+        self.assertEquals(request.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_export_multisig_transactions(self):
+        safe_address = get_eth_address()
+        url = reverse('v1:multisig-transactions-export', kwargs={'address': safe_address})
+
+        request = self.client.get(url)
+        self.assertEquals(request.status_code, status.HTTP_404_NOT_FOUND)
+
+        request = self.client.get(reverse('v1:multisig-transactions-export', kwargs={'address': safe_address[:-4]}))
+        self.assertEquals(request.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        for nonce in range(3):
+            multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address, nonce=nonce)
+            for _ in range(nonce):
+                MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+
+        history = self.client.get(reverse('v1:multisig-transactions', kwargs={'address': safe_address}),
+                                  format='json').json()['results']
+
+        request = self.client.get(url)
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertTrue(request['Content-Type'].startswith('application/x-ndjson'))
+        lines = b''.join(request.streaming_content).decode().splitlines()
+        self.assertEquals(len(lines), 3)
+        for line, multisig_transaction in zip(lines, reversed(history)):
+            exported_multisig_transaction = json.loads(line)
+            self.assertEquals(exported_multisig_transaction.pop('safe'), safe_address)
+            self.assertEquals(exported_multisig_transaction, multisig_transaction)
+
+        request = self.client.get(url + '?format=csv')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertTrue(request['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(b''.join(request.streaming_content).decode().splitlines()))
+        self.assertEquals(len(rows), 1 + 1 + 2)  # Transaction without confirmations gets one row too
+        self.assertEquals([row['nonce'] for row in rows], ['0', '1', '2', '2'])
+        self.assertEquals(rows[0]['confirmationOwner'], '')
+        self.assertEquals(rows[1]['confirmationOwner'], history[1]['confirmations'][0]['owner'])
+
+    def test_get_multisig_transactions_batch(self):
+        url = reverse('v1:multisig-transactions-batch')
+        owner = get_eth_address()
+        safe_addresses = [get_eth_address() for _ in range(3)]
+        for i, safe_address in enumerate(safe_addresses):
+            for nonce in range(i * 2):
+                multisig_transaction_instance = MultisigTransactionFactory(safe=safe_address, nonce=nonce)
+                MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance, owner=owner)
+                MultisigTransactionConfirmationFactory(multisig_transaction=multisig_transaction_instance)
+
+        request = self.client.post(url, data={'safes': safe_addresses[:1]}, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals(request.json(), [{'safe': safe_addresses[0], 'results': []}])
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            request = self.client.post(url, data={'safes': safe_addresses[1:2]}, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        number_of_queries = len(captured_queries)
+
+        with self.assertNumQueries(number_of_queries):
+            request = self.client.post(url, data={'safes': list(reversed(safe_addresses)), 'limit': 3},
+                                       format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals([result['safe'] for result in request.json()], list(reversed(safe_addresses)))
+        self.assertEquals([[multisig_transaction['nonce'] for multisig_transaction in result['results']]
+                           for result in request.json()], [[3, 2, 1], [1, 0], []])
+
+        # Same output than history endpoint
+        history = self.client.get(reverse('v1:multisig-transactions', kwargs={'address': safe_addresses[2]}),
+                                  format='json').json()['results']
+        self.assertEquals(request.json()[0]['results'], history[:3])
+
+        request = self.client.post(url, data={'safes': safe_addresses, 'owners': [owner]}, format='json')
+        self.assertEquals(request.status_code, status.HTTP_200_OK)
+        self.assertEquals([len(multisig_transaction['confirmations']) for multisig_transaction
+                           in request.json()[2]['results']], [1] * 4)
+
+        request = self.client.post(url, data={'safes': safe_addresses + [safe_addresses[0].lower()]}, format='json')
+        self.assertEquals(request.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        request = self.client.post(url, data={'safes': []}, format='json')
+        self.assertEquals(request.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_hex_data(self):
         safe_address, safe_instance, owners, _, _, threshold = self.deploy_safe()
         safe_nonce = randint(0, 10)
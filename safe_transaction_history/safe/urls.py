@@ -9,5 +9,16 @@ timestamp_regex = '\\d{4}[-]?\\d{1,2}[-]?\\d{1,2} \\d{1,2}:\\d{1,2}:\\d{1,2}'
 
 urlpatterns = [
     url(r'^about/$', views.AboutView.as_view(), name='about'),
+    path('safes/transactions/', views.SafeMultisigTransactionBatchView.as_view(), name='multisig-transactions-batch'),
+    path('safes/transactions/confirmations/', views.SafeMultisigConfirmationBulkView.as_view(),
+         name='multisig-confirmations-bulk'),
+    path('safes/transactions/submissions/<int:pk>/', views.MultisigConfirmationSubmissionView.as_view(),
+         name='multisig-confirmation-submission'),
     path('safes/<str:address>/transactions/', views.SafeMultisigTransactionListView.as_view(), name='multisig-transactions'),
+    path('safes/<str:address>/transactions/pending/', views.SafePendingMultisigTransactionListView.as_view(),
+         name='pending-multisig-transactions'),
+    path('safes/<str:address>/transactions/export/', views.SafeMultisigTransactionExportView.as_view(),
+         name='multisig-transactions-export'),
+    path('owners/<str:address>/confirmations/', views.OwnerConfirmationListView.as_view(),
+         name='owner-confirmations'),
 ]
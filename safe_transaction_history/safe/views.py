@@ -1,23 +1,57 @@
 import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import ethereum.utils
+from django.conf import settings
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.db.models.query import RawQuerySet
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
-from rest_framework.generics import ListAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
-from safe_transaction_history.safe.models import MultisigTransaction
+from safe_transaction_history.safe.models import (MultisigConfirmation,
+                                                  MultisigConfirmationSubmission,
+                                                  MultisigTransaction)
 from safe_transaction_history.version import __version__
 
-from .contracts import get_safe_owner_manager_contract, get_safe_team_contract
+from .confirmations import save_confirmations, validate_confirmations_on_chain
 from .ethereum_service import EthereumServiceProvider
-from .filters import DefaultPagination
-from .serializers import (SafeMultisigHistorySerializer,
+from .filters import (CreatedKeysetPagination, DefaultPagination,
+                      KeysetPagination, MultisigTransactionFilter)
+from .history import (add_owners_status, build_history,
+                      build_owner_confirmations, get_history_values,
+                      get_owner_confirmation_values)
+from .history_cache_service import HistoryCacheServiceProvider
+from .history_export import EXPORTERS, iterate_safe_history
+from .owner_cache_service import OwnerCacheServiceProvider
+from .renderers import CsvRenderer, NdjsonRenderer
+from .safe_service import SafeServiceProvider
+from .serializers import (BaseSafeMultisigConfirmationSerializer,
+                          MultisigConfirmationSubmissionSerializer,
+                          SafeMultisigConfirmationBulkSerializer,
+                          SafeMultisigHistoryBatchSerializer,
+                          SafeMultisigHistorySerializer,
                           SafeMultisigTransactionSerializer)
-from .tasks import check_approve_transaction
+from .tasks import (schedule_multisig_transaction_check,
+                    validate_confirmation_submission)
+
+
+def is_checksumed_address(address: str) -> bool:
+    try:
+        return ethereum.utils.check_checksum(address)
+    except Exception:
+        return False
 
 
 class AboutView(APIView):
@@ -39,6 +73,26 @@ class AboutView(APIView):
 class SafeMultisigTransactionListView(ListAPIView):
     permission_classes = (AllowAny,)
     pagination_class = DefaultPagination
+    cursor_pagination_class = KeysetPagination
+    ordering = KeysetPagination.ordering
+    filter_backends = (DjangoFilterBackend,)
+    filter_class = MultisigTransactionFilter
+
+    @property
+    def is_cursor_pagination(self) -> bool:
+        """
+        Cursor pagination is opt-in, it's used when `cursor` query parameter is provided (empty for the first page)
+        """
+        return self.cursor_pagination_class.cursor_query_param in self.request.query_params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.is_cursor_pagination:
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_serializer_class(self):
         """
@@ -49,22 +103,39 @@ class SafeMultisigTransactionListView(ListAPIView):
         elif self.request.method == 'POST':
             return SafeMultisigTransactionSerializer
 
-    @swagger_auto_schema(responses={400: 'Invalid data',
+    @swagger_auto_schema(responses={304: 'Not modified',
+                                    400: 'Invalid data',
                                     422: 'Invalid ethereum address'})
     def get(self, request, address, format=None):
         """
-        Returns the history of a multisig (safe)
+        Returns the history of a multisig (safe), newest first. Pass an empty `cursor` query parameter to use
+        cursor pagination instead of limit/offset: no count is returned and pages are retrieved following `next`.
+        Responses include an `ETag`, if it's sent back using `If-None-Match` and the safe didn't change a `304` is
+        returned. History can be filtered by `executed`, `nonce`, `execution_date` and `created` ranges and `to`
         """
-        try:
-            if not ethereum.utils.check_checksum(address):
-                raise Exception
-        except Exception:
+        if not is_checksumed_address(address):
             return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data='Invalid ethereum address')
 
-        multisig_transactions = MultisigTransaction.objects.filter(safe=address)
+        # Digest must be calculated before querying the database, so if the safe changes meanwhile the page is not
+        # served from cache or marked with an outdated ETag
+        history_cache = HistoryCacheServiceProvider()
+        page_digest = history_cache.get_page_digest(address, self.request.build_absolute_uri(self.request.path),
+                                                    self.request.query_params)
+        etag = '"{}"'.format(page_digest) if page_digest else None
+        if etag and etag in parse_etags(self.request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
 
-        if multisig_transactions.count() == 0:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        cache_key = history_cache.get_page_key(address, page_digest)
+        cached_page = history_cache.get_page(cache_key)
+        if cached_page is not None:
+            return Response(status=status.HTTP_200_OK, data=cached_page, headers={'ETag': etag})
+
+        filterset = self.filter_class(self.request.query_params,
+                                      queryset=MultisigTransaction.objects.filter(safe=address),
+                                      request=self.request)
+        if not filterset.form.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data=filterset.form.errors)
+        multisig_transactions = filterset.qs.order_by(*self.ordering)
 
         # Check if the 'owners' query parameter was passed in input
         owners = None
@@ -72,41 +143,64 @@ class SafeMultisigTransactionListView(ListAPIView):
         if query_owners:
             owners = [owner for owner in query_owners.split(',') if owner != '']
 
-        serializer = self.get_serializer_class()(multisig_transactions, many=True, owners=owners)
-        # Paginate results
-        page = self.paginate_queryset(serializer.data)
-        pagination = self.get_paginated_response(page)
-        return Response(status=status.HTTP_200_OK, data=pagination.data)
+        # Paginate queryset, so only the requested page is retrieved. Rows are built from `.values()` instead of
+        # using `SafeMultisigHistorySerializer`, output is the same
+        page = self.paginate_queryset(get_history_values(multisig_transactions))
+        if self.is_cursor_pagination:
+            not_found = not page and self.paginator.cursor is None
+        else:
+            not_found = not self.paginator.count
+
+        # If filters don't match anything, history is empty but the safe exists
+        if not_found and any(value is not None for value in filterset.form.cleaned_data.values()):
+            not_found = not MultisigTransaction.objects.filter(safe=address).exists()
+
+        if not_found:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        response = self.get_paginated_response(build_history(page, owners=owners))
+        history_cache.set_page(cache_key, response.data)
+        if etag:
+            response['ETag'] = etag
+        return response
 
     @swagger_auto_schema(responses={202: 'Accepted',
                                     400: 'Invalid data',
-                                    422: 'Invalid ethereum address/User is not an owner or tx not approved/executed'})
+                                    422: 'Invalid ethereum address/User is not an owner or tx not approved/executed',
+                                    503: 'Cannot get info from node'})
     def post(self, request, address, format=None):
         """
         Allows to create a multisig transaction with its confirmations and to retrieve all the information related with
-        a Safe.
+        a Safe. If asynchronous mode is enabled confirmation is validated on-chain later, the url to check the status
+        of the submission is returned
         """
-        try:
-            if not ethereum.utils.check_checksum(address):
-                raise Exception
-        except Exception:
+        if not is_checksumed_address(address):
             return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data='Invalid ethereum address')
 
         request.data['safe'] = address
 
-        # Get block_number and block_date_time from transaction_hash
+        if settings.SAFE_CONFIRMATIONS_ASYNC:
+            return self.submit_confirmation(request)
+
+        # Get block_number and block_date_time from transaction_hash. Owner status of the sender is retrieved on the
+        # same batch request
+        is_owner_and_confirmed_or_executed = False
         if 'transaction_hash' in request.data:
             try:
                 ethereum_service = EthereumServiceProvider()
-                transaction_data = ethereum_service.get_transaction(request.data['transaction_hash'])
-                if transaction_data:
-                    tx_block_number = transaction_data['blockNumber']
-                    block_data = ethereum_service.get_block(tx_block_number)
-                    block_date_time = datetime.datetime.utcfromtimestamp(block_data['timestamp'])
+                (transaction_data, current_block_number,
+                 is_owner_and_confirmed_or_executed) = self.get_transaction_and_owner_status(address, request.data)
+                if transaction_data and transaction_data['blockNumber']:
+                    tx_block_number = int(transaction_data['blockNumber'], 16)
+                    block_header = ethereum_service.get_block_header(tx_block_number, transaction_data['blockHash'],
+                                                                     current_block_number)
+                    block_date_time = datetime.datetime.utcfromtimestamp(block_header['timestamp'])
                     request.data['block_number'] = tx_block_number
                     request.data['block_date_time'] = block_date_time
                 else:
                     raise ValueError
+            except IOError:
+                return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE, data='Cannot get info from node')
             except ValueError:
                 return Response(status=status.HTTP_400_BAD_REQUEST, data='Cannot get info from transaction_hash %s' %
                                                                          request.data['transaction_hash'])
@@ -116,52 +210,305 @@ class SafeMultisigTransactionListView(ListAPIView):
         if not serializer.is_valid():
             return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
         else:
-            data = serializer.validated_data
-            contract_transaction_hash = data['contract_transaction_hash'].hex()
-            transaction_hash = data['transaction_hash'].hex()
-            sender = data['sender']
-            # check isOwnerAndConfirmed
-            if (self.is_owner_and_confirmed(address, contract_transaction_hash, sender)
-                    or self.is_owner_and_executed(address, contract_transaction_hash, sender)):
+            if is_owner_and_confirmed_or_executed:
                 # Save data into Database
                 serializer.save()
 
-                # Create task
-                check_approve_transaction.delay(safe_address=address,
-                                                contract_transaction_hash=contract_transaction_hash,
-                                                transaction_hash=transaction_hash,
-                                                owner=sender)
-
+                # Create task, or piggyback on the one checking the multisig transaction
+                contract_transaction_hash = serializer.validated_data['contract_transaction_hash'].hex()
+                transaction.on_commit(lambda: schedule_multisig_transaction_check(address,
+                                                                                  contract_transaction_hash))
                 return Response(status=status.HTTP_202_ACCEPTED)
             else:
                 return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY,
                                 data='User is not an owner or tx not approved/executed')
 
-    def is_owner_and_confirmed(self, safe_address: str, contract_transaction_hash: str, owner: str) -> bool:
+    def submit_confirmation(self, request) -> Response:
         """
-        Checks whether an account (owner) is one of the Safe's owners and the incoming contract_transaction_hash
-        was approved
+        Only checks not using the node are done, confirmation is stored as pending and validated on-chain by
+        `validate_confirmation_submission` task
         """
-        ethereum_service = EthereumServiceProvider()
-        w3 = ethereum_service.w3  # Web3 instance
-        safe_owner_contract = get_safe_owner_manager_contract(w3, safe_address)
-        safe_contract = get_safe_team_contract(w3, safe_address)
+        serializer = BaseSafeMultisigConfirmationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+
+        data = serializer.validated_data
+        submission = MultisigConfirmationSubmission.objects.create(
+            safe=data['safe'],
+            to=data['to'],
+            value=data['value'],
+            data=data['data'],
+            operation=data['operation'],
+            nonce=data['nonce'],
+            contract_transaction_hash=data['contract_transaction_hash'],
+            transaction_hash=data['transaction_hash'],
+            sender=data['sender'],
+            type=data['type']
+        )
+        transaction.on_commit(lambda: validate_confirmation_submission.delay(submission.id))
 
-        is_owner = safe_owner_contract.functions.isOwner(owner).call()
-        is_approved = safe_contract.functions.isApproved(contract_transaction_hash, owner).call()
-        return is_owner and is_approved
+        url = reverse('multisig-confirmation-submission', kwargs={'pk': submission.id}, request=request)
+        return Response(status=status.HTTP_202_ACCEPTED, headers={'Location': url},
+                        data={'status': submission.status, 'url': url})
 
-    def is_owner_and_executed(self, safe_address: str, contract_transaction_hash: str, owner: str) -> bool:
+    def get_transaction_and_owner_status(self, safe_address: str,
+                                         data: Dict[str, Any]) -> Tuple[Optional[Dict], int, bool]:
         """
-        Checks whether an account (owner) is one of the Safe's owners and the incoming contract_transaction_hash
-        was executed
+        Retrieves the transaction of `transaction_hash`, the current block number and checks whether an account
+        (`sender`) is one of the Safe's owners and `contract_transaction_hash` was approved by it or executed.
+        Owners are retrieved from `OwnerCacheService`, everything else using one JSON-RPC batch request
+        :param safe_address: address of the Safe
+        :param data: request data, fields are validated the same way as `SafeMultisigTransactionSerializer`
+        :return: tuple of transaction (`None` if not found), current block number and result of the owner check.
+        If `sender` or `contract_transaction_hash` are not valid owner check is not done, and serializer validation
+        will fail
+        :raises ValueError: if `transaction_hash` is not valid
+        :raises IOError: if node cannot be reached or returns an error
         """
+        serializer_fields = SafeMultisigTransactionSerializer().fields
+        try:
+            transaction_hash = serializer_fields['transaction_hash'].run_validation(data['transaction_hash']).hex()
+        except ValidationError as exc:
+            raise ValueError from exc
+
         ethereum_service = EthereumServiceProvider()
-        w3 = ethereum_service.w3  # Web3 instance
-        safe_owner_contract = get_safe_owner_manager_contract(w3, safe_address)
-        safe_contract = get_safe_team_contract(w3, safe_address)
+        safe_service = SafeServiceProvider()
+        rpc_requests = [ethereum_service.build_get_transaction_request(transaction_hash),
+                        ethereum_service.build_block_number_request()]
+        is_owner = False
+        try:
+            sender = serializer_fields['sender'].run_validation(data.get('sender'))
+            contract_transaction_hash = serializer_fields['contract_transaction_hash'].run_validation(
+                data.get('contract_transaction_hash')
+            )
+            is_owner = OwnerCacheServiceProvider().is_owner(safe_address, sender)
+            if is_owner:
+                rpc_requests += safe_service.build_approval_status_requests(safe_address, contract_transaction_hash,
+                                                                            sender)
+        except ValidationError:
+            pass
+
+        transaction_data, current_block_number, *call_results = ethereum_service.batch_request(rpc_requests)
+        if current_block_number is None:
+            raise ValueError('Cannot get current block number')
+        current_block_number = int(current_block_number, 16)
+        if not is_owner:
+            return transaction_data, current_block_number, False
+
+        return transaction_data, current_block_number, safe_service.decode_approval_status(call_results)
+
+
+class SafePendingMultisigTransactionListView(APIView):
+    """
+    Queue of multisig transactions of a safe waiting to be executed
+    """
+    permission_classes = (AllowAny,)
+
+    @swagger_auto_schema(responses={404: 'Safe not found',
+                                    422: 'Invalid ethereum address',
+                                    503: 'Cannot get owners from node'})
+    def get(self, request, address, format=None):
+        """
+        Returns the not executed multisig transactions of a safe ordered by nonce, with the owners that confirmed
+        (`confirmedOwners`) and didn't confirm (`missingOwners`) every one of them. Current `owners` and `threshold`
+        of the safe are returned too
+        """
+        if not is_checksumed_address(address):
+            return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data='Invalid ethereum address')
+
+        # Served by partial index `safe_multisigtransaction_pending_idx`, condition must match its `WHERE`
+        multisig_transactions = list(get_history_values(
+            MultisigTransaction.objects.filter(safe=address, status=False).order_by('nonce', 'id')
+        ))
+        if not multisig_transactions and not MultisigTransaction.objects.filter(safe=address).exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            owners, threshold = OwnerCacheServiceProvider().get_owners_and_threshold(address)
+        except (IOError, ValueError):
+            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE, data='Cannot get owners from node')
+
+        return Response(status=status.HTTP_200_OK, data={
+            'owners': owners,
+            'threshold': threshold,
+            'results': add_owners_status(build_history(multisig_transactions), owners),
+        })
+
+
+class OwnerConfirmationListView(ListAPIView):
+    """
+    Confirmations of an owner across every safe
+    """
+    permission_classes = (AllowAny,)
+    pagination_class = CreatedKeysetPagination
+
+    @swagger_auto_schema(responses={404: 'Owner not found',
+                                    422: 'Invalid ethereum address'})
+    def get(self, request, address, format=None):
+        """
+        Returns the confirmations of an owner with their multisig transaction, newest first. Results are paginated
+        using a cursor, follow `next` to get the next page
+        """
+        if not is_checksumed_address(address):
+            return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data='Invalid ethereum address')
+
+        # Served by index `(owner, created, id)`
+        confirmations = MultisigConfirmation.objects.filter(owner=address).order_by(*self.pagination_class.ordering)
+        page = self.paginate_queryset(get_owner_confirmation_values(confirmations))
+        if not page and self.paginator.cursor is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
 
-        is_owner = safe_owner_contract.functions.isOwner(owner).call()
-        is_executed = safe_contract.functions.isExecuted(contract_transaction_hash).call()
+        return self.get_paginated_response(build_owner_confirmations(page))
 
-        return is_owner and is_executed
+
+class SafeMultisigTransactionExportView(APIView):
+    """
+    Streams the whole history of a safe
+    """
+    permission_classes = (AllowAny,)
+    renderer_classes = (NdjsonRenderer, CsvRenderer)
+
+    @swagger_auto_schema(responses={404: 'Safe not found',
+                                    422: 'Invalid ethereum address'})
+    def get(self, request, address, format=None):
+        """
+        Streams every multisig transaction of a safe with its confirmations, oldest first. Use `format=ndjson`
+        (default) to get one json line per transaction or `format=csv` to get one csv row per confirmation
+        """
+        if not is_checksumed_address(address):
+            return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data='Invalid ethereum address')
+
+        if not MultisigTransaction.objects.filter(safe=address).exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(EXPORTERS[renderer.format](iterate_safe_history(address)),
+                                         content_type='{}; charset={}'.format(renderer.media_type, renderer.charset))
+        response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(address, renderer.format)
+        return response
+
+
+class SafeMultisigTransactionBatchView(APIView):
+    """
+    History of many safes at once
+    """
+    permission_classes = (AllowAny,)
+    ordering = KeysetPagination.ordering
+
+    @swagger_auto_schema(request_body=SafeMultisigHistoryBatchSerializer,
+                         responses={400: 'Invalid data',
+                                    422: 'Invalid ethereum address'})
+    def post(self, request, format=None):
+        """
+        Returns the latest `limit` multisig transactions (newest first) of every safe in `safes`, optionally
+        filtering confirmations by `owners`. Safes are returned in the same order they were provided. Number of
+        queries doesn't depend on the number of safes
+        """
+        serializer = SafeMultisigHistoryBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+
+        safes = list(OrderedDict.fromkeys(serializer.validated_data['safes']))
+        owners = serializer.validated_data.get('owners')
+        limit = serializer.validated_data['limit']
+
+        invalid_addresses = [address for address in safes if not is_checksumed_address(address)]
+        if invalid_addresses:
+            return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            data='Invalid ethereum address %s' % ', '.join(invalid_addresses))
+
+        multisig_transactions = list(self.get_latest_multisig_transactions(safes, limit))
+        prefetch_related_objects(multisig_transactions,
+                                 SafeMultisigHistorySerializer.get_confirmations_prefetch(owners=owners))
+        data = SafeMultisigHistorySerializer(multisig_transactions, many=True, owners=owners).data
+
+        results_by_safe = OrderedDict((safe, []) for safe in safes)
+        for multisig_transaction, multisig_transaction_data in zip(multisig_transactions, data):
+            results_by_safe[multisig_transaction.safe].append(multisig_transaction_data)
+
+        return Response(status=status.HTTP_200_OK,
+                        data=[{'safe': safe, 'results': results} for safe, results in results_by_safe.items()])
+
+    def get_latest_multisig_transactions(self, safes: List[str], limit: int) -> RawQuerySet:
+        """
+        Uses a window function to get the latest `limit` multisig transactions of every safe with just one query
+        :param safes: list of safe addresses
+        :param limit: maximum number of multisig transactions per safe
+        :return: multisig transactions, ordered by safe and `ordering`
+        """
+        order_by = ', '.join('{} DESC'.format(field[1:]) if field.startswith('-') else field
+                             for field in self.ordering)
+        return MultisigTransaction.objects.raw("""
+            SELECT * FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY safe ORDER BY {order_by}) AS safe_row_number
+                FROM {table} WHERE safe = ANY(%s)
+            ) AS latest_multisig_transactions
+            WHERE safe_row_number <= %s
+            ORDER BY safe, safe_row_number
+        """.format(order_by=order_by, table=MultisigTransaction._meta.db_table), [safes, limit])
+
+
+class SafeMultisigConfirmationBulkView(APIView):
+    """
+    Creation of many multisig transactions and confirmations at once
+    """
+    permission_classes = (AllowAny,)
+
+    @swagger_auto_schema(request_body=SafeMultisigConfirmationBulkSerializer,
+                         responses={200: 'Result for every confirmation',
+                                    400: 'Invalid data',
+                                    503: 'Cannot get info from node'})
+    def post(self, request, format=None):
+        """
+        Creates every confirmation in `confirmations`, fields are the same as creating one multisig transaction
+        plus `safe`. Node is queried once for all the confirmations, and one task is scheduled for every multisig
+        transaction. A result is returned for every confirmation, in the same order: `status` (`202` if accepted,
+        `400` for invalid data and `422` if user is not an owner or tx not approved/executed) and `errors` if not
+        accepted
+        """
+        serializer = SafeMultisigConfirmationBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(status=status.HTTP_400_BAD_REQUEST, data=serializer.errors)
+
+        results = []
+        confirmations = []  # Tuples of result index and validated data
+        for confirmation in serializer.validated_data['confirmations']:
+            confirmation_serializer = BaseSafeMultisigConfirmationSerializer(data=confirmation)
+            if confirmation_serializer.is_valid():
+                confirmations.append((len(results), confirmation_serializer.validated_data))
+                results.append(None)
+            else:
+                results.append({'status': status.HTTP_400_BAD_REQUEST, 'errors': confirmation_serializer.errors})
+
+        try:
+            errors = validate_confirmations_on_chain([data for _, data in confirmations])
+        except (IOError, ValueError):
+            return Response(status=status.HTTP_503_SERVICE_UNAVAILABLE, data='Cannot get info from node')
+
+        accepted = []
+        for (result_index, confirmation), error in zip(confirmations, errors):
+            if error:
+                results[result_index] = {'status': error[0], 'errors': error[1]}
+            else:
+                results[result_index] = {'status': status.HTTP_202_ACCEPTED}
+                accepted.append(confirmation)
+
+        save_confirmations(accepted)
+        multisig_transactions = {(confirmation['safe'], confirmation['contract_transaction_hash'].hex())
+                                 for confirmation in accepted}
+
+        def schedule_multisig_transaction_checks():
+            for safe_address, contract_transaction_hash in multisig_transactions:
+                schedule_multisig_transaction_check(safe_address, contract_transaction_hash)
+        transaction.on_commit(schedule_multisig_transaction_checks)
+        return Response(status=status.HTTP_200_OK, data=results)
+
+
+class MultisigConfirmationSubmissionView(RetrieveAPIView):
+    """
+    Status of a confirmation submitted using the asynchronous mode: `pending` until it's validated on-chain, then
+    `accepted` or `rejected` (`error` is set)
+    """
+    permission_classes = (AllowAny,)
+    queryset = MultisigConfirmationSubmission.objects.all()
+    serializer_class = MultisigConfirmationSubmissionSerializer